@@ -11,16 +11,39 @@ import subprocess
 import requests
 import time
 import shutil
+import tempfile
 import zipfile
 import re
 import signal
-from datetime import datetime
+import socket
+import secrets
+import urllib.parse
+import sqlite3
+import fcntl
+import threading
+import itertools
+import errno
+import io
+import copy
+import atexit
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import base64
-import jproperties
+import struct
+import ctypes
+from array import array
+import zlib
+import gzip
+import mmap
+import hashlib
 import ruamel.yaml
 import toml
 from pyngrok import ngrok, conf
+from pyngrok.exception import PyngrokError
 from bs4 import BeautifulSoup
 from tqdm.auto import tqdm
 
@@ -55,6 +78,215 @@ SERVER_API_URLS = {
     'banner': 'https://mohistmc.com/api/v2/projects/banner'
 }
 
+# Kapasitas ring buffer log per proses server dan jumlah baris yang ditampilkan di konsol.
+LOG_BUFFER_CAPACITY = 20000
+LOG_VIEW_LINES = 500
+LOG_TAIL_INTERVAL = 0.05
+LOG_ADOPT_TAIL_BYTES = 256 * 1024
+
+# Streaming panel log: interval fragmen saat sepi, lama jeda sebelum dianggap sepi,
+# ukuran frame pengiriman delta, dan batas lama satu putaran streaming.
+LOG_STREAM_IDLE_INTERVAL = 1.0
+LOG_STREAM_IDLE_GAP = 0.5
+LOG_STREAM_FRAME = 0.05
+LOG_STREAM_BURST_WINDOW = 5.0
+
+# Direktori runtime lokal (bukan Drive) untuk file PID, FIFO stdin, dan log konsol server.
+RUNTIME_DIR = '/content/.minelab'
+
+# Cache metadata HTTP (daftar versi, URL download): lokasi, umur segar, dan timeout (connect, read).
+HTTP_CACHE_DIR = os.path.join(RUNTIME_DIR, 'http_cache')
+METADATA_CACHE_TTL = 30 * 60
+METADATA_STALE_RETRY = 60  # Setelah jaringan gagal, data lama dipakai selama ini sebelum mencoba lagi
+HTTP_TIMEOUT = (10, 30)
+PREFETCH_WORKERS = 8
+
+# Unduhan: ukuran chunk tulis, jumlah koneksi paralel, ambang ukuran untuk dipecah, dan interval update UI.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_CONNECTIONS = 4
+DOWNLOAD_SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+PROGRESS_UPDATE_INTERVAL = 0.25
+
+# Cache artefak bersama (jar/zip server) di root Drive dan batas ukurannya sebelum eviksi LRU.
+JAR_CACHE_DIR = os.path.join(DRIVE_PATH, '.jarcache')
+JAR_CACHE_MAX_BYTES = 2 * 1024**3
+FICLONE = 0x40049409  # ioctl Linux untuk reflink (btrfs/xfs)
+
+# Staged run: folder lokal tempat server dijalankan, interval sinkronisasi balik ke Drive,
+# dan batas waktu menunggu konfirmasi `save-all flush` dari server.
+STAGING_ROOT = '/content/minelab_stage'
+STAGE_MANIFEST_NAME = '.minelab_sync.json'
+STAGE_SYNC_INTERVAL = 300
+STAGE_SKIP_DIRS = {BACKUP_FOLDER_NAME, '.minelab'}  # Tidak dibutuhkan server; tetap hanya di Drive
+SAVE_FLUSH_TIMEOUT = 120
+SAVE_COMPLETE_PATTERN = re.compile(r'Saved the (game|world)')
+BEDROCK_SAVE_READY_PATTERN = re.compile(r'Data saved\. Files are now ready to be copied')
+
+# Backup inkremental: ukuran blok deduplikasi (level kompresi mengikuti DEFAULT_COMPRESSION).
+BACKUP_CHUNK_SIZE = 512 * 1024
+
+# Streaming arsip: ukuran chunk baca/tulis, port server unduhan lokal beserta URL yang dipakai
+# browser (atur jika port diteruskan lewat tunnel), masa berlaku tautan, ukuran potongan unggahan
+# dari halaman unggah, dan batas tombol unduh inline.
+ARCHIVE_IO_CHUNK_SIZE = 1024 * 1024
+FILE_SERVER_PORT = 8765
+FILE_SERVER_PUBLIC_URL = f"http://localhost:{FILE_SERVER_PORT}"
+FILE_SERVER_LINK_TTL = 15 * 60
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+INLINE_DOWNLOAD_MAX_BYTES = 50 * 1024 * 1024
+
+# Kompresi paralel untuk ekspor/backup: opsi bawaan, ukuran potongan deflate per pekerja,
+# ambang zip64 per file, dan nomor syscall ioprio_set per arsitektur.
+DEFAULT_COMPRESSION = {"level": 6, "workers": os.cpu_count() or 2, "nice": 10, "idle_io": True}
+ZIP_PIECE_SIZE = 4 * 1024 * 1024
+ZIP64_THRESHOLD = 2 * 1024**3
+IOPRIO_SET_SYSCALLS = {'x86_64': 251, 'aarch64': 30}
+IOPRIO_CLASS_IDLE = 3
+
+# Statistik dunia: rentang InhabitedTime (dalam tick, 20 tick = 1 detik) untuk histogram.
+INHABITED_BUCKETS = [("< 5 detik", 100), ("< 1 menit", 1200), ("< 10 menit", 12000), ("< 1 jam", 72000), ("≥ 1 jam", float('inf'))]
+
+# Pre-generasi dunia: ukuran blok forceload (chunk per sisi) dan batas kesehatan tick.
+PREGEN_BLOCK_CHUNKS = 8
+PREGEN_TARGET_MSPT = 40.0
+PREGEN_SETTLE_SECONDS = 2.0
+PREGEN_BACKOFF_SECONDS = 5.0
+PREGEN_READY_TIMEOUT = 900
+PREGEN_VERIFY_TIMEOUT = 60.0
+TICK_HEALTH_TIMEOUT = 5.0
+TICK_HEALTH_LOG_WINDOW = 30.0  # Tanpa RCON hanya "Can't keep up!" dalam sekian detik terakhir yang dibaca dari log
+ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*[A-Za-z]|§.')
+SERVER_READY_PATTERN = re.compile(r'Done \([\d.,]+s\)!|Server started\.')
+TPS_PATTERN = re.compile(r'TPS from last 1m, 5m, 15m:\s*\*?([\d.]+)')
+MSPT_PATTERN = re.compile(r'Average time per tick:\s*([\d.]+)\s*ms|◴\s*([\d.]+)/[\d.]+/[\d.]+')
+FORGE_TPS_PATTERN = re.compile(r'Overall:.*?Mean tick time:\s*([\d.]+)\s*ms\.\s*Mean TPS:\s*([\d.]+)')
+CANT_KEEP_UP_PATTERN = re.compile(r"Can't keep up!")
+CHUNKY_PROGRESS_PATTERN = re.compile(r'\[Chunky\].*?Processed:\s*([\d,]+)\s*chunks')
+CHUNKY_DONE_PATTERN = re.compile(r'\[Chunky\].*?Task finished')
+
+# Metrik server: interval sampling dan kapasitas ring (1 jam mentah, 24 jam per menit).
+METRICS_SAMPLE_INTERVAL = 5.0
+METRICS_JVM_INTERVAL = 30.0
+METRICS_TICK_INTERVAL = 60.0
+METRICS_RAW_CAPACITY = 720
+METRICS_BUCKET_SECONDS = 60
+METRICS_BUCKET_CAPACITY = 1440
+METRIC_NAMES = ("cpu_percent", "rss_mb", "threads", "heap_used_mb", "heap_committed_mb", "gc_count", "gc_time_ms", "tps", "mspt", "players", "ticks_behind")
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+JVM_SPACE_USED_PATTERN = re.compile(r'sun\.gc\.generation\.\d+\.space\.\d+\.used')
+JVM_GENERATION_CAPACITY_PATTERN = re.compile(r'sun\.gc\.generation\.\d+\.capacity')
+PLAYER_LIST_PATTERN = re.compile(r'There are (\d+)(?: of a max of |/| out of maximum )(\d+) players online')
+
+# Ping status: Server List Ping (Java) dan RakNet unconnected ping (Bedrock).
+PING_TIMEOUT = 3.0
+PING_INTERVAL = 30.0
+PING_READY_INTERVAL = 3.0
+RAKNET_MAGIC = bytes.fromhex('00ffff00fefefefefdfdfdfd12345678')
+
+# RCON: tipe paket protokol Source RCON yang dipakai Minecraft.
+RCON_DEFAULT_PORT = 25575
+RCON_TIMEOUT = 10.0
+RCON_RETRY_INTERVAL = 15.0
+RCON_TYPE_LOGIN = 3
+RCON_TYPE_COMMAND = 2
+RCON_TYPE_RESPONSE = 0
+
+# Arsip log: format baris Vanilla/Fabric, Paper, Forge, dan Bedrock.
+LOG_LINE_PATTERN = re.compile(
+    r'^\[(?:(?P<date>\d{4}-\d{2}-\d{2}|\d{2}[A-Za-z]{3}\d{4}) )?(?P<time>\d{2}:\d{2}:\d{2})(?:[.:]\d+)?(?: (?P<level>[A-Z]+))?\]'
+    r'(?: \[(?P<thread>[^\]]+?)/(?P<level2>[A-Z]+)\])?(?: \[[^\]]*\])?:? ?(?P<message>.*)$')
+LOG_FILE_DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})-\d+\.log\.gz$')
+LOG_ARCHIVE_RESULT_LIMIT = 1000
+LOG_ARCHIVE_BATCH_ROWS = 5000
+
+# Profil startup: jumlah riwayat start yang disimpan per server.
+STARTUP_HISTORY_LIMIT = 30
+
+# Manajer file: umur cache listing, ukuran halaman, dan penghitung ukuran folder di latar.
+LISTING_TTL = 30
+DIR_SIZE_TTL = 300
+DIR_SIZE_WORKERS = 2
+FILE_PAGE_SIZE = 100
+
+# Operasi arsip latar (ekstrak/kompres/pindah/hapus): jumlah pekerja dan berapa lama job selesai tetap ditampilkan.
+ARCHIVE_JOB_WORKERS = 2
+ARCHIVE_JOB_KEEP = 10 * 60
+
+# Penyimpanan konfigurasi JSON: jeda penggabungan penyimpanan beruntun sebelum ditulis ke Drive.
+CONFIG_SAVE_DELAY = 0.5
+
+# Indeks konfigurasi: ekstensi yang diindeks, kedalaman dan umur pemindaian, serta folder yang
+# tidak pernah ditelusuri (dunia, log, cache, pustaka).
+CONFIG_EXTENSIONS = ('.properties', '.yml', '.yaml')
+CONFIG_SCAN_DEPTH = 3
+CONFIG_INDEX_TTL = 300
+CONFIG_SKIP_DIRS = {'world', 'world_nether', 'world_the_end', 'worlds', 'region', 'entities', 'poi', 'playerdata',
+                    'DIM-1', 'DIM1', 'logs', 'crash-reports', 'cache', 'libraries', 'versions', 'bundler',
+                    BACKUP_FOLDER_NAME, 'bluemap', 'dynmap', 'squaremap'}
+
+# Profil tuning performa: tipe server per keluarga konfigurasi, target konkret tiap pengaturan
+# abstrak (file, kunci bertitik, tipe, versi minimum, versi batas atas), dan preset profil.
+BUKKIT_TYPES = ('paper', 'purpur', 'folia', 'mohist', 'arclight', 'banner')
+PAPER_TYPES = ('paper', 'purpur', 'folia')
+JAVA_TYPES = BUKKIT_TYPES + ('vanilla', 'snapshot', 'fabric', 'forge')
+TUNING_TARGETS = {
+    "view_distance": [("server.properties", "view-distance", JAVA_TYPES + ('bedrock',), None, None)],
+    "simulation_distance": [("server.properties", "simulation-distance", JAVA_TYPES, (1, 18), None),
+                            ("server.properties", "tick-distance", ('bedrock',), None, None)],
+    "sync_chunk_writes": [("server.properties", "sync-chunk-writes", JAVA_TYPES, (1, 16), None)],
+    **{f"activation_{group}": [("spigot.yml", f"world-settings.default.entity-activation-range.{group}", BUKKIT_TYPES, None, None)]
+       for group in ("animals", "monsters", "raiders", "misc", "water", "villagers")},
+    "hopper_transfer": [("spigot.yml", "world-settings.default.ticks-per.hopper-transfer", BUKKIT_TYPES, None, None)],
+    "hopper_check": [("spigot.yml", "world-settings.default.ticks-per.hopper-check", BUKKIT_TYPES, None, None)],
+    "item_merge_radius": [("spigot.yml", "world-settings.default.merge-radius.item", BUKKIT_TYPES, None, None)],
+    "hopper_disable_move_event": [("config/paper-world-defaults.yml", "hopper.disable-move-event", PAPER_TYPES, (1, 19), None),
+                                  ("paper.yml", "world-settings.default.hopper.disable-move-event", PAPER_TYPES, None, (1, 19))],
+    "redstone_implementation": [("config/paper-world-defaults.yml", "misc.redstone-implementation", PAPER_TYPES, (1, 19), None)],
+    "auto_save_chunks_per_tick": [("config/paper-world-defaults.yml", "chunks.max-auto-save-chunks-per-tick", PAPER_TYPES, (1, 19), None),
+                                  ("paper.yml", "world-settings.default.max-auto-save-chunks-per-tick", PAPER_TYPES, None, (1, 19))],
+    "prevent_moving_into_unloaded_chunks": [("config/paper-world-defaults.yml", "chunks.prevent-moving-into-unloaded-chunks", PAPER_TYPES, (1, 19), None),
+                                            ("paper.yml", "world-settings.default.prevent-moving-into-unloaded-chunks", PAPER_TYPES, None, (1, 19))],
+    "arrow_despawn_rate": [("config/paper-world-defaults.yml", "entities.spawning.non-player-arrow-despawn-rate", PAPER_TYPES, (1, 19), None),
+                           ("paper.yml", "world-settings.default.non-player-arrow-despawn-rate", PAPER_TYPES, None, (1, 19))],
+    "villager_lobotomize": [("purpur.yml", "world-settings.default.mobs.villager.lobotomize.enabled", ('purpur',), None, None)],
+    "autosave_ticks": [("bukkit.yml", "ticks-per.autosave", BUKKIT_TYPES, None, None)],
+    "monster_spawn_ticks": [("bukkit.yml", "ticks-per.monster-spawns", BUKKIT_TYPES, None, None)],
+    **{f"mob_cap_{group.replace('-', '_')}": [("bukkit.yml", f"spawn-limits.{group}", BUKKIT_TYPES, None, None)]
+       for group in ("monsters", "animals", "water-animals", "water-ambient", "ambient")},
+}
+TUNING_PROFILES = {
+    "seimbang": {
+        "label": "Seimbang", "description": "Jarak pandang sedang, activation range dan hopper diperlonggar, autosave dicicil. Cocok untuk survival 5-20 pemain.",
+        "settings": {"view_distance": 8, "simulation_distance": 6, "sync_chunk_writes": False,
+                     "activation_animals": 24, "activation_monsters": 24, "activation_raiders": 48, "activation_misc": 12,
+                     "activation_water": 12, "activation_villagers": 24, "hopper_transfer": 8, "hopper_check": 8,
+                     "item_merge_radius": 3.5, "redstone_implementation": "ALTERNATE_CURRENT", "auto_save_chunks_per_tick": 8,
+                     "prevent_moving_into_unloaded_chunks": True, "arrow_despawn_rate": 300,
+                     "autosave_ticks": 6000, "mob_cap_monsters": 50, "mob_cap_animals": 8, "mob_cap_water_animals": 3,
+                     "mob_cap_water_ambient": 10, "mob_cap_ambient": 5},
+    },
+    "agresif": {
+        "label": "Agresif", "description": "Memprioritaskan TPS: jarak simulasi minimum, villager di-lobotomi (Purpur), event hopper dimatikan, mob cap rendah. Dapat mengubah perilaku farm.",
+        "settings": {"view_distance": 6, "simulation_distance": 4, "sync_chunk_writes": False,
+                     "activation_animals": 16, "activation_monsters": 16, "activation_raiders": 32, "activation_misc": 8,
+                     "activation_water": 8, "activation_villagers": 16, "hopper_transfer": 8, "hopper_check": 8,
+                     "item_merge_radius": 4.0, "hopper_disable_move_event": True, "redstone_implementation": "ALTERNATE_CURRENT",
+                     "auto_save_chunks_per_tick": 6, "prevent_moving_into_unloaded_chunks": True, "arrow_despawn_rate": 20,
+                     "villager_lobotomize": True, "autosave_ticks": 6000, "monster_spawn_ticks": 2,
+                     "mob_cap_monsters": 35, "mob_cap_animals": 6, "mob_cap_water_animals": 2, "mob_cap_water_ambient": 5, "mob_cap_ambient": 1},
+    },
+    "visual": {
+        "label": "Jarak Pandang Jauh", "description": "Jarak pandang lebar untuk server kecil (1-5 pemain) dengan simulasi tetap sedang; cocok dipadukan dengan pre-generasi dunia.",
+        "settings": {"view_distance": 12, "simulation_distance": 8, "sync_chunk_writes": False,
+                     "redstone_implementation": "ALTERNATE_CURRENT", "auto_save_chunks_per_tick": 12,
+                     "prevent_moving_into_unloaded_chunks": True},
+    },
+}
+TUNING_MEASURE_WINDOW = 15 * 60
+TUNING_SETTLE_SECONDS = 120
+TUNING_HISTORY_LIMIT = 20
+
 # =================================================================================
 # INISIALISASI STREAMLIT SESSION STATE
 # Kunci untuk memperbaiki bug: memastikan semua state aplikasi dikelola di sini.
@@ -64,11 +296,11 @@ def initialize_state():
     session_defaults = {
         'page': "🏠 Beranda",
         'active_server': None,
-        'server_process': None,
-        'tunnel_process': None,
-        'tunnel_address': None,
         'server_config': {},
-        'log_messages': [],
+        'log_messages': deque(maxlen=LOG_VIEW_LINES),
+        'log_buffer': None,
+        'log_seq': 0,
+        'log_pane_running': None,
         'drive_mounted': os.path.exists('/content/drive/MyDrive'),
         'current_path': DRIVE_PATH,
         'active_server_fm': None,
@@ -83,243 +315,3934 @@ def initialize_state():
 # Kumpulan fungsi yang melakukan tugas-tugas backend, diadaptasi 1:1 dari minelab.py.
 # =================================================================================
 
-def run_command(command, cwd=None, capture_output=True, shell=True):
-    """Menjalankan perintah shell dan menangkap outputnya, dengan logging ke UI."""
-    try:
-        st.info(f"⚙️ Menjalankan: `{command}`")
-        result = subprocess.run(
-            command, shell=shell, check=True, capture_output=capture_output, text=True, cwd=cwd,
-            universal_newlines=True
-        )
-        if capture_output and result.stdout:
-            st.code(result.stdout, language="bash")
-        return result
-    except subprocess.CalledProcessError as e:
-        st.error(f"❌ Error saat menjalankan perintah: {command}")
-        st.code(e.stderr or "Tidak ada output error standar.", language="bash")
-        return None
+def run_command(command, cwd=None, capture_output=True, shell=True):
+    """Menjalankan perintah shell dan menangkap outputnya, dengan logging ke UI."""
+    try:
+        st.info(f"⚙️ Menjalankan: `{command}`")
+        result = subprocess.run(
+            command, shell=shell, check=True, capture_output=capture_output, text=True, cwd=cwd,
+            universal_newlines=True
+        )
+        if capture_output and result.stdout:
+            st.code(result.stdout, language="bash")
+        return result
+    except subprocess.CalledProcessError as e:
+        st.error(f"❌ Error saat menjalankan perintah: {command}")
+        st.code(e.stderr or "Tidak ada output error standar.", language="bash")
+        return None
+
+class JsonConfigStore:
+    """Cache dokumen JSON (server_list.json, colabconfig.json) per path, dikunci dengan
+    (mtime, ukuran) file sehingga hanya dibaca ulang dari Drive jika berubah. Penyimpanan
+    beruntun dalam CONFIG_SAVE_DELAY digabung menjadi satu penulisan atomik
+    (file sementara + fsync + rename); pembacaan langsung melihat data yang belum ditulis.
+    Penulisan yang gagal tetap menunggu di `_pending`; error-nya dicatat dan save berikutnya
+    mencoba ulang secara langsung serta meneruskan OSError ke pemanggil."""
+
+    def __init__(self):
+        self._docs = {}  # path -> ((mtime_ns, ukuran), dokumen)
+        self._pending = {}  # path -> dokumen yang menunggu ditulis
+        self._errors = {}  # path -> OSError penulisan terakhir yang gagal
+        self._timers = {}
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    def load(self, path):
+        """Salinan dokumen di `path`, atau None jika file tidak ada. JSONDecodeError diteruskan."""
+        with self._lock:
+            if path in self._pending: return copy.deepcopy(self._pending[path])
+            key = self._stat_key(path)
+            if key is None:
+                self._docs.pop(path, None)
+                return None
+            cached = self._docs.get(path)
+            if not cached or cached[0] != key:
+                with open(path, 'r') as f:
+                    cached = (key, json.load(f))
+                self._docs[path] = cached
+            return copy.deepcopy(cached[1])
+
+    def save(self, path, data):
+        """Menjadwalkan penulisan `data`. File yang belum ada, atau yang penulisan sebelumnya gagal,
+        langsung ditulis; OSError diteruskan dan data tetap menunggu untuk dicoba lagi."""
+        data = copy.deepcopy(data)
+        with self._lock:
+            cached = self._docs.get(path)
+            if path not in self._pending and cached and cached[1] == data and self._stat_key(path) == cached[0]:
+                return  # Tidak ada perubahan
+            self._pending[path] = data
+            if not os.path.exists(path) or path in self._errors:
+                self._flush_path(path); return
+            if path not in self._timers:
+                timer = threading.Timer(CONFIG_SAVE_DELAY, self._flush_timer, args=(path,))
+                timer.daemon = True
+                self._timers[path] = timer
+                timer.start()
+
+    def flush(self):
+        with self._lock:
+            for path in list(self._pending):
+                self._flush_timer(path)
+
+    def write_errors(self):
+        """{path: OSError} untuk dokumen yang penulisan terakhirnya gagal dan masih menunggu."""
+        with self._lock:
+            return dict(self._errors)
+
+    def _flush_timer(self, path):
+        try:
+            self._flush_path(path)
+        except OSError:
+            pass  # Sudah dicatat di `_errors`; ditampilkan saat load/save berikutnya
+
+    def _flush_path(self, path):
+        with self._lock:
+            timer = self._timers.pop(path, None)
+            if timer: timer.cancel()
+            data = self._pending.get(path)
+            if data is None: return
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                self._errors[path] = e
+                raise
+            del self._pending[path]
+            self._errors.pop(path, None)
+            self._docs[path] = (self._stat_key(path), data)
+
+    @staticmethod
+    def _stat_key(path):
+        try:
+            st_ = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st_.st_mtime_ns, st_.st_size)
+
+@st.cache_resource
+def get_config_store():
+    """Penyimpanan konfigurasi tunggal yang dibagikan ke semua sesi."""
+    return JsonConfigStore()
+
+def load_server_config():
+    """
+    Memuat konfigurasi global dari file server_list.json (lewat cache, lihat JsonConfigStore).
+    Jika file tidak ada atau rusak, file akan dibuat ulang.
+    Fungsi ini juga menetapkan active_server di session_state.
+    """
+    for path, error in get_config_store().write_errors().items():
+        st.error(f"❌ Gagal menyimpan `{os.path.basename(path)}`: {error}. Perubahan disimpan sementara dan akan dicoba lagi.")
+    try:
+        config = get_config_store().load(SERVER_CONFIG_PATH)
+    except (json.JSONDecodeError, TypeError):
+        st.warning("⚠️ File server_list.json rusak. Membuat file baru dari template.")
+        save_server_config(INITIAL_CONFIG)
+        return
+    if config is not None:
+        # Pastikan semua kunci proxy ada untuk menghindari error
+        for key, value in INITIAL_CONFIG.items():
+            if key.endswith("_proxy") and key not in config:
+                config[key] = value
+        st.session_state.server_config = config
+        # PERBAIKAN KUNCI: Set active_server di state dari file config
+        st.session_state.active_server = config.get('server_in_use', None)
+    else:
+        st.session_state.server_config = INITIAL_CONFIG
+        st.session_state.active_server = None
+
+def save_server_config(config_data=None):
+    """Menyimpan data konfigurasi ke server_list.json dan menyinkronkan state."""
+    if config_data is None:
+        config_data = st.session_state.server_config
+    try:
+        get_config_store().save(SERVER_CONFIG_PATH, config_data)
+    except OSError as e:
+        st.error(f"❌ Gagal menulis server_list.json: {e}. Perubahan disimpan sementara dan akan dicoba lagi.")
+    # Pastikan session_state selalu sinkron setelah menyimpan
+    st.session_state.server_config = config_data
+    st.session_state.active_server = config_data.get('server_in_use')
+
+def get_colab_config(server_name):
+    """Membaca file colabconfig.json untuk server tertentu."""
+    if not server_name: return {}
+    try:
+        return get_config_store().load(os.path.join(DRIVE_PATH, server_name, 'colabconfig.json')) or {}
+    except json.JSONDecodeError:
+        return {}
+
+def save_colab_config(server_name, data):
+    """Menyimpan data ke colabconfig.json untuk server tertentu."""
+    try:
+        get_config_store().save(os.path.join(DRIVE_PATH, server_name, 'colabconfig.json'), data)
+    except OSError as e:
+        st.error(f"❌ Gagal menulis colabconfig.json: {e}. Perubahan disimpan sementara dan akan dicoba lagi.")
+
+def _parse_bedrock_link(content):
+    soup = BeautifulSoup(content, "html.parser")
+    link = soup.find('a', href=re.compile(r'https://minecraft\.azureedge\.net/bin-linux/bedrock-server-.*\.zip'))
+    return link['href'] if link else None
+
+def _parse_forge_versions(content):
+    soup = BeautifulSoup(content, "html.parser")
+    return [a.text.strip() for a in soup.select('.versions-list a')]
+
+def _parse_forge_installer_link(content):
+    soup = BeautifulSoup(content, "html.parser")
+    installer_link_tag = soup.find('div', class_='link-boosted').find('a')
+    if installer_link_tag and 'href' in installer_link_tag.attrs:
+        return installer_link_tag['href'].split('url=')[-1]
+    return None
+
+def fetch_bedrock_download_link():
+    """Mengambil link download Bedrock dari sumber utama atau backup tanpa menyentuh UI.
+    Aman dipanggil dari thread latar; error dari sumber backup diteruskan ke pemanggil."""
+    client = get_http_client()
+    try:
+        link = client.get_parsed("https://www.minecraft.net/en-us/download/server/bedrock/", _parse_bedrock_link)
+        if link: return link
+    except requests.exceptions.RequestException:
+        pass  # Situs resmi gagal, lanjut ke backup
+    return client.get("https://raw.githubusercontent.com/MinaasaZillowArte/Minecraft-Bedrock-Server-Updater/main/backup_download_link.txt").decode().strip()
+
+def get_bedrock_download_link():
+    """Mengambil link download Bedrock dari sumber utama atau backup, persis seperti di minelab."""
+    try:
+        return fetch_bedrock_download_link()
+    except Exception as e:
+        st.error(f"Gagal mengambil link dari backup: {e}")
+    return None
+
+def get_server_info(command, server_type=None, version=None):
+    """Fungsi komprehensif dari minelab.py untuk mendapatkan info server, tanpa penyederhanaan.
+    Semua request melewati klien metadata bersama sehingga rerun halaman memakai cache."""
+    try:
+        return fetch_server_info(command, server_type, version)
+    except Exception as e:
+        st.error(f"Gagal mengambil info server untuk {server_type} {version}: {e}")
+    return None
+
+def fetch_server_info(command, server_type=None, version=None):
+    """Inti dari `get_server_info` tanpa UI: melempar exception alih-alih menampilkan error,
+    sehingga bisa dipakai oleh prefetcher di thread latar."""
+    client = get_http_client()
+    if command == "GetServerTypes":
+        return ['vanilla', 'paper', 'purpur', 'fabric', 'forge', 'folia', 'velocity', 'bedrock', 'mohist', 'arclight', 'snapshot', 'banner']
+    
+    elif command == "GetVersions":
+        if not server_type: return []
+        if server_type == "bedrock":
+            link = fetch_bedrock_download_link()
+            if not link: return ["latest"]
+            match = re.search(r'bedrock-server-([\d\.]+)\.zip', link)
+            return [match.group(1)] if match else ["latest"]
+        elif server_type in ['vanilla', 'snapshot']:
+            r = client.get_json('https://launchermeta.mojang.com/mc/game/version_manifest.json')
+            stype = 'release' if server_type == 'vanilla' else 'snapshot'
+            return [v['id'] for v in r['versions'] if v['type'] == stype]
+        elif server_type in SERVER_API_URLS:
+            return client.get_json(SERVER_API_URLS[server_type]).get("versions", [])
+        elif server_type == 'fabric':
+            return [v['version'] for v in client.get_json('https://meta.fabricmc.net/v2/versions/game') if v.get('stable', False)]
+        elif server_type == 'forge':
+            return client.get_parsed('https://files.minecraftforge.net/net/minecraftforge/forge/index.html', _parse_forge_versions)
+        elif server_type == "arclight":
+            r = client.get_json('https://files.hypoglycemia.icu/v1/files/arclight/minecraft')
+            return [hit['name'] for hit in r.get('files', [])]
+        return []
+
+    elif command == "GetDownloadUrl":
+        info = fetch_server_info("GetDownloadInfo", server_type, version)
+        return info["url"] if info else None
+
+    elif command == "GetDownloadInfo":
+        # {"url": ..., "hash": (algoritma, hex) atau None} — hash diisi jika API upstream menerbitkannya
+        if not server_type or (server_type != 'bedrock' and not version): return None
+        if server_type == 'bedrock':
+            link = fetch_bedrock_download_link()
+            return {"url": link, "hash": None} if link else None
+        elif server_type in ['vanilla', 'snapshot']:
+            manifest = client.get_json('https://launchermeta.mojang.com/mc/game/version_manifest.json')
+            version_url = next((v['url'] for v in manifest['versions'] if v['id'] == version), None)
+            if not version_url: return None
+            server_download = client.get_json(version_url)['downloads']['server']
+            return {"url": server_download['url'], "hash": ('sha1', server_download['sha1']) if server_download.get('sha1') else None}
+        elif server_type in SERVER_API_URLS: # paper, purpur, velocity, folia, mohist, banner
+            if server_type == 'purpur':
+                 build = client.get_json(f'https://api.purpurmc.org/v2/purpur/{version}')["builds"]["latest"]
+                 md5 = client.get_json(f'https://api.purpurmc.org/v2/purpur/{version}/{build}').get("md5")
+                 return {"url": f'https://api.purpurmc.org/v2/purpur/{version}/{build}/download', "hash": ('md5', md5) if md5 else None}
+            elif server_type in ['mohist', 'banner']:
+                 return {"url": client.get_json(f'https://mohistmc.com/api/v2/projects/{server_type}/{version}/builds')["builds"][-1]["url"], "hash": None}
+            else: # paper, velocity, folia
+                # Endpoint /builds sudah memuat nama jar dan sha256 tiap build, cukup satu request
+                builds_url = f'{SERVER_API_URLS[server_type]}/versions/{version}/builds'
+                build = client.get_json(builds_url)["builds"][-1]
+                application = build["downloads"]["application"]
+                return {"url": f'{builds_url}/{build["build"]}/downloads/{application["name"]}', "hash": ('sha256', application["sha256"]) if application.get("sha256") else None}
+        elif server_type == 'fabric':
+            api_url = f'https://meta.fabricmc.net/v2/versions/loader/{version}'
+            loaders = client.get_json(api_url)
+            if not loaders: return None
+            loader_ver = loaders[0]["loader"]["version"]
+            installer_ver_url = 'https://meta.fabricmc.net/v2/versions/installer'
+            installer_ver = client.get_json(installer_ver_url)[0]["version"]
+            return {"url": f"https://meta.fabricmc.net/v2/versions/loader/{version}/{loader_ver}/{installer_ver}/server/jar", "hash": None}
+        elif server_type == 'forge':
+            link = client.get_parsed(f'https://files.minecraftforge.net/net/minecraftforge/forge/index_{version}.html', _parse_forge_installer_link)
+            return {"url": link, "hash": None} if link else None
+    return None
+
+def download_file(url, directory, filename, expected_hash=None, cache_key=None):
+    """Mengunduh file dengan progress bar visual. Unduhan yang terputus dilanjutkan dari
+    file `.part` pada percobaan berikutnya, dan diverifikasi jika `expected_hash` diberikan.
+    Jika `cache_key` diberikan, artefak diambil dari/disimpan ke cache jar bersama."""
+    os.makedirs(directory, exist_ok=True)
+    filepath = os.path.join(directory, filename)
+    cache = get_artifact_cache() if cache_key else None
+    if cache:
+        blob = cache.lookup(cache_key, expected_hash)
+        if blob:
+            method = link_or_copy(blob, filepath)
+            st.success(f"✅ '{filename}' diambil dari cache jar ({method}).")
+            return True
+
+    progress_bar = st.progress(0, text=f"Menyiapkan unduhan untuk {filename}...")
+    status_text = st.empty()
+    started = time.monotonic()
+
+    def on_progress(bytes_downloaded, total_size):
+        speed = bytes_downloaded / max(time.monotonic() - started, 1e-6) / (1024*1024)
+        if total_size > 0:
+            progress = min(int((bytes_downloaded / total_size) * 100), 100)
+            progress_bar.progress(progress, text=f"Mengunduh... {progress}%")
+            status_text.text(f"{bytes_downloaded / (1024*1024):.2f} MB / {total_size / (1024*1024):.2f} MB ({speed:.1f} MB/s)")
+        else:
+            status_text.text(f"{bytes_downloaded / (1024*1024):.2f} MB ({speed:.1f} MB/s)")
+
+    try:
+        target = cache.incoming_path(cache_key) if cache else filepath
+        ResumableDownload(url, target, expected_hash).run(on_progress)
+        if cache: link_or_copy(cache.put(cache_key, target), filepath)
+        status_text.success(f"✅ Unduhan '{filename}' selesai!" + (" Checksum cocok." if expected_hash else ""))
+        progress_bar.empty()
+        return True
+    except DownloadError as e:
+        status_text.error(f"Gagal mengunduh file: {e}")
+        return False
+    except OSError as e:  # Disk penuh, Drive terputus, izin, dll. saat menulis file/cache
+        status_text.error(f"Gagal menyimpan file '{filename}': {e}")
+        return False
+
+def kill_process(proc, name="Proses"):
+    """Menghentikan proses subprocess dengan aman, menggunakan SIGTERM lalu SIGKILL."""
+    if proc and proc.poll() is None:
+        st.warning(f"Mengirim sinyal penghentian ke {name} (PID: {proc.pid})...")
+        try:
+            # Menggunakan os.kill untuk kontrol yang lebih baik
+            os.kill(proc.pid, signal.SIGTERM)
+            proc.wait(timeout=10)
+            st.success(f"{name} berhasil dihentikan.")
+        except (ProcessLookupError, AttributeError):
+             st.info(f"{name} sudah tidak berjalan.")
+        except subprocess.TimeoutExpired:
+            st.error(f"{name} tidak merespon, menghentikan secara paksa (KILL).")
+            os.kill(proc.pid, signal.SIGKILL)
+            proc.wait()
+        except Exception as e:
+            st.error(f"Error saat menghentikan proses: {e}")
+
+def install_java(version_str):
+    """Memastikan versi Java yang benar terinstal, dari logika minelab."""
+    try:
+        # Mengambil hanya angka dari versi, cth: 1.20.1 -> (1, 20, 1)
+        version_tuple = tuple(map(int, re.findall(r'\d+', version_str)))
+    except (ValueError, IndexError):
+        st.warning(f"Tidak dapat mendeteksi versi Java untuk '{version_str}'. Menggunakan Java 17 sebagai default.")
+        version_tuple = (1, 17)
+
+    java_needed = 8
+    if version_tuple >= (1, 20, 5):
+        java_needed = 21
+    elif version_tuple >= (1, 17, 0):
+        java_needed = 17
+    elif version_tuple >= (1, 12, 0):
+        java_needed = 8
+
+    # Cek versi Java yang aktif
+    result = subprocess.run('java -version', shell=True, capture_output=True, text=True)
+    current_java_version = result.stderr
+    
+    if f'version "{java_needed}.' in current_java_version:
+        st.toast(f"Java {java_needed} sudah aktif.")
+        return True
+
+    with st.spinner(f"Menginstal OpenJDK {java_needed}... Ini mungkin butuh beberapa saat."):
+        install_cmd = f'sudo apt-get update -qq && sudo apt-get install -y openjdk-{java_needed}-jre-headless -qq'
+        if run_command(install_cmd) is not None:
+            # Set Java version
+            run_command(f'sudo update-alternatives --set java /usr/lib/jvm/java-{java_needed}-openjdk-amd64/bin/java')
+            st.success(f"OpenJDK {java_needed} berhasil diinstal dan diaktifkan.")
+            return True
+        else:
+            st.error(f"Gagal menginstal OpenJDK {java_needed}.")
+            return False
+
+# =================================================================================
+# BUFFER LOG KONSOL
+# Thread pembaca stdout per proses server yang menampung baris ke ring buffer
+# berkapasitas tetap, sehingga UI cukup menarik "baris sejak seq N" per refresh.
+# =================================================================================
+
+class LogBuffer:
+    """Ring buffer thread-safe untuk baris log dengan nomor urut (seq) monotonik."""
+
+    def __init__(self, capacity=LOG_BUFFER_CAPACITY):
+        self._entries = deque(maxlen=capacity)  # (waktu_terima, baris)
+        self._next_seq = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+    @property
+    def next_seq(self):
+        """Nomor urut yang akan diberikan ke baris berikutnya."""
+        return self._next_seq
+
+    def append(self, line):
+        with self._cond:
+            self._entries.append((time.time(), line))
+            self._next_seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Menandai bahwa sumber log sudah selesai (proses berhenti)."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def entries_since(self, seq):
+        """Mengembalikan ([(waktu, baris), ...], seq_berikutnya) untuk semua baris sejak `seq`.
+        Baris yang sudah tergeser dari buffer dilewati."""
+        with self._cond:
+            first_seq = self._next_seq - len(self._entries)
+            start = max(seq, first_seq)
+            batch = list(itertools.islice(self._entries, start - first_seq, None))
+            return batch, self._next_seq
+
+    def since(self, seq):
+        """Seperti `entries_since`, tetapi hanya mengembalikan teks barisnya."""
+        batch, next_seq = self.entries_since(seq)
+        return [line for _, line in batch], next_seq
+
+    def wait_for(self, seq, timeout=None):
+        """Menunggu sampai ada baris dengan nomor urut >= `seq` atau buffer ditutup."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_seq > seq or self.closed, timeout)
+
+    def wait_for_match(self, pattern, since_seq, timeout):
+        """Menunggu baris sejak `since_seq` yang cocok dengan regex `pattern`; None jika timeout."""
+        deadline = time.monotonic() + timeout
+        seq = since_seq
+        while True:
+            lines, seq = self.since(seq)
+            for line in lines:
+                if pattern.search(line): return line
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.closed: return None
+            self.wait_for(seq, remaining)
+
+def _log_pump(stream, buffer, is_alive=None, on_exit=None):
+    """Loop thread pembaca: menguras stream biner secara terus-menerus ke LogBuffer.
+    Jika `is_alive` diberikan, stream diperlakukan sebagai file yang di-tail sampai proses mati."""
+    pending, exited = b'', False
+    try:
+        while True:
+            chunk = stream.readline()
+            if chunk:
+                pending += chunk
+                if pending.endswith(b'\n'):
+                    buffer.append(pending.decode('utf-8', 'replace').rstrip('\r\n'))
+                    pending = b''
+                continue
+            if is_alive is None or exited:
+                break
+            if not is_alive():
+                exited = True  # Kuras sisa output terakhir sebelum berhenti
+                continue
+            time.sleep(LOG_TAIL_INTERVAL)
+        if pending:
+            buffer.append(pending.decode('utf-8', 'replace').rstrip('\r\n'))
+    except (ValueError, OSError):
+        pass  # Stream ditutup saat proses dihentikan
+    finally:
+        stream.close()
+        buffer.close()
+        if on_exit: on_exit()
+
+def start_log_pump(log_path, is_alive, buffer=None, offset=0, on_exit=None):
+    """Menjalankan thread daemon yang men-tail file konsol `log_path` ke dalam LogBuffer."""
+    buffer = buffer or LogBuffer()
+    stream = open(log_path, 'rb')
+    if offset:
+        stream.seek(offset)
+        stream.readline()  # Lewati baris yang terpotong
+    thread = threading.Thread(target=_log_pump, args=(stream, buffer, is_alive, on_exit), name=f"log-pump-{os.path.basename(os.path.dirname(log_path))}", daemon=True)
+    thread.start()
+    return buffer
+
+# =================================================================================
+# SUPERVISOR PROSES SERVER
+# Registry tingkat proses (bukan per sesi Streamlit) yang memiliki proses server,
+# tunnel, buffer log, dan stdin. PID dicatat ke disk agar server yang masih berjalan
+# dapat diadopsi kembali setelah dashboard di-restart.
+# =================================================================================
+
+def _read_proc_start_time(pid):
+    """Membaca waktu mulai proses (clock ticks sejak boot) dari /proc, None jika proses tidak ada."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    if fields[0] == 'Z': return None  # Zombie dianggap sudah mati
+    return int(fields[19])
+
+class _AdoptedProcess:
+    """Pengganti minimal `Popen` untuk proses yang diadopsi dari sesi dashboard sebelumnya."""
+
+    def __init__(self, pid, start_time):
+        self.pid = pid
+        self._start_time = start_time
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and _read_proc_start_time(self.pid) != self._start_time:
+            self.returncode = 0  # Kode keluar asli tidak dapat diketahui
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout)
+            time.sleep(0.2)
+        return self.returncode
+
+class ManagedServer:
+    """Satu proses server yang dimiliki supervisor beserta log, stdin, dan tunnel-nya."""
+
+    def __init__(self, name, proc, run_dir, server_type, log_buffer, tunnel_address=None, tunnel_pid=None, tunnel_provider=None):
+        self.name = name
+        self.proc = proc
+        self.run_dir = run_dir
+        self.server_type = server_type
+        self.log_buffer = log_buffer
+        self.tunnel_address = tunnel_address
+        self.tunnel_pid = tunnel_pid
+        self.tunnel_provider = tunnel_provider
+        self.stop_requested = False
+        self.stager = None  # StagedRun jika server dijalankan dari disk lokal
+        self.pregen = None  # PregenJob yang sedang/terakhir berjalan
+        self.metrics = None  # MetricsCollector selama proses hidup
+        self.prober = None  # StatusProber selama proses hidup
+        self.pipeline = None  # LogPipeline beserta subscriber-nya (sessions, alerts)
+        self.sessions = None
+        self.alerts = None
+        self.rcon = None  # RconClient persisten (lihat `get_rcon`)
+        self.rcon_retry_at = 0.0
+        self._rcon_lock = threading.Lock()
+        self._stdin_lock = threading.Lock()
+        self._save_pause_lock = threading.Lock()  # Jeda penyimpanan bersama (lihat `pause_world_saves`)
+        self._save_pause_count = 0
+        self._save_pause_ok = False
+
+    @property
+    def stdin_path(self):
+        return os.path.join(self.run_dir, 'stdin')
+
+    @property
+    def console_path(self):
+        return os.path.join(self.run_dir, 'console.log')
+
+    @property
+    def server_path(self):
+        """Folder tempat proses berjalan: folder stage untuk staged run, selain itu folder Drive."""
+        return self.stager.stage_dir if self.stager else os.path.join(DRIVE_PATH, self.name)
+
+    def is_running(self):
+        return self.proc.poll() is None
+
+    def send_command(self, command, echo=True):
+        """Menulis satu perintah ke stdin server melalui FIFO. Mengembalikan False jika gagal."""
+        try:
+            with self._stdin_lock:
+                fd = os.open(self.stdin_path, os.O_WRONLY | os.O_NONBLOCK)
+                try: os.write(fd, (command + "\n").encode('utf-8'))
+                finally: os.close(fd)
+        except OSError:
+            return False
+        if echo: self.log_buffer.append(f"> {command}")
+        return True
+
+    def to_state(self):
+        return {
+            "pid": self.proc.pid, "start_time": _read_proc_start_time(self.proc.pid),
+            "server_type": self.server_type, "tunnel_address": self.tunnel_address,
+            "tunnel_pid": self.tunnel_pid, "tunnel_provider": self.tunnel_provider, "stage": self.stager.to_state() if self.stager else None,
+            "saved_at": datetime.now().isoformat()
+        }
+
+class ServerSupervisor:
+    """Registry singleton (per proses Streamlit) untuk semua server yang sedang berjalan."""
+
+    def __init__(self, runtime_dir=RUNTIME_DIR):
+        self.runtime_dir = runtime_dir
+        self._servers = {}
+        self._lock = threading.RLock()
+        os.makedirs(runtime_dir, exist_ok=True)
+        self._adopt_running_servers()
+
+    def get(self, name):
+        """Mengembalikan ManagedServer untuk `name` (berjalan atau baru saja berhenti), atau None."""
+        with self._lock:
+            return self._servers.get(name)
+
+    def is_running(self, name):
+        managed = self.get(name)
+        return managed is not None and managed.is_running()
+
+    def start(self, name, cmd_list, cwd, server_type, log_buffer=None, stager=None, profiler=None):
+        """Menjalankan server dengan stdout ke file konsol lokal dan stdin dari FIFO.
+        Jika `stager` diberikan, server berjalan dari folder stage dan disinkronkan ke Drive."""
+        with self._lock:
+            if self.is_running(name):
+                raise RuntimeError(f"Server '{name}' sudah berjalan (PID {self._servers[name].proc.pid}).")
+            previous = self._servers.get(name)
+            if previous and previous.stager and not previous.stager.final_done.is_set():
+                raise RuntimeError(f"Sinkronisasi akhir '{name}' ke Drive masih berjalan, coba lagi sebentar.")
+            run_dir = os.path.join(self.runtime_dir, name)
+            os.makedirs(run_dir, exist_ok=True)
+            stdin_path = os.path.join(run_dir, 'stdin')
+            if not os.path.exists(stdin_path): os.mkfifo(stdin_path)
+            # Server memegang FIFO dalam mode baca-tulis agar tidak pernah menerima EOF saat dashboard mati
+            stdin_fd = os.open(stdin_path, os.O_RDWR)
+            console_path = os.path.join(run_dir, 'console.log')
+            try:
+                with open(console_path, 'wb') as console:
+                    proc = subprocess.Popen(
+                        cmd_list, cwd=cwd, stdout=console, stderr=subprocess.STDOUT, stdin=stdin_fd,
+                        preexec_fn=os.setsid # Penting untuk mengelola grup proses
+                    )
+            finally:
+                os.close(stdin_fd)
+            managed = ManagedServer(name, proc, run_dir, server_type, log_buffer or LogBuffer())
+            start_log_pump(console_path, lambda: proc.poll() is None, managed.log_buffer, on_exit=lambda: self._forget_state(managed))
+            if stager:
+                managed.stager = stager
+                stager.start_periodic(managed)
+            self._servers[name] = managed
+            self.save_state(managed)
+            self._start_companions(managed, adopted=False, profiler=profiler)
+            return managed
+
+    def _start_companions(self, managed, adopted, profiler=None):
+        """Thread pendamping per server: metrik, ping status, pipeline event log, dan pre-generasi."""
+        managed.metrics = MetricsCollector(managed).start()
+        managed.prober = StatusProber(managed).start()
+        managed.pipeline = attach_log_pipeline(managed)
+        if profiler: profiler.attach(managed)
+        # Server yang diadopsi: ekor konsol yang diputar ulang berisi event lama dengan waktu tiba
+        # baru (join/leave palsu di player_sessions.jsonl), jadi mulai dari baris berikutnya
+        managed.pipeline.start(since_seq=managed.log_buffer.next_seq if adopted else 0)
+        resume_pending_pregen(managed, wait_ready=not adopted)
+
+    def set_tunnel(self, name, address, pid=None, provider=None):
+        managed = self.get(name)
+        if managed:
+            managed.tunnel_address, managed.tunnel_pid, managed.tunnel_provider = address, pid, provider
+            if managed.prober: managed.prober.probe_now()
+            if managed.is_running(): self.save_state(managed)
+
+    def stop_tunnel(self, name):
+        """Menghentikan tunnel milik server `name` saja lewat `tunnel_pid` yang tersimpan (juga untuk
+        server yang diadopsi). Jika proses ngrok itu masih dipakai server lain yang berjalan, hanya
+        tunnel-nya yang diputus."""
+        managed = self.get(name)
+        if not managed or not managed.tunnel_address: return
+        pid = managed.tunnel_pid
+        with self._lock:
+            shared = any(other is not managed and other.tunnel_pid == pid and other.is_running() for other in self._servers.values())
+        if shared:
+            try: ngrok.disconnect(managed.tunnel_address)
+            except PyngrokError: pass  # Tunnel dibuat sesi lain; berakhir bersama proses ngrok-nya
+        elif pid and _read_proc_start_time(pid) is not None:
+            try: os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError: pass
+        self.set_tunnel(name, None)
+
+    def save_state(self, managed):
+        with open(os.path.join(managed.run_dir, 'state.json'), 'w') as f:
+            json.dump(managed.to_state(), f, indent=4)
+
+    def _forget_state(self, managed):
+        try: os.remove(os.path.join(managed.run_dir, 'state.json'))
+        except FileNotFoundError: pass
+
+    def _adopt_running_servers(self):
+        """Mengadopsi server dari state.json yang PID-nya masih hidup, menghapus state yang basi."""
+        for name in os.listdir(self.runtime_dir):
+            run_dir = os.path.join(self.runtime_dir, name)
+            state_path = os.path.join(run_dir, 'state.json')
+            if not os.path.isfile(state_path): continue
+            try:
+                with open(state_path) as f: state = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                state = {}
+            pid, start_time = state.get('pid'), state.get('start_time')
+            if not pid or start_time is None or _read_proc_start_time(pid) != start_time:
+                os.remove(state_path)
+                continue
+            proc = _AdoptedProcess(pid, start_time)
+            tunnel_pid = state.get('tunnel_pid')
+            tunnel_alive = bool(tunnel_pid) and _read_proc_start_time(tunnel_pid) is not None
+            managed = ManagedServer(
+                name, proc, run_dir, state.get('server_type'), LogBuffer(),
+                tunnel_address=state.get('tunnel_address') if tunnel_alive else None,
+                tunnel_pid=tunnel_pid if tunnel_alive else None,
+                tunnel_provider=state.get('tunnel_provider') if tunnel_alive else None
+            )
+            console_path = managed.console_path
+            size = os.path.getsize(console_path) if os.path.exists(console_path) else 0
+            if not os.path.exists(console_path): open(console_path, 'wb').close()
+            managed.log_buffer.append(f"[{datetime.now():%H:%M:%S}] Server diadopsi kembali (PID {pid}).")
+            if state.get('stage'):
+                managed.stager = StagedRun(state['stage']['drive_dir'], state['stage']['stage_dir'])
+                managed.stager.start_periodic(managed)
+            start_log_pump(console_path, lambda p=proc: p.poll() is None, managed.log_buffer,
+                           offset=max(0, size - LOG_ADOPT_TAIL_BYTES), on_exit=lambda m=managed: self._forget_state(m))
+            self._servers[name] = managed
+            self._start_companions(managed, adopted=True)
+
+@st.cache_resource
+def get_supervisor():
+    """Supervisor tunggal yang dibagikan ke semua sesi dan rerun Streamlit."""
+    return ServerSupervisor()
+
+# =================================================================================
+# KANAL PERINTAH RCON
+# Koneksi RCON persisten per server Java: perintah diantrekan dan dikirim satu per satu
+# (satu paket per penulisan, karena server vanilla/Paper memutus klien bila dua paket
+# tiba dalam satu read). Bedrock tidak punya RCON sehingga perintahnya tetap lewat stdin.
+# =================================================================================
+
+class RconError(Exception):
+    """Gagal login, koneksi terputus, atau respons RCON tidak datang tepat waktu."""
+
+def _rcon_packet(request_id, packet_type, body):
+    payload = struct.pack('<ii', request_id, packet_type) + body.encode('utf-8') + b'\x00\x00'
+    return struct.pack('<i', len(payload)) + payload
+
+def read_rcon_settings(server_path):
+    """(port, password) dari server.properties jika RCON aktif, selain itu None."""
+    properties_path = os.path.join(server_path, 'server.properties')
+    if not os.path.exists(properties_path): return None
+    properties = PropertiesDocument(properties_path)
+    def value(key): return properties.raw.get(key, '').strip()
+    if value('enable-rcon').lower() != 'true' or not value('rcon.password'): return None
+    return int(value('rcon.port') or RCON_DEFAULT_PORT), value('rcon.password')
+
+def ensure_rcon_enabled(server_path):
+    """Mengaktifkan RCON di server.properties dengan password acak jika belum ada.
+    File dibuat bila belum ada; server akan melengkapi properti lainnya saat start pertama."""
+    properties = PropertiesDocument(os.path.join(server_path, 'server.properties'))
+    changes = {}
+    for key, default in (('enable-rcon', 'true'), ('rcon.port', str(RCON_DEFAULT_PORT)),
+                         ('rcon.password', secrets.token_urlsafe(18)), ('broadcast-rcon-to-ops', 'false')):
+        current = properties.raw.get(key, '').strip()
+        if not current or (key == 'enable-rcon' and current.lower() != 'true'):
+            changes[key] = default
+    return bool(properties.save(changes))
+
+class RconClient:
+    """Klien RCON dengan thread pembaca. Perintah diantrekan dan hanya satu yang berjalan per
+    koneksi: paket perintah dikirim sendiri, lalu setelah paket respons pertamanya datang
+    dikirim paket penanda (tipe tak dikenal yang dijawab server setelah respons perintah
+    selesai), sehingga respons yang terpecah ke beberapa paket tetap diakhiri dengan benar."""
+
+    def __init__(self, host, port, password, timeout=RCON_TIMEOUT):
+        self.host, self.port, self.password, self.timeout = host, port, password, timeout
+        self.closed = True
+        self._ids = itertools.count(1)
+        self._queue = deque()  # (perintah, Future) yang menunggu giliran
+        self._current = None  # [id perintah, id penanda atau None, [bagian respons], Future]
+        self._lock = threading.RLock()  # Menjaga antrean, perintah berjalan, dan penulisan socket
+        self._sock = None
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            sock.sendall(_rcon_packet(0, RCON_TYPE_LOGIN, self.password))
+            while True:
+                request_id, packet_type, _ = self._read_packet(sock)
+                if packet_type == RCON_TYPE_COMMAND: break  # Respons auth memakai tipe 2
+            if request_id == -1: raise RconError("Password RCON ditolak")
+        except (OSError, struct.error) as e:
+            sock.close(); raise RconError(f"Login RCON gagal: {e}") from e
+        except RconError:
+            sock.close(); raise
+        sock.settimeout(None)
+        self._sock, self.closed = sock, False
+        threading.Thread(target=self._reader, name=f"rcon-{self.port}", daemon=True).start()
+        return self
+
+    @staticmethod
+    def _read_packet(sock):
+        size = struct.unpack('<i', _recv_exact(sock, 4))[0]
+        data = _recv_exact(sock, size)
+        request_id, packet_type = struct.unpack_from('<ii', data)
+        return request_id, packet_type, data[8:-2].decode('utf-8', 'replace')
+
+    def _reader(self):
+        try:
+            while True:
+                request_id, _, body = self._read_packet(self._sock)
+                with self._lock:
+                    current = self._current
+                    if not current: continue
+                    if request_id == current[0]:
+                        current[2].append(body)
+                        if current[1] is None:
+                            # Penanda baru dikirim setelah respons pertama, jadi tidak pernah ada dua paket sekaligus
+                            current[1] = next(self._ids)
+                            self._sock.sendall(_rcon_packet(current[1], RCON_TYPE_RESPONSE, ''))
+                    elif request_id == current[1]:
+                        self._current = None
+                        current[3].set_result(''.join(current[2]))
+                        self._send_next()
+        except (OSError, struct.error, ConnectionError):
+            pass
+        finally:
+            self.close()
+
+    def _send_next(self):
+        """Mengirim perintah berikutnya dari antrean; dipanggil dengan `_lock` dipegang."""
+        while self._queue and not self._current:
+            command, future = self._queue.popleft()
+            if future.cancelled(): continue
+            self._current = [next(self._ids), None, [], future]
+            self._sock.sendall(_rcon_packet(self._current[0], RCON_TYPE_COMMAND, command))
+
+    def submit(self, command):
+        """Mengantrekan perintah tanpa menunggu respons; mengembalikan Future berisi teks respons."""
+        future = Future()
+        with self._lock:
+            if self.closed: raise RconError("Koneksi RCON tertutup")
+            self._queue.append((command, future))
+            try:
+                self._send_next()
+            except OSError as e:
+                self.close(); raise RconError(f"Gagal mengirim perintah RCON: {e}") from e
+        return future
+
+    def command(self, command, timeout=None):
+        """Menjalankan satu perintah dan menunggu responsnya. Tanpa respons tepat waktu koneksi
+        ditutup, karena antrean tidak bisa maju melewati perintah yang macet."""
+        try:
+            return self.submit(command).result(timeout or self.timeout)
+        except FutureTimeoutError as e:
+            self.close()
+            raise RconError(f"Tidak ada respons RCON untuk '{command}'") from e
+
+    def close(self):
+        with self._lock:
+            if self._sock:
+                try: self._sock.close()
+                except OSError: pass
+            self.closed = True
+            futures = [future for _, future in self._queue] + ([self._current[3]] if self._current else [])
+            self._queue.clear(); self._current = None
+        for future in futures:
+            if not future.done(): future.set_exception(RconError("Koneksi RCON terputus"))
+
+def get_rcon(managed):
+    """Koneksi RCON persisten milik server yang berjalan (dibuat ulang bila terputus), atau None
+    untuk Bedrock/Velocity, RCON nonaktif, atau server yang belum siap menerima RCON."""
+    if managed.server_type in ('bedrock', 'velocity') or not managed.is_running(): return None
+    with managed._rcon_lock:
+        if managed.rcon and not managed.rcon.closed: return managed.rcon
+        if time.monotonic() < managed.rcon_retry_at: return None
+        try:
+            settings = read_rcon_settings(managed.server_path)
+            managed.rcon = RconClient('127.0.0.1', *settings).connect() if settings else None
+        except (OSError, RconError, ValueError):  # ValueError: rcon.port bukan angka
+            managed.rcon = None
+        if not managed.rcon: managed.rcon_retry_at = time.monotonic() + RCON_RETRY_INTERVAL
+        return managed.rcon
+
+def run_server_command(managed, command, timeout=RCON_TIMEOUT, echo=True):
+    """API perintah untuk seluruh dashboard: lewat RCON jika tersedia dan mengembalikan responsnya,
+    selain itu ditulis ke stdin dan mengembalikan None (respons hanya muncul di log)."""
+    rcon = get_rcon(managed)
+    if rcon:
+        try:
+            response = rcon.command(command, timeout)
+            if echo:
+                managed.log_buffer.append(f"> {command}")
+                for line in ANSI_ESCAPE_PATTERN.sub('', response).splitlines(): managed.log_buffer.append(f"  {line}")
+            return response
+        except RconError:
+            pass  # Koneksi putus: kirim lewat stdin, koneksi dibuat ulang pada panggilan berikutnya
+    managed.send_command(command, echo=echo)
+    return None
+
+# =================================================================================
+# KLIEN HTTP METADATA
+# Session requests bersama dengan connection pooling, timeout, dan cache TTL
+# (memori + disk) yang divalidasi ulang lewat ETag/If-Modified-Since.
+# =================================================================================
+
+class MetadataClient:
+    """Klien HTTP bersama untuk semua lookup versi/URL download, dengan cache per endpoint."""
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=METADATA_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0'
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.stats = {'hit': 0, 'miss': 0, 'revalidated': 0, 'stale': 0}
+        self._entries = {}
+        self._url_locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.json'), os.path.join(self.cache_dir, key + '.body')
+
+    def _count(self, kind):
+        with self._lock:
+            self.stats[kind] += 1
+
+    def _load_from_disk(self, url):
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            with open(meta_path) as f: meta = json.load(f)
+            with open(body_path, 'rb') as f: meta['body'] = f.read()
+        except (OSError, json.JSONDecodeError):
+            return None
+        meta['parsed'] = {}
+        return meta
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+        meta_path, body_path = self._cache_paths(url)
+        meta = {k: entry[k] for k in ('etag', 'last_modified', 'fetched_at')}
+        try:
+            for path, data, mode in ((body_path, entry['body'], 'wb'), (meta_path, json.dumps(meta), 'w')):
+                with open(path + '.tmp', mode) as f: f.write(data)
+                os.replace(path + '.tmp', path)
+        except OSError:
+            pass  # Cache disk hanya optimasi
+
+    def _entry(self, url, ttl):
+        """Mengembalikan entri cache yang segar untuk `url`, mengambil/memvalidasi ulang bila perlu."""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            entry = self._load_from_disk(url)
+            if entry is not None:
+                with self._lock: self._entries[url] = entry
+        if entry is not None and time.time() - entry['fetched_at'] < ttl:
+            self._count('hit')
+            return entry
+        # Satu request per URL sekaligus; pemanggil lain menunggu dan memakai hasilnya
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            with self._lock:
+                latest = self._entries.get(url)
+            if latest is not None and time.time() - latest['fetched_at'] < ttl:
+                self._count('hit')
+                return latest
+            return self._fetch(url, latest if latest is not None else entry, ttl)
+
+    def _fetch(self, url, entry, ttl):
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            r = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+            if r.status_code == 304 and entry is not None:
+                entry = dict(entry, fetched_at=time.time())
+                self._store(url, entry)
+                self._count('revalidated')
+                return entry
+            r.raise_for_status()
+        except requests.exceptions.RequestException:
+            if entry is None: raise
+            self._count('stale')  # Jaringan gagal: pakai data lama daripada error
+            # ...dan anggap segar sampai METADATA_STALE_RETRY berlalu, agar rerun/prefetch tidak menunggu timeout lagi
+            entry = dict(entry, fetched_at=time.time() - ttl + METADATA_STALE_RETRY)
+            with self._lock:
+                self._entries[url] = entry
+            return entry
+        entry = {
+            'body': r.content, 'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified'),
+            'fetched_at': time.time(), 'parsed': {}
+        }
+        self._store(url, entry)
+        self._count('miss')
+        return entry
+
+    def get(self, url, ttl=None):
+        """Mengembalikan isi respons (bytes) untuk `url`."""
+        return self._entry(url, ttl)['body']
+
+    def get_parsed(self, url, parse, ttl=None):
+        """Mengembalikan salinan `parse(body)` yang di-memo selama isi respons tidak berubah;
+        pemanggil bebas mengubah hasilnya tanpa merusak cache bersama."""
+        entry = self._entry(url, ttl)
+        key = getattr(parse, '__qualname__', repr(parse))
+        with self._lock:
+            found, parsed = key in entry['parsed'], entry['parsed'].get(key)
+        if not found:
+            value = parse(entry['body'])  # Di luar kunci; hasil thread yang lebih dulu selesai yang dipakai
+            with self._lock:
+                parsed = entry['parsed'].setdefault(key, value)
+        return copy.deepcopy(parsed)
+
+    def get_json(self, url, ttl=None):
+        return self.get_parsed(url, json.loads, ttl)
+
+@st.cache_resource
+def get_http_client():
+    """Klien metadata tunggal yang dibagikan ke semua sesi dan rerun Streamlit."""
+    return MetadataClient()
+
+# =================================================================================
+# PREFETCH METADATA SERVER
+# Menghangatkan cache daftar versi dan resolusi build terbaru untuk semua tipe
+# server secara paralel, agar pergantian tipe di formulir terasa instan.
+# =================================================================================
+
+class MetadataPrefetcher:
+    """Menjalankan `fetch_server_info` untuk semua tipe server di thread pool terbatas.
+    Setiap tipe adalah tugas terpisah sehingga provider yang lambat/gagal tidak menahan yang lain."""
+
+    def __init__(self, max_workers=PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self.status = {}  # tipe -> {"state": "pending"|"ok"|"error", "seconds": float, "error": str}
+
+    def start(self):
+        for server_type in fetch_server_info("GetServerTypes"):
+            with self._lock:
+                if self.status.get(server_type, {}).get("state") == "pending": continue
+                self.status[server_type] = {"state": "pending"}
+            self._executor.submit(self._warm, server_type)
+        return self
+
+    def _warm(self, server_type):
+        started = time.monotonic()
+        try:
+            versions = fetch_server_info("GetVersions", server_type=server_type) or []
+            # Versi pertama adalah default dropdown; versi terakhir adalah yang terbaru di API PaperMC/Purpur
+            for version in dict.fromkeys([versions[0], versions[-1]] if versions else []):
+                fetch_server_info("GetDownloadInfo", server_type=server_type, version=version)
+            result = {"state": "ok", "versions": len(versions)}
+        except Exception as e:
+            result = {"state": "error", "error": str(e)}
+        result["seconds"] = time.monotonic() - started
+        with self._lock:
+            self.status[server_type] = result
+
+@st.cache_resource
+def get_metadata_prefetcher():
+    """Prefetcher tunggal yang dimulai sekali saat dashboard pertama kali dimuat."""
+    return MetadataPrefetcher().start()
+
+# =================================================================================
+# MESIN UNDUHAN
+# Unduhan yang bisa dilanjutkan (HTTP Range), dipecah ke beberapa koneksi paralel
+# untuk file besar, ditulis dengan chunk besar, dan diverifikasi dengan hash.
+# =================================================================================
+
+class DownloadError(Exception):
+    """Unduhan gagal; file parsial disimpan agar bisa dilanjutkan kecuali hash tidak cocok."""
+
+def file_hash(path, algorithm):
+    """Menghitung hash heksadesimal sebuah file dengan membaca per chunk."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResumableDownload:
+    """Satu unduhan ke `filepath` melalui file `.part` dan status segmen di `.part.json`.
+
+    Jika server mendukung Range dan file cukup besar, unduhan dibagi menjadi beberapa
+    segmen yang diunduh paralel dan ditulis langsung ke offset masing-masing."""
+
+    def __init__(self, url, filepath, expected_hash=None, connections=DOWNLOAD_CONNECTIONS):
+        self.url = url
+        self.filepath = filepath
+        self.expected_hash = expected_hash  # (algoritma, hex), mis. ('sha256', 'ab12...')
+        self.connections = connections
+        self.part_path = filepath + '.part'
+        self.state_path = filepath + '.part.json'
+        self.session = get_http_client().session
+        self.total = 0
+        self.segments = []  # [[awal, akhir_inklusif, byte_selesai], ...]
+        self._cancel = threading.Event()
+
+    @property
+    def downloaded(self):
+        return sum(seg[2] for seg in self.segments)
+
+    def _probe(self):
+        """Mengembalikan (ukuran_total, mendukung_range) tanpa mengunduh isi file."""
+        try:
+            with self.session.get(self.url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=HTTP_TIMEOUT) as r:
+                r.raise_for_status()
+                if r.status_code == 206:
+                    match = re.search(r'/(\d+)$', r.headers.get('Content-Range', ''))
+                    if match: return int(match.group(1)), True
+                return int(r.headers.get('Content-Length', 0)), False
+        except requests.exceptions.RequestException as e:
+            raise DownloadError(str(e)) from e
+
+    def _load_state(self, total):
+        try:
+            with open(self.state_path) as f: state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if state.get('url') != self.url or state.get('total') != total or not os.path.exists(self.part_path):
+            return False
+        self.segments = state['segments']
+        return True
+
+    def _save_state(self):
+        with open(self.state_path + '.tmp', 'w') as f:
+            json.dump({'url': self.url, 'total': self.total, 'segments': self.segments}, f)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def _plan(self, total, ranged):
+        if total and ranged and self._load_state(total):
+            return
+        count = self.connections if ranged and total >= DOWNLOAD_SEGMENT_MIN_SIZE else 1
+        size = total // count if total else 0
+        self.segments = [[i * size, (total - 1 if i == count - 1 else (i + 1) * size - 1), 0] for i in range(count)]
+        with open(self.part_path, 'wb') as f:
+            if total and ranged: f.truncate(total)  # Alokasikan agar segmen bisa ditulis ke offset-nya
+
+    def _fetch_segment(self, index, ranged):
+        seg = self.segments[index]
+        start = seg[0] + seg[2]
+        if self.total and start > seg[1]: return
+        headers = {'Range': f'bytes={start}-{seg[1]}'} if ranged else {}
+        fd = os.open(self.part_path, os.O_WRONLY)
+        try:
+            with self.session.get(self.url, headers=headers, stream=True, timeout=HTTP_TIMEOUT) as r:
+                r.raise_for_status()
+                if ranged and r.status_code != 206:
+                    raise DownloadError("Server mengabaikan header Range.")
+                offset = start
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if self._cancel.is_set(): return
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+                    seg[2] += len(chunk)
+        finally:
+            os.close(fd)
+
+    def run(self, on_progress=None):
+        """Menjalankan unduhan; `on_progress(selesai, total)` dipanggil dari thread pemanggil
+        paling sering tiap PROGRESS_UPDATE_INTERVAL detik."""
+        self.total, ranged = self._probe()
+        self._plan(self.total, ranged)
+        if not ranged: self.segments[0][2] = 0  # Tanpa Range, unduhan selalu dimulai dari awal
+        with ThreadPoolExecutor(max_workers=len(self.segments), thread_name_prefix="download") as pool:
+            futures = [pool.submit(self._fetch_segment, i, ranged) for i in range(len(self.segments))]
+            try:
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=PROGRESS_UPDATE_INTERVAL)
+                    for future in done: future.result()
+                    if on_progress: on_progress(self.downloaded, self.total)
+                    if ranged: self._save_state()
+            except (requests.exceptions.RequestException, OSError) as e:
+                self._cancel.set()
+                if ranged: self._save_state()
+                raise DownloadError(str(e)) from e
+            except BaseException:
+                self._cancel.set()
+                if ranged: self._save_state()
+                raise
+        if self.total and self.downloaded != self.total:
+            raise DownloadError(f"Ukuran tidak lengkap: {self.downloaded} dari {self.total} byte.")
+        if self.expected_hash:
+            algorithm, expected = self.expected_hash
+            actual = file_hash(self.part_path, algorithm)
+            if actual.lower() != expected.lower():
+                self.discard()
+                raise DownloadError(f"Checksum {algorithm} tidak cocok (diharapkan {expected}, didapat {actual}).")
+        os.replace(self.part_path, self.filepath)
+        if os.path.exists(self.state_path): os.remove(self.state_path)
+
+    def discard(self):
+        for path in (self.part_path, self.state_path):
+            if os.path.exists(path): os.remove(path)
+
+# =================================================================================
+# CACHE JAR BERSAMA
+# Cache artefak (jar/zip server) beralamat konten di root Drive. Artefak yang sama
+# di-hardlink/reflink ke folder tiap server, dengan eviksi LRU berdasarkan total ukuran.
+# =================================================================================
+
+def link_or_copy(src, dst):
+    """Menautkan `src` ke `dst` dengan hardlink, lalu reflink (FICLONE), dan terakhir salinan biasa."""
+    if os.path.exists(dst): os.remove(dst)
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return 'reflink'
+    except OSError:
+        pass
+    shutil.copyfile(src, dst)
+    return 'copy'
+
+def artifact_cache_key(server_type, version, url):
+    """Kunci cache artefak: tipe/versi/hash URL (URL API sudah memuat nomor build)."""
+    return f"{server_type}/{version}/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}"
+
+class ArtifactCache:
+    """Penyimpanan blob `blobs/<sha256>` dengan indeks kunci -> sha256 dan waktu pakai terakhir."""
+
+    def __init__(self, root=JAR_CACHE_DIR, max_bytes=JAR_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.incoming_dir = os.path.join(root, 'incoming')
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        try:
+            with open(self.index_path) as f: self.index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.index = {"keys": {}, "blobs": {}}
+
+    def _save_index(self):
+        with open(self.index_path + '.tmp', 'w') as f: json.dump(self.index, f, indent=4)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256)
+
+    def lookup(self, key, expected_hash=None):
+        """Mengembalikan path blob untuk `key` (atau untuk sha256 yang diharapkan), None jika tidak ada."""
+        with self._lock:
+            sha256 = self.index["keys"].get(key)
+            if sha256 is None and expected_hash and expected_hash[0] == 'sha256' and expected_hash[1].lower() in self.index["blobs"]:
+                sha256 = expected_hash[1].lower()
+            if sha256 is None: return None
+            if not os.path.exists(self._blob_path(sha256)):
+                self.index["blobs"].pop(sha256, None)
+                self.index["keys"] = {k: v for k, v in self.index["keys"].items() if v != sha256}
+                self._save_index()
+                return None
+            self.index["keys"][key] = sha256
+            self.index["blobs"][sha256]["last_used"] = time.time()
+            self._save_index()
+            return self._blob_path(sha256)
+
+    def incoming_path(self, key):
+        """Lokasi unduhan sementara di dalam cache (filesystem yang sama dengan blob)."""
+        return os.path.join(self.incoming_dir, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def put(self, key, path):
+        """Memindahkan file yang sudah diunduh ke cache dan mengembalikan path blob-nya."""
+        sha256 = file_hash(path, 'sha256')
+        blob = self._blob_path(sha256)
+        with self._lock:
+            if os.path.exists(blob): os.remove(path)
+            else: os.replace(path, blob)
+            self.index["keys"][key] = sha256
+            self.index["blobs"][sha256] = {"size": os.path.getsize(blob), "last_used": time.time()}
+            self._evict(keep=sha256)
+            self._save_index()
+        return blob
+
+    def _evict(self, keep=None):
+        """Menghapus blob yang paling lama tidak dipakai sampai total ukuran di bawah batas."""
+        blobs = self.index["blobs"]
+        total = sum(b["size"] for b in blobs.values())
+        for sha256, info in sorted(blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes: break
+            if sha256 == keep: continue
+            try: os.remove(self._blob_path(sha256))
+            except FileNotFoundError: pass
+            total -= info["size"]
+            del blobs[sha256]
+            self.index["keys"] = {k: v for k, v in self.index["keys"].items() if v != sha256}
+
+    def usage(self):
+        with self._lock:
+            return len(self.index["blobs"]), sum(b["size"] for b in self.index["blobs"].values())
+
+@st.cache_resource
+def get_artifact_cache():
+    """Cache artefak tunggal untuk semua server di DRIVE_PATH."""
+    return ArtifactCache()
+
+# =================================================================================
+# STAGED RUN (DISK LOKAL + SINKRONISASI KE DRIVE)
+# Menyalin folder server ke disk lokal sebelum diluncurkan, menjalankan server dari
+# sana, lalu menyinkronkan file yang berubah kembali ke Drive secara berkala dan saat berhenti.
+# =================================================================================
+
+def snapshot_tree(root, skip=(), skip_dirs=()):
+    """Mengembalikan {path_relatif: (ukuran, mtime_ns)} untuk semua file biasa di bawah `root`,
+    kecuali path relatif di `skip` dan isi folder relatif di `skip_dirs`."""
+    snapshot, stack = {}, [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if os.path.relpath(entry.path, root) not in skip_dirs: stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        rel = os.path.relpath(entry.path, root)
+                        if rel in skip: continue
+                        st_ = entry.stat(follow_symlinks=False)
+                        snapshot[rel] = (st_.st_size, st_.st_mtime_ns)
+        except FileNotFoundError:
+            continue  # Folder dihapus saat dipindai
+    return snapshot
+
+def _copy_file_atomic(src, dst):
+    """Menyalin file beserta mtime-nya lewat file sementara + rename agar tujuan tidak pernah setengah jadi."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + '.minelab-tmp'
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+class StageSyncError(OSError):
+    """Sinkronisasi stage dibatalkan karena salinan tidak akan konsisten."""
+
+class StagedRun:
+    """Pasangan folder Drive <-> folder stage lokal dengan manifest sinkronisasi terakhir."""
+
+    def __init__(self, drive_dir, stage_dir):
+        self.drive_dir = drive_dir
+        self.stage_dir = stage_dir
+        self.manifest_path = os.path.join(stage_dir, STAGE_MANIFEST_NAME)
+        self.history = deque(maxlen=20)  # Laporan sinkronisasi terbaru
+        self.final_done = threading.Event()
+        self._sync_lock = threading.Lock()
+        try:
+            with open(self.manifest_path) as f:
+                # Manifest lama bisa memuat folder yang kini dilewati; jangan sampai dianggap "dihapus di stage"
+                self.manifest = {k: tuple(v) for k, v in json.load(f).items() if k.split(os.sep, 1)[0] not in STAGE_SKIP_DIRS}
+        except (OSError, json.JSONDecodeError):
+            self.manifest = {}
+
+    def to_state(self):
+        return {"drive_dir": self.drive_dir, "stage_dir": self.stage_dir}
+
+    def _save_manifest(self):
+        with open(self.manifest_path + '.tmp', 'w') as f: json.dump(self.manifest, f)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def _mirror(self, src_root, dst_root, src_files, unchanged):
+        """Menyalin file di `src_files` yang dianggap berubah oleh `unchanged` ke `dst_root`."""
+        copied = bytes_moved = 0
+        for rel, stat_ in src_files.items():
+            if unchanged(rel, stat_): continue
+            _copy_file_atomic(os.path.join(src_root, rel), os.path.join(dst_root, rel))
+            copied += 1; bytes_moved += stat_[0]
+        return copied, bytes_moved
+
+    def _stage_files(self):
+        return snapshot_tree(self.stage_dir, skip={STAGE_MANIFEST_NAME}, skip_dirs=STAGE_SKIP_DIRS)
+
+    def pull(self):
+        """Menyalin Drive -> stage. Hanya file yang ukuran/mtime-nya berbeda yang disalin.
+        Perubahan di stage yang belum ada di manifest (mis. sinkronisasi akhir yang gagal)
+        didorong ke Drive terlebih dahulu agar tidak tertimpa atau terhapus."""
+        with self._sync_lock:
+            started = time.monotonic()
+            os.makedirs(self.stage_dir, exist_ok=True)
+            for skipped in STAGE_SKIP_DIRS:  # Salinan dari versi lama yang belum melewati folder ini
+                shutil.rmtree(os.path.join(self.stage_dir, skipped), ignore_errors=True)
+            pending = None
+            if self.manifest and self._stage_files() != self.manifest:
+                pending = self._push(None)
+            drive_files = snapshot_tree(self.drive_dir, skip_dirs=STAGE_SKIP_DIRS)
+            stage_files = self._stage_files()
+            copied, bytes_moved = self._mirror(self.drive_dir, self.stage_dir, drive_files,
+                                                  lambda rel, st_: stage_files.get(rel) == st_)
+            deleted = 0
+            for rel in stage_files.keys() - drive_files.keys():
+                os.remove(os.path.join(self.stage_dir, rel)); deleted += 1
+            self.manifest = drive_files
+            self._save_manifest()
+            report = self._report("pull", started, copied, bytes_moved, deleted)
+            report["pushed_pending"] = pending["files"] if pending else 0
+            return report
+
+    def push(self, managed=None):
+        """Menyalin stage -> Drive berdasarkan manifest. Untuk server yang sedang berjalan,
+        penulisan dunia dijeda (lihat `pause_world_saves`) selama salinan dibuat agar konsisten;
+        jika server tidak mengonfirmasi flush, sinkronisasi dibatalkan dengan StageSyncError."""
+        with self._sync_lock:
+            return self._push(managed)
+
+    def _push(self, managed):
+        paused = managed is not None and managed.is_running()
+        try:
+            if paused and not pause_world_saves(managed):
+                raise StageSyncError("Server tidak mengonfirmasi penyimpanan dunia; sinkronisasi dilewati agar Drive tetap konsisten.")
+            started = time.monotonic()
+            stage_files = self._stage_files()
+            copied, bytes_moved = self._mirror(self.stage_dir, self.drive_dir, stage_files,
+                                                  lambda rel, st_: self.manifest.get(rel) == st_)
+        finally:
+            if paused: resume_world_saves(managed)
+        deleted = 0
+        for rel in self.manifest.keys() - stage_files.keys():
+            try: os.remove(os.path.join(self.drive_dir, rel)); deleted += 1
+            except FileNotFoundError: pass
+        self.manifest = stage_files
+        self._save_manifest()
+        return self._report("push", started, copied, bytes_moved, deleted)
+
+    def _report(self, direction, started, copied, bytes_moved, deleted):
+        report = {"direction": direction, "at": datetime.now().strftime("%H:%M:%S"), "seconds": time.monotonic() - started,
+                  "files": copied, "bytes": bytes_moved, "deleted": deleted}
+        self.history.append(report)
+        return report
+
+    def start_periodic(self, managed, interval=STAGE_SYNC_INTERVAL):
+        """Thread daemon: sinkronisasi tiap `interval` detik selama server hidup, lalu satu
+        sinkronisasi akhir setelah proses keluar (server sudah menyimpan dunia saat `stop`)."""
+        def loop():
+            next_sync = time.monotonic() + interval
+            while managed.is_running():
+                time.sleep(1)
+                if time.monotonic() >= next_sync and managed.is_running():
+                    try: self.push(managed)
+                    except OSError as e: managed.log_buffer.append(f"[MineLab] Sinkronisasi ke Drive gagal: {e}")
+                    next_sync = time.monotonic() + interval
+            try:
+                report = self.push()
+                managed.log_buffer.append(f"[MineLab] Sinkronisasi akhir selesai: {report['files']} file, "
+                                          f"{report['bytes'] / (1024*1024):.1f} MB dalam {report['seconds']:.1f} dtk.")
+            except OSError as e:
+                managed.log_buffer.append(f"[MineLab] Sinkronisasi akhir GAGAL, data masih ada di {self.stage_dir}: {e}")
+            finally:
+                self.final_done.set()
+        threading.Thread(target=loop, name=f"stage-sync-{managed.name}", daemon=True).start()
+
+def pause_world_saves(managed, timeout=SAVE_FLUSH_TIMEOUT):
+    """Menjeda penulisan dunia agar file bisa disalin dengan konsisten. Java: `save-off` lalu
+    `save-all flush`; Bedrock: `save hold` lalu `save query` sampai data siap disalin.
+    Jeda dihitung per server: pemanggil berikutnya (mis. backup saat sinkronisasi stage berjalan)
+    memakai hasil flush yang sama, dan penyimpanan baru dilanjutkan oleh `resume_world_saves`
+    terakhir. Setiap panggilan harus dipasangkan dengan `resume_world_saves`, apa pun hasilnya.
+    Mengembalikan True jika server mengonfirmasi."""
+    with managed._save_pause_lock:
+        managed._save_pause_count += 1
+        if managed._save_pause_count == 1:
+            managed._save_pause_ok = _hold_world_saves(managed, timeout)
+        return managed._save_pause_ok
+
+def _hold_world_saves(managed, timeout):
+    deadline = time.monotonic() + timeout
+    seq = managed.log_buffer.next_seq
+    if managed.server_type != 'bedrock':
+        run_server_command(managed, "save-off")
+        response = run_server_command(managed, "save-all flush", timeout=timeout)
+        if response is not None: return SAVE_COMPLETE_PATTERN.search(response) is not None
+        return managed.log_buffer.wait_for_match(SAVE_COMPLETE_PATTERN, seq, timeout) is not None
+    managed.send_command("save hold")
+    while time.monotonic() < deadline:
+        managed.send_command("save query", echo=False)
+        if managed.log_buffer.wait_for_match(BEDROCK_SAVE_READY_PATTERN, seq, 1.0) is not None:
+            return True
+    return False
+
+def resume_world_saves(managed):
+    with managed._save_pause_lock:
+        managed._save_pause_count = max(0, managed._save_pause_count - 1)
+        if managed._save_pause_count: return  # Masih ada penyalin lain yang berjalan
+        run_server_command(managed, "save resume" if managed.server_type == 'bedrock' else "save-on")
+
+# =================================================================================
+# BACKUP DUNIA INKREMENTAL
+# Snapshot dunia dengan deduplikasi per blok: file dipecah menjadi chunk berukuran
+# tetap yang disimpan sekali berdasarkan sha256 di bawah BACKUP_FOLDER_NAME/store.
+# =================================================================================
+
+def find_worlds(server_root):
+    """Mengembalikan {nama: path} untuk folder dunia (berisi level.dat) di root server dan di `worlds/`."""
+    worlds = {}
+    for base in (server_root, os.path.join(server_root, 'worlds')):
+        if not os.path.isdir(base): continue
+        for entry in sorted(os.scandir(base), key=lambda e: e.name):
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'level.dat')):
+                worlds.setdefault(entry.name, entry.path)
+    return worlds
+
+def live_server_path(server_name):
+    """Folder tempat server benar-benar berjalan: folder stage jika staged run aktif, selain itu Drive."""
+    managed = get_supervisor().get(server_name)
+    if managed and managed.is_running():
+        return managed.server_path
+    return os.path.join(DRIVE_PATH, server_name)
+
+class BackupStore:
+    """Penyimpanan snapshot dunia: `chunks/<aa>/<sha256>` (terkompresi zlib) dan `snapshots/<id>.json`."""
+
+    def __init__(self, root):
+        self.root = root
+        self.chunk_dir = os.path.join(root, 'chunks')
+        self.snapshot_dir = os.path.join(root, 'snapshots')
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    @contextmanager
+    def lock(self):
+        """Kunci eksklusif store (flock pada `<root>/.lock`) antara pembuatan snapshot dan GC chunk,
+        berlaku lintas thread dan sesi karena setiap pemegang membuka file kuncinya sendiri."""
+        with open(os.path.join(self.root, '.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def list_snapshots(self, world=None):
+        """Daftar metadata snapshot (tanpa daftar file), terbaru lebih dulu."""
+        snapshots = []
+        for name in os.listdir(self.snapshot_dir):
+            if not name.endswith('.json'): continue
+            with open(os.path.join(self.snapshot_dir, name)) as f: snap = json.load(f)
+            if world is None or snap['world'] == world:
+                snap.pop('files', None)
+                snapshots.append(snap)
+        return sorted(snapshots, key=lambda s: s['id'], reverse=True)
+
+    def load_snapshot(self, snapshot_id):
+        with open(os.path.join(self.snapshot_dir, f'{snapshot_id}.json')) as f: return json.load(f)
+
+    def _latest_files(self, world):
+        latest = self.list_snapshots(world)
+        return self.load_snapshot(latest[0]['id'])['files'] if latest else {}
+
+    def _store_chunk(self, data, level):
+        """Menyimpan satu blok jika belum ada; mengembalikan (sha256, byte_tersimpan). Dipanggil dari thread pekerja."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path): return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        packed = zlib.compress(data, level)
+        tmp = f"{path}.{threading.get_native_id()}.tmp"
+        with open(tmp, 'wb') as f: f.write(packed)
+        os.replace(tmp, path)
+        return digest, len(packed)
+
+    def create_snapshot(self, world, world_path, on_progress=None, options=None):
+        """Membuat snapshot inkremental: file dengan ukuran+mtime sama dengan snapshot sebelumnya
+        dipakai ulang tanpa dibaca; file lain dipecah dan hanya chunk baru yang ditulis.
+        Hash dan kompresi blok berjalan paralel di thread pool (lihat `compression_executor`)."""
+        with self.lock():
+            return self._create_snapshot(world, world_path, on_progress, options)
+
+    def _create_snapshot(self, world, world_path, on_progress, options):
+        options = dict(DEFAULT_COMPRESSION, **(options or {}))
+        started = time.monotonic()
+        previous = self._latest_files(world)
+        current = snapshot_tree(world_path)
+        files, stats = {}, {"files": len(current), "reused_files": 0, "new_chunks": 0, "stored_bytes": 0,
+                            "logical_bytes": 0, "read_bytes": 0, "new_bytes": 0}
+        last_report = 0
+        pending = deque()  # (daftar_chunk_file, indeks, panjang_blok, future)
+
+        def finish_oldest():
+            chunk_list, index, length, future = pending.popleft()
+            digest, stored = future.result()
+            chunk_list[index] = digest
+            if stored:
+                stats["new_chunks"] += 1; stats["stored_bytes"] += stored; stats["new_bytes"] += length
+
+        with compression_executor(options) as pool:
+            for file_index, (rel, (size, mtime_ns)) in enumerate(sorted(current.items())):
+                stats["logical_bytes"] += size
+                prev = previous.get(rel)
+                if prev and prev['size'] == size and prev['mtime_ns'] == mtime_ns:
+                    files[rel] = prev
+                    stats["reused_files"] += 1
+                    continue
+                chunks = []
+                with open(os.path.join(world_path, rel), 'rb') as f:
+                    for data in iter(lambda: f.read(BACKUP_CHUNK_SIZE), b''):
+                        chunks.append(None)
+                        stats["read_bytes"] += len(data)
+                        pending.append((chunks, len(chunks) - 1, len(data), pool.submit(self._store_chunk, data, options["level"])))
+                        while len(pending) > options["workers"] * 2: finish_oldest()
+                files[rel] = {"size": size, "mtime_ns": mtime_ns, "chunks": chunks}
+                if on_progress and time.monotonic() - last_report >= PROGRESS_UPDATE_INTERVAL:
+                    on_progress(file_index + 1, len(current)); last_report = time.monotonic()
+            while pending: finish_oldest()
+        stats["seconds"] = max(time.monotonic() - started, 1e-6)
+        stats["mb_per_sec"] = stats["read_bytes"] / stats["seconds"] / (1024*1024)
+        stats["ratio"] = stats["stored_bytes"] / stats["new_bytes"] if stats["new_bytes"] else 1.0
+        snapshot = {"id": datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3], "world": world, "created": datetime.now().isoformat(),
+                    "stats": stats, "files": files}
+        path = os.path.join(self.snapshot_dir, f"{snapshot['id']}.json")
+        with open(path + '.tmp', 'w') as f: json.dump(snapshot, f)
+        os.replace(path + '.tmp', path)
+        return snapshot
+
+    def restore(self, snapshot_id, target_dir, on_progress=None):
+        """Menyusun ulang semua file snapshot ke `target_dir` (harus belum ada) beserta mtime-nya.
+        Berjalan di bawah kunci store (GC tidak bisa membuang chunk di tengah jalan) dan ditulis ke
+        folder sementara yang baru diganti namanya setelah lengkap; bila gagal, tidak ada sisa."""
+        if os.path.exists(target_dir): raise FileExistsError(errno.EEXIST, "Folder tujuan sudah ada", target_dir)
+        with self.lock():
+            snapshot = self.load_snapshot(snapshot_id)
+            partial = f"{target_dir}.restoring"
+            shutil.rmtree(partial, ignore_errors=True)  # Sisa percobaan yang terputus
+            try:
+                self._restore_files(snapshot, partial, on_progress)
+                os.rename(partial, target_dir)
+            except BaseException:
+                shutil.rmtree(partial, ignore_errors=True)
+                raise
+        return snapshot
+
+    def _restore_files(self, snapshot, target_dir, on_progress):
+        os.makedirs(target_dir)
+        total, last_report = len(snapshot['files']), 0
+        for index, (rel, info) in enumerate(snapshot['files'].items()):
+            dst = os.path.join(target_dir, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            with open(dst, 'wb') as out:
+                for digest in info['chunks']:
+                    with open(self._chunk_path(digest), 'rb') as f: out.write(zlib.decompress(f.read()))
+            os.utime(dst, ns=(info['mtime_ns'], info['mtime_ns']))
+            if on_progress and time.monotonic() - last_report >= PROGRESS_UPDATE_INTERVAL:
+                on_progress(index + 1, total); last_report = time.monotonic()
+
+    def delete_snapshot(self, snapshot_id):
+        """Menghapus snapshot lalu membuang chunk yang tidak lagi dirujuk snapshot mana pun."""
+        with self.lock():
+            return self._delete_snapshot(snapshot_id)
+
+    def _delete_snapshot(self, snapshot_id):
+        os.remove(os.path.join(self.snapshot_dir, f'{snapshot_id}.json'))
+        referenced = set()
+        for snap in self.list_snapshots():
+            for info in self.load_snapshot(snap['id'])['files'].values():
+                referenced.update(info['chunks'])
+        freed = 0
+        for prefix in os.listdir(self.chunk_dir):
+            for digest in os.listdir(os.path.join(self.chunk_dir, prefix)):
+                if digest not in referenced:
+                    path = os.path.join(self.chunk_dir, prefix, digest)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+        return freed
+
+def backup_world(server_name, world, on_progress=None, options=None):
+    """Snapshot konsisten satu dunia: jika server berjalan, autosave dijeda selama snapshot."""
+    server_root = os.path.join(DRIVE_PATH, server_name)
+    world_path = find_worlds(live_server_path(server_name))[world]
+    store = BackupStore(os.path.join(server_root, BACKUP_FOLDER_NAME, 'store'))
+    managed = get_supervisor().get(server_name)
+    paused = managed is not None and managed.is_running()
+    if paused and not pause_world_saves(managed):
+        resume_world_saves(managed)
+        raise RuntimeError("Server tidak mengonfirmasi penyimpanan dunia; backup dibatalkan.")
+    try:
+        return store.create_snapshot(world, world_path, on_progress, options)
+    finally:
+        if paused: resume_world_saves(managed)
+
+# =================================================================================
+# STREAMING ARSIP DUNIA
+# Impor langsung dari central directory zip tanpa ekstraksi sementara, dan ekspor
+# zip yang dibangun sambil dikirim (lihat KOMPRESI PARALEL), sehingga memori tetap
+# konstan berapa pun ukuran dunia.
+# =================================================================================
+
+def safe_join(root, member_name):
+    """Menggabungkan path anggota arsip ke `root`, menolak path yang keluar dari `root` (zip-slip)."""
+    root = os.path.realpath(root)
+    target = os.path.realpath(os.path.join(root, member_name))
+    if target != root and not target.startswith(root + os.sep):
+        raise ValueError(f"Path arsip tidak aman: {member_name}")
+    return target
+
+def find_world_prefix(zf):
+    """Mencari prefix folder dunia di dalam zip (folder `level.dat` paling dangkal) dari central directory."""
+    candidates = [name for name in zf.namelist() if name.rsplit('/', 1)[-1] == 'level.dat']
+    if not candidates: return ''
+    best = min(candidates, key=lambda name: name.count('/'))
+    return best[:-len('level.dat')]
+
+def extract_zip_subtree(zf, prefix, target_dir, on_progress=None):
+    """Mengekstrak hanya anggota di bawah `prefix` langsung ke `target_dir`, per chunk."""
+    members = [info for info in zf.infolist() if info.filename.startswith(prefix) and info.filename != prefix]
+    os.makedirs(target_dir, exist_ok=True)
+    last_report = 0
+    for index, info in enumerate(members):
+        dst = safe_join(target_dir, info.filename[len(prefix):])
+        if info.is_dir():
+            os.makedirs(dst, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with zf.open(info) as src, open(dst, 'wb') as out:
+            shutil.copyfileobj(src, out, ARCHIVE_IO_CHUNK_SIZE)
+        if on_progress and time.monotonic() - last_report >= PROGRESS_UPDATE_INTERVAL:
+            on_progress(index + 1, len(members)); last_report = time.monotonic()
+    return len(members)
+
+def write_stream_to_file(chunks, path):
+    """Menulis hasil generator byte ke `path` lewat file sementara; mengembalikan jumlah byte."""
+    written = 0
+    with open(path + '.tmp', 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk); written += len(chunk)
+    os.replace(path + '.tmp', path)
+    return written
+
+UPLOAD_PAGE_TEMPLATE = """<!doctype html><html><head><meta charset="utf-8"><title>Unggah ke MineLab</title></head>
+<body style="font-family:sans-serif;max-width:640px;margin:40px auto">
+<h3>Unggah ke <code>%(target)s</code></h3>
+<input type="file" id="files" multiple> <button onclick="go()">Unggah</button>
+<div id="log"></div>
+<script>
+const CHUNK = %(chunk)d;
+async function send(file) {
+  const row = document.createElement('div'); document.getElementById('log').appendChild(row);
+  for (let offset = 0; offset < file.size || offset === 0; offset += CHUNK) {
+    const url = location.pathname + '/' + encodeURIComponent(file.name) + '?offset=' + offset + '&total=' + file.size;
+    const res = await fetch(url, {method: 'PUT', body: file.slice(offset, offset + CHUNK)});
+    if (!res.ok) { row.textContent = file.name + ': gagal (' + res.status + ')'; return; }
+    row.textContent = file.name + ': ' + Math.min(100, Math.round((offset + CHUNK) * 100 / Math.max(file.size, 1))) + '%%';
+    if (file.size === 0) break;
+  }
+  row.textContent = file.name + ': selesai';
+}
+async function go() { for (const f of document.getElementById('files').files) await send(f); }
+</script></body></html>"""
+
+class StreamingFileServer:
+    """Endpoint HTTP lokal kecil yang menyajikan unduhan berbasis generator (mis. zip dunia)
+    tanpa menampungnya di memori Streamlit. Setiap unduhan memakai token sekali pakai.
+    Juga menerima unggahan per potongan (`PUT /upload/<token>/<nama>?offset=&total=`) yang
+    langsung ditulis ke disk, sehingga file besar tidak pernah berada utuh di memori."""
+
+    def __init__(self, port=FILE_SERVER_PORT):
+        self.port = port
+        self._downloads = {}  # token -> (nama_file, fungsi_pembuat_generator, kedaluwarsa)
+        self._uploads = {}  # token -> (folder_tujuan, kedaluwarsa)
+        self.upload_progress = {}  # path_tujuan -> (byte_diterima, total)
+        self._lock = threading.Lock()
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith('/upload/'):
+                    self._upload_page(); return
+                token = self.path.rstrip('/').rsplit('/', 1)[-1]
+                with registry._lock:
+                    entry = registry._downloads.pop(token, None)
+                if entry is None or entry[2] < time.time():
+                    self.send_error(404, "Tautan unduhan tidak ditemukan atau kedaluwarsa")
+                    return
+                filename, make_stream, _ = entry
+                try:
+                    stream = make_stream()  # Persiapan (mis. jeda penyimpanan untuk ekspor) sebelum header dikirim
+                except (RuntimeError, OSError) as e:
+                    self.send_error(503, "Unduhan tidak dapat disiapkan", str(e))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+                self.end_headers()
+                try:
+                    for chunk in stream:
+                        self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Browser membatalkan unduhan
+
+            def _upload_target(self, token):
+                with registry._lock:
+                    entry = registry._uploads.get(token)
+                return entry[0] if entry and entry[1] >= time.time() else None
+
+            def _upload_page(self):
+                target = self._upload_target(self.path.split('/')[2])
+                if not target:
+                    self.send_error(404, "Tautan unggahan tidak ditemukan atau kedaluwarsa"); return
+                body = (UPLOAD_PAGE_TEMPLATE % {"target": os.path.basename(target), "chunk": UPLOAD_CHUNK_SIZE}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_PUT(self):
+                path, _, query = self.path.partition('?')
+                parts = path.split('/')
+                target = self._upload_target(parts[2]) if len(parts) == 4 and parts[1] == 'upload' else None
+                if not target:
+                    self.send_error(404, "Tautan unggahan tidak ditemukan atau kedaluwarsa"); return
+                params = dict(p.split('=', 1) for p in query.split('&') if '=' in p)
+                try:
+                    name = os.path.basename(urllib.parse.unquote(parts[3]))
+                    if name in ('', '.', '..'): raise ValueError(name)
+                    dst = safe_join(target, name)
+                    offset, total, length = int(params['offset']), int(params['total']), int(self.headers['Content-Length'])
+                except (ValueError, KeyError, TypeError):
+                    self.send_error(400, "Permintaan unggahan tidak valid"); return
+                try:
+                    received = receive_upload_chunk(self.rfile, dst, offset, length, total)
+                except OSError as e:
+                    self.send_error(500, f"Gagal menulis unggahan: {e}"); return
+                with registry._lock:
+                    if received >= total: registry.upload_progress.pop(dst, None)
+                    else: registry.upload_progress[dst] = (received, total)
+                self.send_response(204)
+                self.end_headers()
+
+        self._httpd = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="file-server", daemon=True).start()
+
+    def register(self, filename, make_stream, ttl=FILE_SERVER_LINK_TTL):
+        """Mendaftarkan unduhan dan mengembalikan URL relatifnya (`/download/<token>`)."""
+        token = base64.urlsafe_b64encode(os.urandom(18)).decode()
+        with self._lock:
+            now = time.time()
+            self._downloads = {k: v for k, v in self._downloads.items() if v[2] >= now}
+            self._downloads[token] = (filename, make_stream, now + ttl)
+        return f"/download/{token}"
+
+    def is_download_pending(self, url):
+        """True jika tautan dari `register` belum dipakai dan belum kedaluwarsa."""
+        with self._lock:
+            entry = self._downloads.get(url.rsplit('/', 1)[-1])
+        return entry is not None and entry[2] >= time.time()
+
+    def register_upload(self, target_dir, ttl=FILE_SERVER_LINK_TTL):
+        """Membuka halaman unggahan ke `target_dir` dan mengembalikan URL relatifnya (`/upload/<token>`)."""
+        token = base64.urlsafe_b64encode(os.urandom(18)).decode()
+        with self._lock:
+            now = time.time()
+            self._uploads = {k: v for k, v in self._uploads.items() if v[1] >= now}
+            self._uploads[token] = (target_dir, now + ttl)
+        return f"/upload/{token}"
+
+def receive_upload_chunk(stream, dst, offset, length, total):
+    """Menulis `length` byte dari `stream` ke `<dst>.part` mulai `offset`, per ARCHIVE_IO_CHUNK_SIZE.
+    File dipindahkan ke `dst` setelah seluruh `total` byte diterima. Mengembalikan byte yang sudah ada."""
+    part = dst + '.part'
+    fd = os.open(part, os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if offset == 0 else 0), 0o644)
+    try:
+        position, remaining = offset, length
+        while remaining > 0:
+            chunk = stream.read(min(ARCHIVE_IO_CHUNK_SIZE, remaining))
+            if not chunk: break
+            os.pwrite(fd, chunk, position)
+            position += len(chunk); remaining -= len(chunk)
+    finally:
+        os.close(fd)
+    if position >= total:
+        os.replace(part, dst)
+    return position
+
+@st.cache_resource
+def get_file_server():
+    """Server unduhan lokal tunggal untuk semua sesi."""
+    return StreamingFileServer()
+
+# =================================================================================
+# KOMPRESI PARALEL
+# Zip (.mcworld) dengan deflate paralel ala pigz: setiap file dipecah menjadi potongan
+# yang dikompres terpisah di thread pool (zlib melepas GIL) lalu disambung menjadi
+# stream deflate yang valid, plus prioritas CPU/IO rendah untuk thread pekerja.
+# =================================================================================
+
+def _gf2_matrix_times(mat, vec):
+    total, i = 0, 0
+    while vec:
+        if vec & 1: total ^= mat[i]
+        vec >>= 1; i += 1
+    return total
+
+def _gf2_matrix_square(mat):
+    return [_gf2_matrix_times(mat, mat[n]) for n in range(32)]
+
+def crc32_combine(crc1, crc2, len2):
+    """CRC32 dari gabungan dua blok data, diporting dari `crc32_combine` zlib."""
+    if len2 <= 0: return crc1
+    odd = [0xEDB88320] + [1 << n for n in range(31)]
+    even = _gf2_matrix_square(odd)
+    odd = _gf2_matrix_square(even)
+    while True:
+        even = _gf2_matrix_square(odd)
+        if len2 & 1: crc1 = _gf2_matrix_times(even, crc1)
+        len2 >>= 1
+        if not len2: break
+        odd = _gf2_matrix_square(even)
+        if len2 & 1: crc1 = _gf2_matrix_times(odd, crc1)
+        len2 >>= 1
+        if not len2: break
+    return crc1 ^ crc2
+
+def lower_thread_priority(nice=0, idle_io=False):
+    """Menurunkan prioritas CPU (nice) dan IO (kelas idle) thread pemanggil. Best-effort, hanya Linux."""
+    tid = threading.get_native_id()
+    if nice:
+        try: os.setpriority(os.PRIO_PROCESS, tid, nice)
+        except (OSError, AttributeError): pass
+    syscall_nr = IOPRIO_SET_SYSCALLS.get(os.uname().machine)
+    if idle_io and syscall_nr:
+        try: ctypes.CDLL(None, use_errno=True).syscall(syscall_nr, 1, tid, IOPRIO_CLASS_IDLE << 13)  # IOPRIO_WHO_PROCESS
+        except (OSError, AttributeError): pass
+
+def compression_executor(options):
+    """Thread pool untuk pekerja kompresi dengan prioritas dari `options`."""
+    return ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="compress",
+                              initializer=lower_thread_priority, initargs=(options["nice"], options["idle_io"]))
+
+def _deflate_piece(path, offset, length, level, is_last):
+    """Membaca satu potongan file dan mengembalikan (deflate_mentah, crc32, panjang_asli)."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        raw = f.read(length)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(raw) + compressor.flush(zlib.Z_FINISH if is_last else zlib.Z_FULL_FLUSH)
+    return data, zlib.crc32(raw), len(raw)
+
+def _dos_datetime(mtime):
+    t = time.localtime(max(mtime, 315532800))  # Format DOS dimulai 1980
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+def iter_parallel_zip_stream(source_dir, options=None, stats=None):
+    """Generator byte zip dari `source_dir` yang dikompres paralel. Kompatibel dengan .mcworld
+    (deflate standar, data descriptor, zip64 bila perlu). `stats` diisi throughput, rasio, dan
+    `changed` (file yang ukurannya berubah saat dibaca; ukuran di arsip mengikuti byte yang terbaca)."""
+    options = dict(DEFAULT_COMPRESSION, **(options or {}))
+    stats = stats if stats is not None else {}
+    started = time.monotonic()
+    offset, central, bytes_in, changed = 0, [], 0, []
+    files = sorted(snapshot_tree(source_dir).items())
+    def piece_count(size): return max(1, -(-size // ZIP_PIECE_SIZE))
+    pieces = [(rel, i * ZIP_PIECE_SIZE, min(ZIP_PIECE_SIZE, size - i * ZIP_PIECE_SIZE) if size else 0, i == piece_count(size) - 1)
+              for rel, (size, _) in files for i in range(piece_count(size))]
+
+    with compression_executor(options) as pool:
+        window = deque()
+        piece_iter = iter(pieces)
+
+        def refill():
+            for rel, start, length, is_last in itertools.islice(piece_iter, options["workers"] * 2 - len(window)):
+                window.append(pool.submit(_deflate_piece, os.path.join(source_dir, rel), start, length, options["level"], is_last))
+
+        refill()
+        for rel, (size, mtime_ns) in files:
+            name = rel.replace(os.sep, '/').encode('utf-8')
+            dos_time, dos_date = _dos_datetime(mtime_ns / 1e9)
+            zip64 = size >= ZIP64_THRESHOLD
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0) if zip64 else b''
+            header = struct.pack('<IHHHHHIIIHH', 0x04034B50, 45 if zip64 else 20, 0x0808, 8, dos_time, dos_date, 0,
+                                 0xFFFFFFFF if zip64 else 0, 0xFFFFFFFF if zip64 else 0, len(name), len(extra)) + name + extra
+            local_offset = offset
+            yield header
+            offset += len(header)
+            # Tepat sebanyak potongan file ini; file yang menyusut saat dibaca tidak boleh memakan potongan file berikutnya
+            crc, compressed_size, read_size = 0, 0, 0
+            for index in range(piece_count(size)):
+                data, piece_crc, piece_len = window.popleft().result()
+                refill()
+                crc = crc32_combine(crc, piece_crc, piece_len) if index else piece_crc
+                compressed_size += len(data)
+                read_size += piece_len
+                yield data
+            if read_size != size: changed.append(rel)
+            offset += compressed_size
+            bytes_in += read_size
+            descriptor = (struct.pack('<IIQQ', 0x08074B50, crc, compressed_size, read_size) if zip64
+                          else struct.pack('<IIII', 0x08074B50, crc, compressed_size, read_size))
+            yield descriptor
+            offset += len(descriptor)
+            central.append((name, dos_time, dos_date, crc, compressed_size, read_size, local_offset))
+
+    cd_start, cd_parts = offset, []
+    for name, dos_time, dos_date, crc, csize, usize, local_offset in central:
+        extra_fields = [v for v in (usize, csize, local_offset) if v >= 0xFFFFFFFF]
+        extra = struct.pack('<HH', 1, 8 * len(extra_fields)) + struct.pack(f'<{len(extra_fields)}Q', *extra_fields) if extra_fields else b''
+        cd_parts.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, (3 << 8) | 45, 45 if extra_fields else 20, 0x0808, 8,
+                                    dos_time, dos_date, crc, min(csize, 0xFFFFFFFF), min(usize, 0xFFFFFFFF), len(name), len(extra),
+                                    0, 0, 0, 0o100644 << 16, min(local_offset, 0xFFFFFFFF)) + name + extra)
+    cd = b''.join(cd_parts)
+    yield cd
+    offset += len(cd)
+    count = len(central)
+    tail = b''
+    if count >= 0xFFFF or cd_start >= 0xFFFFFFFF or len(cd) >= 0xFFFFFFFF:
+        tail += struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, (3 << 8) | 45, 45, 0, 0, count, count, len(cd), cd_start)
+        tail += struct.pack('<IIQI', 0x07064B50, 0, offset, 1)
+    tail += struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                        min(len(cd), 0xFFFFFFFF), min(cd_start, 0xFFFFFFFF), 0)
+    yield tail
+    offset += len(tail)
+
+    seconds = max(time.monotonic() - started, 1e-6)
+    stats.update({"seconds": seconds, "bytes_in": bytes_in, "bytes_out": offset, "changed": changed,
+                  "mb_per_sec": bytes_in / seconds / (1024*1024), "ratio": offset / bytes_in if bytes_in else 1.0})
+
+def open_world_export_stream(managed, world_path, options=None, stats=None):
+    """Iterator `iter_parallel_zip_stream` untuk folder dunia. Jika server `managed` berjalan, dunia
+    disalin ke folder lokal di RUNTIME_DIR selama penulisan dunia dijeda, penyimpanan langsung
+    dilanjutkan, dan zip dibangun dari salinan itu (dihapus saat stream selesai atau ditutup),
+    sehingga klien yang lambat tidak menahan penyimpanan server. Dipanggil sebelum byte pertama
+    dikirim: RuntimeError jika flush tidak dikonfirmasi server, OSError jika penyalinan gagal."""
+    if not (managed and managed.is_running()):
+        return iter_parallel_zip_stream(world_path, options, stats)
+    os.makedirs(os.path.join(RUNTIME_DIR, 'exports'), exist_ok=True)
+    snapshot = tempfile.mkdtemp(prefix=f"{managed.name}-", dir=os.path.join(RUNTIME_DIR, 'exports'))
+    try:
+        if not pause_world_saves(managed):
+            raise RuntimeError("Server tidak mengonfirmasi penyimpanan dunia; ekspor dibatalkan.")
+        shutil.copytree(world_path, os.path.join(snapshot, 'world'))
+    except BaseException:
+        shutil.rmtree(snapshot, ignore_errors=True)
+        raise
+    finally:
+        resume_world_saves(managed)
+
+    def stream():
+        try:
+            yield from iter_parallel_zip_stream(os.path.join(snapshot, 'world'), options, stats)
+        finally:
+            shutil.rmtree(snapshot, ignore_errors=True)
+    return stream()
+
+def format_compression_stats(stats):
+    return (f"{stats['bytes_in'] / (1024*1024):.1f} MB → {stats['bytes_out'] / (1024*1024):.1f} MB "
+            f"(rasio {stats['ratio']:.2f}) dalam {stats['seconds']:.1f} dtk, {stats['mb_per_sec']:.1f} MB/s")
+
+# =================================================================================
+# INDEKS REGION ANVIL
+# Membaca header file region .mca (tabel lokasi & timestamp) lewat mmap dan
+# InhabitedTime tiap chunk, lalu menyimpan ringkasannya per region yang hanya
+# di-refresh jika mtime/ukuran region berubah.
+# =================================================================================
+
+_NBT_FIXED_SIZES = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+
+def _nbt_skip(data, pos, tag_type):
+    """Mengembalikan posisi setelah payload tag bertipe `tag_type` yang dimulai di `pos`."""
+    if tag_type in _NBT_FIXED_SIZES: return pos + _NBT_FIXED_SIZES[tag_type]
+    if tag_type == 7: return pos + 4 + struct.unpack_from('>i', data, pos)[0]
+    if tag_type == 8: return pos + 2 + struct.unpack_from('>H', data, pos)[0]
+    if tag_type == 11: return pos + 4 + 4 * struct.unpack_from('>i', data, pos)[0]
+    if tag_type == 12: return pos + 4 + 8 * struct.unpack_from('>i', data, pos)[0]
+    if tag_type == 9:
+        item_type, length = struct.unpack_from('>bi', data, pos)
+        pos += 5
+        if item_type in _NBT_FIXED_SIZES: return pos + length * _NBT_FIXED_SIZES[item_type]
+        for _ in range(length): pos = _nbt_skip(data, pos, item_type)
+        return pos
+    if tag_type == 10:
+        while True:
+            child_type = data[pos]; pos += 1
+            if child_type == 0: return pos
+            pos += 2 + struct.unpack_from('>H', data, pos)[0]
+            pos = _nbt_skip(data, pos, child_type)
+    raise ValueError(f"Tipe tag NBT tidak dikenal: {tag_type}")
+
+def _nbt_compound_fields(data, pos, wanted):
+    """Membaca tag langsung di dalam compound yang payload-nya dimulai di `pos`.
+    Mengembalikan {nama: nilai} untuk long/int/string yang namanya ada di `wanted`,
+    serta {nama: posisi_payload} untuk compound anak (untuk ditelusuri lebih lanjut)."""
+    values, compounds = {}, {}
+    while True:
+        tag_type = data[pos]; pos += 1
+        if tag_type == 0: return values, compounds
+        name_len = struct.unpack_from('>H', data, pos)[0]
+        name = bytes(data[pos + 2:pos + 2 + name_len]).decode('utf-8', 'replace')
+        pos += 2 + name_len
+        if name in wanted:
+            if tag_type == 4: values[name] = struct.unpack_from('>q', data, pos)[0]
+            elif tag_type == 3: values[name] = struct.unpack_from('>i', data, pos)[0]
+            elif tag_type == 8: values[name] = bytes(data[pos + 2:pos + 2 + struct.unpack_from('>H', data, pos)[0]]).decode('utf-8', 'replace')
+            elif tag_type == 10: compounds[name] = pos
+        pos = _nbt_skip(data, pos, tag_type)
+
+def read_chunk_nbt(mm, sector_offset, region_path, local_index):
+    """Mendekompresi data NBT satu chunk; None jika kompresinya tidak didukung (mis. LZ4)."""
+    start = sector_offset * 4096
+    length, compression = struct.unpack_from('>IB', mm, start)
+    if compression & 0x80:
+        # Chunk berukuran besar disimpan di file c.<x>.<z>.mcc di sebelah region
+        rx, rz = map(int, os.path.basename(region_path).split('.')[1:3])
+        mcc = os.path.join(os.path.dirname(region_path), f"c.{rx * 32 + local_index % 32}.{rz * 32 + local_index // 32}.mcc")
+        with open(mcc, 'rb') as f: payload = f.read()
+    else:
+        payload = mm[start + 5:start + 4 + length]
+    compression &= 0x7F
+    if compression == 1: return gzip.decompress(payload)
+    if compression == 2: return zlib.decompress(payload)
+    if compression == 3: return bytes(payload)
+    return None
+
+def chunk_summary(nbt):
+    """Mengambil (InhabitedTime, Status) dari NBT chunk; format 1.18+ (root) maupun lama (`Level`)."""
+    wanted = {'InhabitedTime', 'Status', 'Level'}
+    pos = 3 + struct.unpack_from('>H', nbt, 1)[0]  # Lewati tipe dan nama compound root
+    values, compounds = _nbt_compound_fields(nbt, pos, wanted)
+    if 'InhabitedTime' not in values and 'Level' in compounds:
+        values, _ = _nbt_compound_fields(nbt, compounds['Level'], wanted)
+    return values.get('InhabitedTime', 0), values.get('Status', '')
+
+def index_region(path, read_chunks=True):
+    """Mengindeks satu file .mca. Hasil: {"chunks": [[indeks_lokal, timestamp, sektor, inhabited, status], ...]}.
+    Tidak berbagi state, sehingga aman dijalankan paralel di thread pool."""
+    chunks = []
+    size = os.path.getsize(path)
+    if size < 8192: return {"chunks": chunks, "error": None}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations = struct.unpack_from('>1024I', mm, 0)
+        timestamps = struct.unpack_from('>1024I', mm, 4096)
+        error = None
+        for i, location in enumerate(locations):
+            if not location: continue
+            offset, sectors = location >> 8, location & 0xFF
+            inhabited, status = -1, ''
+            if read_chunks and (offset + sectors) * 4096 <= size:
+                try:
+                    nbt = read_chunk_nbt(mm, offset, path, i)
+                    if nbt: inhabited, status = chunk_summary(nbt)
+                except (OSError, ValueError, struct.error, zlib.error, EOFError, IndexError) as e:
+                    error = f"chunk {i}: {e}"
+            chunks.append([i, timestamps[i], sectors, inhabited, status])
+    return {"chunks": chunks, "error": error}
+
+def find_region_files(world_path):
+    """Semua file .mca dunia (overworld, nether, end; folder region/entities/poi), relatif ke `world_path`."""
+    found = []
+    for root, dirs, files in os.walk(world_path):
+        if os.path.basename(root) in ('region', 'entities', 'poi'):
+            found.extend(os.path.relpath(os.path.join(root, name), world_path) for name in files if name.endswith('.mca'))
+    return sorted(found)
+
+def region_category(rel):
+    """Dimensi dan jenis data sebuah file region, mis. ('overworld', 'region')."""
+    parts = rel.split(os.sep)
+    dimension = {'DIM-1': 'nether', 'DIM1': 'the_end'}.get(parts[0], 'overworld' if len(parts) == 2 else parts[0])
+    return dimension, parts[-2]
+
+class RegionIndex:
+    """Indeks region satu dunia, disimpan di `<server>/.minelab/region_index/<dunia>.json`."""
+
+    def __init__(self, server_root, world, world_path):
+        self.world_path = world_path
+        self.cache_path = os.path.join(server_root, '.minelab', 'region_index', f'{world}.json')
+        try:
+            with open(self.cache_path) as f: self.regions = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.regions = {}
+
+    def refresh(self, on_progress=None, workers=None):
+        """Mengindeks ulang hanya region yang baru/berubah (mtime_ns/ukuran), paralel di thread pool.
+        Bukan process pool: fork dari proses Streamlit yang multithread (pompa log, server file,
+        pembaca RCON) bisa mewarisi lock yang sedang dipegang dan membuat anak proses macet.
+        Dekompresi zlib dan pembacaan mmap melepas GIL."""
+        started = time.monotonic()
+        current = {}
+        for rel in find_region_files(self.world_path):
+            st_ = os.stat(os.path.join(self.world_path, rel))
+            current[rel] = (st_.st_mtime_ns, st_.st_size)
+        stale = [rel for rel, (mtime_ns, size) in current.items()
+                 if rel not in self.regions or self.regions[rel]["mtime_ns"] != mtime_ns or self.regions[rel]["size"] != size]
+        self.regions = {rel: info for rel, info in self.regions.items() if rel in current}
+        if stale:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="region-index") as pool:
+                futures = {pool.submit(index_region, os.path.join(self.world_path, rel)): rel for rel in stale}
+                for done, future in enumerate(as_completed(futures), 1):
+                    rel = futures[future]
+                    result = future.result()
+                    self.regions[rel] = {"mtime_ns": current[rel][0], "size": current[rel][1], **result}
+                    if on_progress: on_progress(done, len(stale))
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path + '.tmp', 'w') as f: json.dump(self.regions, f)
+        os.replace(self.cache_path + '.tmp', self.cache_path)
+        return {"regions": len(current), "reindexed": len(stale), "seconds": time.monotonic() - started}
+
+    def region_rows(self):
+        """Satu baris ringkasan per file region, untuk tabel statistik."""
+        rows = []
+        for rel, info in self.regions.items():
+            dimension, kind = region_category(rel)
+            chunks = info["chunks"]
+            inhabited = [c[3] for c in chunks if c[3] >= 0]
+            rows.append({
+                "region": rel, "dimensi": dimension, "jenis": kind, "chunk": len(chunks),
+                "ukuran_mb": round(info["size"] / (1024*1024), 2),
+                "terakhir_disimpan": datetime.fromtimestamp(max((c[1] for c in chunks), default=0)).strftime("%Y-%m-%d %H:%M") if chunks else "-",
+                "inhabited_maks_menit": round(max(inhabited, default=0) / 1200, 1),
+                "inhabited_rata_menit": round(sum(inhabited) / len(inhabited) / 1200, 1) if inhabited else 0,
+            })
+        return rows
+
+    def inhabited_histogram(self):
+        """Jumlah chunk terrain (folder `region`) per rentang InhabitedTime."""
+        buckets = {label: 0 for label, _ in INHABITED_BUCKETS}
+        for rel, info in self.regions.items():
+            if region_category(rel)[1] != 'region': continue
+            for chunk in info["chunks"]:
+                if chunk[3] < 0: continue
+                label = next(label for label, limit in INHABITED_BUCKETS if chunk[3] < limit)
+                buckets[label] += 1
+        return buckets
+
+def _chunk_outside_radius(rx, rz, local_index, radius, center):
+    cx, cz = rx * 32 + local_index % 32, rz * 32 + local_index // 32
+    return max(abs(cx - center[0]), abs(cz - center[1])) > radius
+
+def _rewrite_region(path, drop, dry_run):
+    """Menulis ulang satu file .mca tanpa chunk di `drop` secara rapat (tanpa sektor kosong).
+    Mengembalikan (ukuran_sebelum, ukuran_sesudah); file dihapus jika tidak ada chunk tersisa."""
+    if not os.path.exists(path): return 0, 0
+    before = os.path.getsize(path)
+    if before < 8192: return before, before
+    rx, rz = map(int, os.path.basename(path).split('.')[1:3])
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        locations = struct.unpack_from('>1024I', mm, 0)
+        timestamps = struct.unpack_from('>1024I', mm, 4096)
+        kept = [(i, loc >> 8, loc & 0xFF) for i, loc in enumerate(locations)
+                if loc and i not in drop and ((loc >> 8) + (loc & 0xFF)) * 4096 <= before]
+        after = 8192 + 4096 * sum(sectors for _, _, sectors in kept) if kept else 0
+        if dry_run: return before, after
+        if kept:
+            header = bytearray(8192)
+            with open(path + '.tmp', 'wb') as out:
+                out.write(header)
+                sector = 2
+                for i, offset, sectors in kept:
+                    out.write(mm[offset * 4096:(offset + sectors) * 4096])
+                    struct.pack_into('>I', header, i * 4, (sector << 8) | sectors)
+                    struct.pack_into('>I', header, 4096 + i * 4, timestamps[i])
+                    sector += sectors
+                out.seek(0); out.write(header)
+                out.flush(); os.fsync(out.fileno())
+    for i in drop:
+        if locations[i]:
+            mcc = os.path.join(os.path.dirname(path), f"c.{rx * 32 + i % 32}.{rz * 32 + i // 32}.mcc")
+            if os.path.exists(mcc): os.remove(mcc)
+    if kept: os.replace(path + '.tmp', path)
+    else: os.remove(path)
+    return before, after
+
+def prune_region(region_path, min_inhabited, radius, center, dry_run):
+    """Memangkas satu region terrain beserta pasangan `entities/` dan `poi/`-nya.
+    Chunk dibuang jika InhabitedTime < `min_inhabited` (tick) atau di luar `radius` chunk dari `center`.
+    Chunk yang InhabitedTime-nya tidak terbaca selalu dipertahankan."""
+    rx, rz = map(int, os.path.basename(region_path).split('.')[1:3])
+    index = index_region(region_path, read_chunks=min_inhabited is not None)
+    drop = set()
+    for i, _, _, inhabited, _ in index["chunks"]:
+        if radius is not None and _chunk_outside_radius(rx, rz, i, radius, center): drop.add(i)
+        elif min_inhabited is not None and 0 <= inhabited < min_inhabited: drop.add(i)
+    report = {"region": region_path, "chunks": len(index["chunks"]), "removed": len(drop), "bytes_before": 0, "bytes_after": 0}
+    dimension_dir = os.path.dirname(os.path.dirname(region_path))
+    for kind in ('region', 'entities', 'poi'):
+        path = os.path.join(dimension_dir, kind, os.path.basename(region_path))
+        if drop:
+            before, after = _rewrite_region(path, drop, dry_run)
+        else:
+            before = after = os.path.getsize(path) if os.path.exists(path) else 0
+        report["bytes_before"] += before; report["bytes_after"] += after
+    return report
+
+def prune_world(server_name, world_path, min_inhabited=None, radius=None, center=(0, 0), dry_run=True, on_progress=None, workers=None):
+    """Menjalankan `prune_region` untuk semua region terrain dunia di thread pool (lihat `RegionIndex.refresh`).
+    Penulisan hanya diizinkan saat server berhenti; dry-run boleh kapan saja."""
+    if not dry_run and get_supervisor().is_running(server_name):
+        raise RuntimeError("Server masih berjalan. Hentikan server sebelum memangkas chunk.")
+    regions = [os.path.join(world_path, rel) for rel in find_region_files(world_path) if region_category(rel)[1] == 'region']
+    reports = []
+    if regions:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="region-prune") as pool:
+            futures = [pool.submit(prune_region, path, min_inhabited, radius, center, dry_run) for path in regions]
+            for done, future in enumerate(as_completed(futures), 1):
+                reports.append(future.result())
+                if on_progress: on_progress(done, len(futures))
+    return {
+        "regions": len(reports),
+        "chunks": sum(r["chunks"] for r in reports),
+        "removed": sum(r["removed"] for r in reports),
+        "bytes_before": sum(r["bytes_before"] for r in reports),
+        "bytes_after": sum(r["bytes_after"] for r in reports),
+        "details": sorted((r for r in reports if r["removed"]), key=lambda r: r["bytes_after"] - r["bytes_before"]),
+    }
+
+# =================================================================================
+# PRE-GENERASI DUNIA
+# Menggerakkan server yang berjalan (forceload bawaan atau plugin Chunky) secara
+# spiral sampai radius tertentu, sambil menahan laju berdasarkan TPS/MSPT yang
+# dibaca dari log. Progres disimpan agar bisa dilanjutkan setelah restart.
+# =================================================================================
+
+def _tick_health_commands(server_type):
+    """Perintah konsol yang melaporkan TPS/MSPT untuk tipe server tertentu."""
+    if server_type in ('paper', 'purpur', 'folia', 'mohist', 'arclight', 'banner'): return ["tps", "mspt"]
+    if server_type == 'forge': return ["forge tps"]
+    if server_type in ('vanilla', 'snapshot', 'fabric'): return ["tick query"]
+    return []
+
+def parse_tick_health(lines):
+    """Mengambil TPS/MSPT terakhir dari baris log. Mengembalikan {"tps", "mspt", "overloaded"}."""
+    tps = mspt = None
+    overloaded = False
+    for line in lines:
+        line = ANSI_ESCAPE_PATTERN.sub('', line)
+        if match := TPS_PATTERN.search(line): tps = float(match.group(1))
+        elif match := MSPT_PATTERN.search(line): mspt = float(next(g for g in match.groups() if g))
+        elif match := FORGE_TPS_PATTERN.search(line): mspt, tps = float(match.group(1)), float(match.group(2))
+        elif CANT_KEEP_UP_PATTERN.search(line): overloaded = True
+    if tps is None and mspt is not None: tps = min(20.0, 1000.0 / mspt) if mspt > 0 else 20.0
+    return {"tps": tps, "mspt": mspt, "overloaded": overloaded}
+
+def measure_tick_health(managed, timeout=TICK_HEALTH_TIMEOUT):
+    """Menanyakan TPS/MSPT lewat RCON (perintah dijalankan berurutan). Tanpa RCON tidak ada perintah
+    yang dikirim, karena jawaban lewat stdin ikut tercetak di konsol (terlihat pemain dan masuk arsip
+    log); TPS/MSPT dibiarkan None dan hanya "Can't keep up!" dalam TICK_HEALTH_LOG_WINDOW detik
+    terakhir yang dibaca dari buffer log."""
+    commands = _tick_health_commands(managed.server_type)
+    rcon = get_rcon(managed) if commands else None
+    if rcon:
+        try:
+            responses = [rcon.command(command, timeout) for command in commands]  # Berurutan, satu perintah per giliran
+            health = parse_tick_health(line for response in responses for line in response.splitlines())
+            health["at"] = time.time()
+            return health
+        except RconError:
+            pass  # Dibaca pasif dari log di bawah
+    recent, _ = managed.log_buffer.entries_since(managed.log_buffer.next_seq - 500)
+    since = time.time() - TICK_HEALTH_LOG_WINDOW
+    overloaded = any(received >= since and CANT_KEEP_UP_PATTERN.search(line) for received, line in recent)
+    return {"tps": None, "mspt": None, "overloaded": overloaded, "at": time.time()}
+
+def spiral_offsets():
+    """Offset (dx, dz) spiral persegi dari pusat: (0,0), (1,0), (1,1), (0,1), (-1,1), ..."""
+    x = z = 0
+    yield x, z
+    for ring in itertools.count(1):
+        x, z = ring, -ring + 1
+        for dz in range(2 * ring - 1): yield x, z + dz
+        z = ring
+        for dx in range(2 * ring + 1): yield x - dx, z
+        x = -ring
+        for dz in range(1, 2 * ring + 1): yield x, z - dz
+        z = -ring
+        for dx in range(1, 2 * ring + 1): yield x + dx, z
+
+def find_chunky(server_path):
+    """True jika plugin/mod Chunky terpasang di folder server."""
+    for folder in ('plugins', 'mods'):
+        path = os.path.join(server_path, folder)
+        if os.path.isdir(path) and any(name.lower().startswith('chunky') and name.endswith('.jar') for name in os.listdir(path)):
+            return True
+    return False
+
+def dimension_region_dir(server_path, dimension):
+    """Folder region sebuah dimensi (`minecraft:the_nether`, `ns:nama`) untuk tata letak vanilla maupun
+    Bukkit/Paper (`<level>_nether/DIM-1`)."""
+    level = PropertiesDocument(os.path.join(server_path, 'server.properties')).raw.get('level-name', '').strip() or 'world'
+    namespace, name = dimension.split(':', 1) if ':' in dimension else ('minecraft', dimension)
+    world = os.path.join(server_path, level)
+    if namespace == 'minecraft' and name == 'overworld': return os.path.join(world, 'region')
+    if namespace == 'minecraft' and name in ('the_nether', 'the_end'):
+        legacy, suffix = ('DIM-1', 'nether') if name == 'the_nether' else ('DIM1', 'the_end')
+        bukkit = os.path.join(server_path, f"{level}_{suffix}", legacy)
+        return os.path.join(bukkit if os.path.isdir(bukkit) else os.path.join(world, legacy), 'region')
+    return os.path.join(world, 'dimensions', namespace, name, 'region')
+
+def count_stored_chunks(region_dir, x1, z1, x2, z2):
+    """Jumlah chunk dalam persegi koordinat chunk (inklusif) yang sudah tercatat di header file region."""
+    count = 0
+    for rx in range(x1 >> 5, (x2 >> 5) + 1):
+        for rz in range(z1 >> 5, (z2 >> 5) + 1):
+            try:
+                present = {chunk[0] for chunk in index_region(os.path.join(region_dir, f"r.{rx}.{rz}.mca"), read_chunks=False)["chunks"]}
+            except (OSError, ValueError, struct.error):
+                continue  # Region belum ada atau sedang ditulis; dihitung ulang pada percobaan berikutnya
+            count += sum((cz & 31) * 32 + (cx & 31) in present
+                         for cx in range(max(x1, rx * 32), min(x2, rx * 32 + 31) + 1)
+                         for cz in range(max(z1, rz * 32), min(z2, rz * 32 + 31) + 1))
+    return count
+
+class PregenJob:
+    """Satu tugas pre-generasi untuk server yang berjalan; state disimpan di `<server>/.minelab/pregen.json`."""
+
+    def __init__(self, server_name, state):
+        self.server_name = server_name
+        self.state = state
+        self.state_path = self.state_path_for(server_name)
+        self.health = None
+        self.rate = 0.0  # chunk per detik (rata-rata bergerak)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def state_path_for(server_name):
+        return os.path.join(DRIVE_PATH, server_name, '.minelab', 'pregen.json')
+
+    @classmethod
+    def create(cls, server_name, dimension, center, radius_blocks, mode, target_mspt=PREGEN_TARGET_MSPT):
+        block_radius = -(-radius_blocks // (16 * PREGEN_BLOCK_CHUNKS))  # ceil
+        return cls(server_name, {
+            "dimension": dimension, "center": list(center), "radius": radius_blocks, "mode": mode,
+            "target_mspt": target_mspt, "total_steps": (2 * block_radius + 1) ** 2, "next_step": 0,
+            "chunks_done": 0, "status": "running", "updated": datetime.now().isoformat()
+        })
+
+    @classmethod
+    def load(cls, server_name):
+        try:
+            with open(cls.state_path_for(server_name)) as f: return cls(server_name, json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self):
+        self.state["updated"] = datetime.now().isoformat()
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path + '.tmp', 'w') as f: json.dump(self.state, f, indent=4)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    @property
+    def total_chunks(self):
+        side = 2 * -(-self.state["radius"] // 16) + 1
+        return side * side
+
+    @property
+    def is_active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def eta_seconds(self):
+        remaining = max(0, self.total_chunks - self.state["chunks_done"])
+        return remaining / self.rate if self.rate > 0 else None
+
+    def start(self, managed, wait_ready=False):
+        self._stop.clear()
+        self.state["status"] = "running"
+        self.save()
+        self._thread = threading.Thread(target=self._run, args=(managed, wait_ready), name=f"pregen-{self.server_name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Menghentikan tugas; progres tetap tersimpan dan bisa dilanjutkan manual."""
+        self._stop.set()
+        self.state["status"] = "paused"
+        self.save()
+
+    def _healthy(self, managed):
+        self.health = measure_tick_health(managed)
+        if self.health["overloaded"]: return False
+        return self.health["mspt"] is None or self.health["mspt"] <= self.state["target_mspt"]
+
+    def _update_rate(self, chunks, seconds):
+        if seconds <= 0: return
+        sample = chunks / seconds
+        self.rate = sample if not self.rate else 0.7 * self.rate + 0.3 * sample
+
+    def _run(self, managed, wait_ready):
+        if wait_ready and managed.log_buffer.wait_for_match(SERVER_READY_PATTERN, 0, PREGEN_READY_TIMEOUT) is None:
+            return
+        managed.log_buffer.append(f"[MineLab] Pre-generasi ({self.state['mode']}) dimulai dari langkah {self.state['next_step']}.")
+        try:
+            if self.state["mode"] == "chunky": self._run_chunky(managed)
+            else: self._run_forceload(managed)
+        except OSError as e:
+            managed.log_buffer.append(f"[MineLab] Pre-generasi berhenti: {e}")
+        # Jika server berhenti, status tetap "running" agar dilanjutkan otomatis saat server dimulai lagi
+        self.save()
+
+    def _wait_stored(self, managed, region_dir, bounds):
+        """Menunggu chunk blok muncul di header region setelah di-unload (disimpan server saat unload).
+        Bila lambat, `save-all` dikirim sekali; selama penyimpanan dijeda (backup), tenggat ditunda."""
+        deadline = time.monotonic() + PREGEN_VERIFY_TIMEOUT
+        save_sent = False
+        while True:
+            stored = count_stored_chunks(region_dir, *bounds)
+            if stored >= PREGEN_BLOCK_CHUNKS ** 2 or self._stop.is_set() or not managed.is_running(): return stored
+            if managed._save_pause_count:
+                deadline = time.monotonic() + PREGEN_VERIFY_TIMEOUT
+            elif time.monotonic() >= deadline:
+                return stored
+            elif not save_sent and time.monotonic() >= deadline - PREGEN_VERIFY_TIMEOUT / 2:
+                run_server_command(managed, "save-all", echo=False)
+                save_sent = True
+            self._stop.wait(1.0)
+
+    def _run_forceload(self, managed):
+        """Mode bawaan: forceload satu blok PREGEN_BLOCK_CHUNKS x PREGEN_BLOCK_CHUNKS chunk per langkah.
+        Langkah baru dihitung setelah seluruh chunk blok terlihat di header file region."""
+        size = 16 * PREGEN_BLOCK_CHUNKS
+        cx, cz = (c // size for c in self.state["center"])
+        dimension = self.state["dimension"]
+        region_dir = dimension_region_dir(managed.server_path, dimension)
+        offsets = itertools.islice(spiral_offsets(), self.state["next_step"], self.state["total_steps"])
+        for dx, dz in offsets:
+            while not self._stop.is_set() and managed.is_running() and not self._healthy(managed):
+                self._stop.wait(PREGEN_BACKOFF_SECONDS)  # Server sedang berat, beri jeda
+            if self._stop.is_set() or not managed.is_running(): return
+            x1, z1 = (cx + dx) * size, (cz + dz) * size
+            area = f"{x1} {z1} {x1 + size - 1} {z1 + size - 1}"
+            started = time.monotonic()
+            run_server_command(managed, f"execute in {dimension} run forceload add {area}", echo=False)
+            self._stop.wait(PREGEN_SETTLE_SECONDS)
+            while not self._stop.is_set() and managed.is_running() and not self._healthy(managed):
+                self._stop.wait(PREGEN_BACKOFF_SECONDS)  # Tunggu generasi blok ini mereda
+            run_server_command(managed, f"execute in {dimension} run forceload remove {area}", echo=False)
+            if self._stop.is_set() or not managed.is_running(): return
+            stored = self._wait_stored(managed, region_dir, (x1 // 16, z1 // 16, (x1 + size) // 16 - 1, (z1 + size) // 16 - 1))
+            if self._stop.is_set() or not managed.is_running(): return
+            if stored < PREGEN_BLOCK_CHUNKS ** 2:
+                # Langkah tidak dihitung; dilanjutkan manual dari blok yang sama setelah penyebabnya dicek
+                managed.log_buffer.append(f"[MineLab] Pre-generasi dijeda: hanya {stored}/{PREGEN_BLOCK_CHUNKS ** 2} chunk "
+                                          f"blok {area} yang tersimpan di {region_dir}.")
+                self.state["status"] = "paused"
+                return
+            self.state["next_step"] += 1
+            self.state["chunks_done"] = min(self.total_chunks, self.state["chunks_done"] + stored)
+            self._update_rate(stored, time.monotonic() - started)
+            self.save()
+        self.state["status"] = "done"
+        self.state["chunks_done"] = self.total_chunks
+        managed.log_buffer.append("[MineLab] Pre-generasi selesai.")
+
+    def _run_chunky(self, managed):
+        """Mode Chunky: plugin melakukan generasi; dashboard hanya menjeda/melanjutkan sesuai kesehatan tick."""
+        seq = managed.log_buffer.next_seq
+        x, z = self.state["center"]
+        if self.state["next_step"] == 0:
+            for command in (f"chunky world {self.state['dimension']}", f"chunky center {x} {z}",
+                            f"chunky radius {self.state['radius']}", "chunky start"):
+                run_server_command(managed, command)
+            self.state["next_step"] = 1
+            self.save()
+        else:
+            run_server_command(managed, "chunky continue")
+        paused, last_progress = False, (time.monotonic(), self.state["chunks_done"])
+        while not self._stop.is_set() and managed.is_running():
+            self._stop.wait(PREGEN_BACKOFF_SECONDS)
+            lines, seq = managed.log_buffer.since(seq)
+            for line in lines:
+                if match := CHUNKY_PROGRESS_PATTERN.search(line):
+                    self.state["chunks_done"] = int(match.group(1).replace(',', ''))
+                if CHUNKY_DONE_PATTERN.search(line):
+                    self.state["status"] = "done"
+            now = time.monotonic()
+            if self.state["chunks_done"] != last_progress[1]:
+                self._update_rate(self.state["chunks_done"] - last_progress[1], now - last_progress[0])
+                last_progress = (now, self.state["chunks_done"])
+                self.save()
+            if self.state["status"] == "done":
+                managed.log_buffer.append("[MineLab] Pre-generasi selesai."); return
+            healthy = self._healthy(managed)
+            if paused and healthy: run_server_command(managed, "chunky continue"); paused = False
+            elif not paused and not healthy: run_server_command(managed, "chunky pause"); paused = True
+        if managed.is_running() and not paused: run_server_command(managed, "chunky pause")
+
+def resume_pending_pregen(managed, wait_ready):
+    """Melanjutkan pre-generasi yang belum selesai saat server (kembali) berjalan."""
+    job = PregenJob.load(managed.name)
+    if job and job.state.get("status") == "running":
+        managed.pregen = job
+        job.start(managed, wait_ready=wait_ready)
+
+# =================================================================================
+# METRIK SERVER
+# Thread pengumpul per server: CPU/RSS/thread dari /proc, heap & GC JVM lewat jcmd,
+# serta TPS/MSPT/pemain dari perintah konsol. Disimpan di ring buffer berbasis array
+# dengan versi per menit untuk tampilan 24 jam.
+# =================================================================================
+
+class TimeSeries:
+    """Ring buffer (waktu, nilai) berkapasitas tetap di atas `array('d')`."""
+    __slots__ = ('times', 'values', 'capacity', 'size', 'head')
+
+    def __init__(self, capacity):
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.capacity, self.size, self.head = capacity, 0, 0
+
+    def append(self, t, value):
+        self.times[self.head], self.values[self.head] = t, value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def points(self, since=0.0):
+        """Titik berurutan dari yang terlama dengan waktu >= `since`: ([waktu], [nilai])."""
+        start = (self.head - self.size) % self.capacity
+        order = [(start + i) % self.capacity for i in range(self.size)]
+        order = [i for i in order if self.times[i] >= since]
+        return [self.times[i] for i in order], [self.values[i] for i in order]
+
+class DownsampledSeries:
+    """Deret mentah untuk 1 jam terakhir plus rata-rata per METRICS_BUCKET_SECONDS untuk 24 jam."""
+    __slots__ = ('raw', 'buckets', '_bucket_start', '_sum', '_count')
+
+    def __init__(self):
+        self.raw = TimeSeries(METRICS_RAW_CAPACITY)
+        self.buckets = TimeSeries(METRICS_BUCKET_CAPACITY)
+        self._bucket_start, self._sum, self._count = None, 0.0, 0
+
+    def append(self, t, value):
+        self.raw.append(t, value)
+        bucket = t - t % METRICS_BUCKET_SECONDS
+        if self._bucket_start is not None and bucket != self._bucket_start and self._count:
+            self.buckets.append(self._bucket_start, self._sum / self._count)
+            self._sum, self._count = 0.0, 0
+        self._bucket_start = bucket
+        self._sum += value; self._count += 1
+
+    def view(self, window):
+        now = time.time()
+        if window <= 3600: return self.raw.points(now - window)
+        times, values = self.buckets.points(now - window)
+        if self._count:  # Ember yang sedang berjalan
+            times.append(self._bucket_start); values.append(self._sum / self._count)
+        return times, values
+
+def read_proc_usage(pid):
+    """(detik CPU total, RSS byte, jumlah thread) proses dari /proc; None jika proses tidak ada."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return cpu_seconds, int(fields[21]) * PAGE_SIZE, int(fields[17])
+
+def find_jcmd(pid):
+    """Mencari `jcmd` di samping executable `java` milik proses, lalu di PATH.
+    Paket JRE headless tidak menyertakan jcmd; dalam hal itu metrik heap tidak tersedia."""
+    try:
+        candidate = os.path.join(os.path.dirname(os.path.realpath(f'/proc/{pid}/exe')), 'jcmd')
+        if os.access(candidate, os.X_OK): return candidate
+    except OSError:
+        pass
+    return shutil.which('jcmd')
+
+def read_jvm_counters(jcmd, pid):
+    """Membaca heap dan GC dari `jcmd <pid> PerfCounter.print`. Karena server dijalankan dengan
+    -XX:+PerfDisableSharedMem, file hsperfdata tidak ada sehingga jstat tidak bisa dipakai;
+    jcmd memakai attach API dan tetap bisa membaca counter yang sama dari dalam JVM."""
+    result = subprocess.run([jcmd, str(pid), 'PerfCounter.print'], capture_output=True, text=True, timeout=15)
+    if result.returncode != 0: return None
+    counters = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    def number(key, default=0): return int(counters[key]) if key in counters else default
+    used = sum(int(v) for k, v in counters.items() if JVM_SPACE_USED_PATTERN.fullmatch(k))
+    committed = sum(int(v) for k, v in counters.items() if JVM_GENERATION_CAPACITY_PATTERN.fullmatch(k))
+    frequency = number('sun.os.hrt.frequency', 1) or 1
+    return {
+        "heap_used_mb": used / (1024*1024), "heap_committed_mb": committed / (1024*1024),
+        "gc_young_count": number('sun.gc.collector.0.invocations'), "gc_old_count": number('sun.gc.collector.1.invocations'),
+        "gc_time_ms": (number('sun.gc.collector.0.time') + number('sun.gc.collector.1.time')) * 1000 / frequency,
+    }
+
+def measure_player_count(managed, timeout=TICK_HEALTH_TIMEOUT):
+    """Menjalankan `list` lewat RCON dan mengembalikan (online, maksimum) atau None. Tanpa RCON tidak
+    ada yang dikirim (jawaban stdin tercetak di konsol); jumlah pemain tetap dicatat dari event
+    join/leave oleh PlayerSessionTracker."""
+    rcon = get_rcon(managed)
+    try:
+        line = rcon.command("list", timeout) if rcon else None
+    except RconError:
+        line = None
+    match = PLAYER_LIST_PATTERN.search(ANSI_ESCAPE_PATTERN.sub('', line)) if line else None
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+class MetricsCollector:
+    """Pengumpul metrik satu server; dijalankan sebagai thread daemon selama proses hidup."""
+
+    def __init__(self, managed):
+        self.managed = managed
+        self.series = {name: DownsampledSeries() for name in METRIC_NAMES}
+        self.jcmd = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"metrics-{self.managed.name}", daemon=True).start()
+        return self
+
+    def record(self, name, value, t=None):
+        with self._lock: self.series[name].append(t or time.time(), value)
+
+    def view(self, names, window):
+        """{nama: ([waktu], [nilai])} untuk jendela `window` detik."""
+        with self._lock: return {name: self.series[name].view(window) for name in names}
+
+    def latest(self, name):
+        with self._lock:
+            series = self.series[name].raw
+            return series.values[(series.head - 1) % series.capacity] if series.size else None
+
+    def _run(self):
+        managed, pid = self.managed, self.managed.proc.pid
+        java = managed.server_type not in ('bedrock',)
+        self.jcmd = find_jcmd(pid) if java else None
+        previous = None
+        next_jvm = next_tick = 0.0
+        last_gc = None
+        while managed.is_running():
+            now, mono = time.time(), time.monotonic()
+            usage = read_proc_usage(pid)
+            if usage is None: break
+            if previous:
+                self.record("cpu_percent", 100 * (usage[0] - previous[0]) / max(1e-6, mono - previous[1]), now)
+            previous = (usage[0], mono)
+            self.record("rss_mb", usage[1] / (1024*1024), now)
+            self.record("threads", usage[2], now)
+
+            if self.jcmd and mono >= next_jvm:
+                next_jvm = mono + METRICS_JVM_INTERVAL
+                try:
+                    jvm = read_jvm_counters(self.jcmd, pid)
+                except (OSError, subprocess.TimeoutExpired):
+                    jvm = None
+                if jvm:
+                    self.record("heap_used_mb", jvm["heap_used_mb"], now)
+                    self.record("heap_committed_mb", jvm["heap_committed_mb"], now)
+                    if last_gc:
+                        self.record("gc_count", jvm["gc_young_count"] + jvm["gc_old_count"] - last_gc[0], now)
+                        self.record("gc_time_ms", jvm["gc_time_ms"] - last_gc[1], now)
+                    last_gc = (jvm["gc_young_count"] + jvm["gc_old_count"], jvm["gc_time_ms"])
+
+            if mono >= next_tick:
+                next_tick = mono + METRICS_TICK_INTERVAL
+                health = measure_tick_health(managed) if _tick_health_commands(managed.server_type) else {}
+                if health.get("tps") is not None: self.record("tps", health["tps"], now)
+                if health.get("mspt") is not None: self.record("mspt", health["mspt"], now)
+                players = measure_player_count(managed)
+                if players: self.record("players", players[0], now)
+            time.sleep(max(0.0, METRICS_SAMPLE_INTERVAL - (time.monotonic() - mono)))
+
+# =================================================================================
+# PING STATUS SERVER
+# Klien Server List Ping (Java, TCP) dan RakNet unconnected ping (Bedrock, UDP)
+# untuk memastikan server benar-benar menerima koneksi, baik lewat localhost maupun
+# alamat tunnel publik, beserta riwayat latensinya.
+# =================================================================================
+
+def _varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value: out.append(byte | 0x80)
+        else: out.append(byte); return bytes(out)
+
+def _read_varint(sock):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = sock.recv(1)
+        if not byte: raise ConnectionError("Koneksi ditutup server")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80: return value
+    raise ValueError("VarInt terlalu panjang")
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk: raise ConnectionError("Koneksi ditutup server")
+        data += chunk
+    return bytes(data)
+
+def _mc_packet(packet_id, payload=b''):
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+def _mc_text(component):
+    """Meratakan komponen chat JSON (deskripsi MOTD) menjadi teks biasa."""
+    if isinstance(component, str): return component
+    if isinstance(component, list): return ''.join(_mc_text(c) for c in component)
+    if isinstance(component, dict): return component.get('text', '') + ''.join(_mc_text(c) for c in component.get('extra', []))
+    return ''
+
+def java_status_ping(host, port, timeout=PING_TIMEOUT):
+    """Server List Ping: handshake (next state = status), status request, lalu ping/pong untuk latensi."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.settimeout(timeout)
+        host_bytes = host.encode('utf-8')
+        sock.sendall(_mc_packet(0x00, _varint(-1) + _varint(len(host_bytes)) + host_bytes + struct.pack('>H', port) + _varint(1))
+                     + _mc_packet(0x00))
+        _read_varint(sock)  # Panjang paket
+        if _read_varint(sock) != 0x00: raise ValueError("Respons status tidak valid")
+        status = json.loads(_recv_exact(sock, _read_varint(sock)).decode('utf-8'))
+        started = time.perf_counter()
+        sock.sendall(_mc_packet(0x01, struct.pack('>q', int(time.time() * 1000))))
+        _read_varint(sock); _read_varint(sock); _recv_exact(sock, 8)
+        latency = (time.perf_counter() - started) * 1000
+    players = status.get('players', {})
+    return {"latency_ms": latency, "motd": _mc_text(status.get('description', '')), "version": status.get('version', {}).get('name', ''),
+            "online": players.get('online'), "max": players.get('max')}
+
+def bedrock_status_ping(host, port, timeout=PING_TIMEOUT):
+    """RakNet unconnected ping (0x01) dan membaca unconnected pong (0x1c) berisi string status MCPE."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        started = time.perf_counter()
+        sock.sendto(b'\x01' + struct.pack('>q', int(time.time() * 1000)) + RAKNET_MAGIC + struct.pack('>q', os.getpid()), (host, port))
+        while True:
+            data, _ = sock.recvfrom(2048)
+            if data[:1] == b'\x1c': break
+        latency = (time.perf_counter() - started) * 1000
+    length = struct.unpack_from('>H', data, 33)[0]
+    fields = data[35:35 + length].decode('utf-8', 'replace').split(';')
+    fields += [''] * (6 - len(fields))
+    return {"latency_ms": latency, "motd": fields[1], "version": fields[3],
+            "online": int(fields[4]) if fields[4].isdigit() else None, "max": int(fields[5]) if fields[5].isdigit() else None}
+
+def status_ping(server_type, host, port, timeout=PING_TIMEOUT):
+    """Ping sesuai edisi; mengembalikan dict status dengan `ok` dan `error` (tanpa melempar exception)."""
+    try:
+        ping = bedrock_status_ping if server_type == 'bedrock' else java_status_ping
+        return {"ok": True, "error": None, **ping(host, port, timeout)}
+    except (OSError, ValueError, struct.error, json.JSONDecodeError) as e:
+        return {"ok": False, "error": str(e) or type(e).__name__, "latency_ms": None}
+
+def server_listen_port(server_path, server_type):
+    """Port dari `server-port` di server.properties, atau port bawaan edisinya."""
+    default = 19132 if server_type == 'bedrock' else 25565
+    properties_path = os.path.join(server_path, 'server.properties')
+    if not os.path.exists(properties_path): return default
+    value = PropertiesDocument(properties_path).get('server-port')
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
+
+def split_tunnel_address(address):
+    """'tcp://host:port' -> ('host', port); None jika alamat tidak lengkap."""
+    host, _, port = address.split('://')[-1].rpartition(':')
+    return (host, int(port)) if host and port.isdigit() else None
+
+class StatusProber:
+    """Thread yang mem-ping server lewat localhost dan tunnel secara berkala, menyimpan riwayat latensi."""
+
+    def __init__(self, managed):
+        self.managed = managed
+        self.latest = {}  # target -> hasil ping terakhir
+        self.history = {}  # target -> DownsampledSeries latensi (ms)
+        self.ready_at = None  # Waktu pertama kali localhost menjawab ping
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"status-ping-{self.managed.name}", daemon=True).start()
+        return self
+
+    def targets(self):
+        managed = self.managed
+        port = server_listen_port(managed.server_path, managed.server_type)
+        targets = {"localhost": ("127.0.0.1", port)}
+        if managed.tunnel_address and (endpoint := split_tunnel_address(managed.tunnel_address)):
+            targets[f"tunnel ({managed.tunnel_provider or 'tidak diketahui'})"] = endpoint
+        return targets
+
+    def probe_now(self):
+        """Meminta ping segera tanpa menunggu jadwal berikutnya."""
+        self._wake.set()
+
+    def _record_provider(self, provider, latency):
+        path = os.path.join(DRIVE_PATH, self.managed.name, '.minelab', 'tunnel_latency.json')
+        try:
+            with open(path) as f: summary = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            summary = {}
+        entry = summary.setdefault(provider, {"samples": 0, "avg_ms": 0.0, "min_ms": latency, "max_ms": latency})
+        entry["samples"] += 1
+        entry["avg_ms"] += (latency - entry["avg_ms"]) / entry["samples"]
+        entry["min_ms"], entry["max_ms"] = min(entry["min_ms"], latency), max(entry["max_ms"], latency)
+        entry["last"] = datetime.now().isoformat()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f: json.dump(summary, f, indent=4)
+        os.replace(path + '.tmp', path)
+
+    def _run(self):
+        while self.managed.is_running():
+            # Sebelum server siap, ping lebih sering agar sinyal kesiapan cepat terlihat
+            interval = PING_INTERVAL if self.ready_at else PING_READY_INTERVAL
+            for label, (host, port) in self.targets().items():
+                result = status_ping(self.managed.server_type, host, port)
+                result["at"] = time.time()
+                with self._lock:
+                    self.latest[label] = result
+                    if result["ok"]: self.history.setdefault(label, DownsampledSeries()).append(result["at"], result["latency_ms"])
+                if result["ok"] and label == "localhost" and not self.ready_at:
+                    self.ready_at = result["at"]
+                    self.managed.log_buffer.append(f"[MineLab] Server menerima koneksi (ping {result['latency_ms']:.0f} ms).")
+                if result["ok"] and label != "localhost" and self.managed.tunnel_provider:
+                    try: self._record_provider(self.managed.tunnel_provider, result["latency_ms"])
+                    except OSError: pass
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def view(self, window):
+        with self._lock: return {label: series.view(window) for label, series in self.history.items()}
+
+def load_tunnel_latency_summary(server_name):
+    try:
+        with open(os.path.join(DRIVE_PATH, server_name, '.minelab', 'tunnel_latency.json')) as f: return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+# =================================================================================
+# ARSIP LOG
+# Indeks SQLite (FTS5) atas logs/*.log.gz dan logs/latest.log di disk lokal Colab.
+# File .gz diindeks sekali; latest.log dilanjutkan dari offset byte terakhir.
+# =================================================================================
+
+LOG_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, name TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, offset INTEGER,
+    head TEXT, base_date TEXT, last_seconds INTEGER, lines INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY, file_id INTEGER, ts REAL, level TEXT, thread TEXT, message TEXT
+);
+CREATE INDEX IF NOT EXISTS lines_ts ON lines(ts);
+CREATE INDEX IF NOT EXISTS lines_level_ts ON lines(level, ts);
+CREATE INDEX IF NOT EXISTS lines_file ON lines(file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(message, content='lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS lines_ad AFTER DELETE ON lines BEGIN
+    INSERT INTO lines_fts(lines_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+def parse_log_line(line):
+    """Memecah baris log Vanilla/Paper/Forge/Bedrock menjadi (tanggal|None, detik_dalam_hari, level, thread, pesan).
+    Mengembalikan None untuk baris lanjutan (mis. stack trace) yang tidak berawalan waktu."""
+    match = LOG_LINE_PATTERN.match(line)
+    if not match: return None
+    date_text = match.group('date')
+    date = None
+    if date_text:
+        date = datetime.strptime(date_text, '%Y-%m-%d' if '-' in date_text else '%d%b%Y').date()
+    hours, minutes, seconds = map(int, match.group('time').split(':'))
+    level = (match.group('level') or match.group('level2') or '').replace('WARNING', 'WARN')
+    return date, hours * 3600 + minutes * 60 + seconds, level, match.group('thread') or '', match.group('message')
+
+def _fts_query(text):
+    """Mengubah input bebas menjadi query FTS5: setiap kata menjadi frasa, digabung dengan AND."""
+    return ' '.join('"' + token.replace('"', '""') + '"' for token in text.split())
+
+class LogArchive:
+    """Indeks log satu server, disimpan di RUNTIME_DIR/<server>/logindex.sqlite."""
+
+    def __init__(self, server_name):
+        self.db_path = os.path.join(RUNTIME_DIR, server_name, 'logindex.sqlite')
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn: conn.executescript(LOG_ARCHIVE_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @staticmethod
+    def _head(path):
+        """Sidik jari baris pertama; berubah hanya jika latest.log diganti file baru."""
+        with open(path, 'rb') as f: return hashlib.sha1(f.readline(512)).hexdigest()
+
+    def refresh(self, logs_dir, on_progress=None):
+        """Mengindeks file log baru/berubah di `logs_dir`. Mengembalikan ringkasan pekerjaan."""
+        started = time.monotonic()
+        if not os.path.isdir(logs_dir): return {"files": 0, "lines": 0, "seconds": 0.0}
+        names = sorted(n for n in os.listdir(logs_dir) if (n.endswith('.log.gz') or n == 'latest.log') and not n.startswith('debug'))
+        total_lines = indexed_files = 0
+        with self._connect() as conn:
+            known = {row[0]: row[1:] for row in conn.execute('SELECT name, id, size, offset, head, base_date, last_seconds FROM files')}
+            for done, name in enumerate(names, 1):
+                path = os.path.join(logs_dir, name)
+                st_ = os.stat(path)
+                previous = known.get(name)
+                if name.endswith('.gz'):
+                    if previous and previous[1] == st_.st_size: continue  # Arsip .gz tidak pernah berubah
+                    total_lines += self._index_file(conn, name, path, st_, previous, gzip_file=True)
+                else:
+                    head = self._head(path)
+                    if previous and previous[3] == head and previous[2] == st_.st_size: continue
+                    if previous and (previous[3] != head or st_.st_size < previous[2]):
+                        # latest.log telah dirotasi menjadi .gz; isinya akan diindeks dari arsip tersebut
+                        conn.execute('DELETE FROM lines WHERE file_id = ?', (previous[0],))
+                        conn.execute('DELETE FROM files WHERE id = ?', (previous[0],))
+                        previous = None
+                    total_lines += self._index_file(conn, name, path, st_, previous, head=head)
+                indexed_files += 1
+                conn.commit()
+                if on_progress: on_progress(done, len(names))
+        return {"files": indexed_files, "lines": total_lines, "seconds": time.monotonic() - started}
+
+    @staticmethod
+    def _iter_rows(path, gzip_file, offset, last_seconds, limit=None):
+        """Membaca baris log mulai `offset` (sampai `limit` byte bila diberikan). Menghasilkan
+        (offset_akhir, detik_terakhir, tanggal_baris, hari_ke, detik, level, thread, pesan)."""
+        level, thread, day = 'INFO', '', 0
+        opener = gzip.open if gzip_file else open
+        with opener(path, 'rb') as f:
+            if offset: f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n') and not gzip_file: break  # Baris terakhir belum lengkap
+                if limit is not None and offset >= limit: break
+                offset += len(raw)
+                line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                parsed = parse_log_line(line)
+                if parsed:
+                    line_date, seconds, level, thread, message = parsed
+                    if last_seconds is not None and seconds < last_seconds - 3600: day += 1  # Lewat tengah malam
+                    last_seconds = seconds
+                else:
+                    line_date, seconds, message = None, last_seconds or 0, line
+                yield offset, last_seconds, line_date, day, seconds, level, thread, message
+
+    def _index_file(self, conn, name, path, st_, previous, gzip_file=False, head=None):
+        """Mengindeks satu file secara streaming, disisipkan per LOG_ARCHIVE_BATCH_ROWS baris."""
+        if gzip_file and previous:
+            conn.execute('DELETE FROM lines WHERE file_id = ?', (previous[0],))
+        limit = None
+        if previous and not gzip_file:
+            file_id, offset = previous[0], previous[2]
+            base_date, last_seconds = datetime.strptime(previous[4], '%Y-%m-%d').date(), previous[5]
+        else:
+            conn.execute('INSERT OR REPLACE INTO files (name, size, mtime_ns, offset, head) VALUES (?, ?, ?, 0, ?)', (name, 0, 0, head))
+            file_id, offset, last_seconds = conn.execute('SELECT id FROM files WHERE name = ?', (name,)).fetchone()[0], 0, None
+            # Tanggal di nama arsip (atau mtime untuk latest.log) adalah hari terakhir isinya. Pass pertama
+            # hanya menghitung pergantian hari agar tanggal awal diketahui sebelum baris disisipkan.
+            match = LOG_FILE_DATE_PATTERN.match(name)
+            end_date = datetime.strptime(match.group(1), '%Y-%m-%d').date() if match else datetime.fromtimestamp(st_.st_mtime).date()
+            days = 0
+            for limit, _, _, days, *_ in self._iter_rows(path, gzip_file, 0, None): pass
+            base_date = end_date - timedelta(days=days)
+            if gzip_file: limit = None  # Arsip tidak berubah; batas hanya untuk latest.log yang masih ditulis
+
+        day_starts = {}
+        def day_start(line_date, line_day):
+            key = line_date or line_day
+            if key not in day_starts:
+                day_starts[key] = datetime.combine(line_date or base_date + timedelta(days=line_day), datetime.min.time()).timestamp()
+            return day_starts[key]
+        def insert(batch):
+            first_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM lines').fetchone()[0]
+            conn.executemany('INSERT INTO lines (file_id, ts, level, thread, message) VALUES (?, ?, ?, ?, ?)', batch)
+            # Isi indeks FTS sekaligus untuk seluruh batch (lebih cepat daripada trigger per baris)
+            conn.execute('INSERT INTO lines_fts(rowid, message) SELECT id, message FROM lines WHERE id > ?', (first_id,))
+
+        batch, count, day = [], 0, 0
+        for offset, last_seconds, line_date, day, seconds, level, thread, message in self._iter_rows(path, gzip_file, offset, last_seconds, limit):
+            batch.append((file_id, day_start(line_date, day) + seconds, level, thread, message))
+            if len(batch) >= LOG_ARCHIVE_BATCH_ROWS:
+                insert(batch); count += len(batch); batch = []
+        if batch: insert(batch); count += len(batch)
+        if not gzip_file and day:
+            base_date += timedelta(days=day)  # Lanjutan berikutnya mulai dari hari terakhir
+        conn.execute('UPDATE files SET size = ?, mtime_ns = ?, offset = ?, base_date = ?, last_seconds = ?, lines = lines + ? WHERE id = ?',
+                     (st_.st_size, st_.st_mtime_ns, offset, base_date.isoformat(), last_seconds, count, file_id))
+        return count
+
+    def query(self, text='', levels=(), since=None, thread='', limit=LOG_ARCHIVE_RESULT_LIMIT):
+        """Baris terbaru yang cocok: teks (FTS5), level, waktu minimum (epoch) dan nama thread."""
+        sql = 'SELECT l.ts, l.level, l.thread, l.message, f.name FROM lines l JOIN files f ON f.id = l.file_id WHERE 1=1'
+        params = []
+        if text.strip():
+            sql += ' AND l.id IN (SELECT rowid FROM lines_fts WHERE lines_fts MATCH ?)'; params.append(_fts_query(text))
+        if levels:
+            sql += f" AND l.level IN ({','.join('?' * len(levels))})"; params.extend(levels)
+        if since is not None:
+            sql += ' AND l.ts >= ?'; params.append(since)
+        if thread.strip():
+            sql += ' AND l.thread LIKE ?'; params.append(f'%{thread.strip()}%')
+        sql += ' ORDER BY l.ts DESC, l.id DESC LIMIT ?'; params.append(limit)
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def stats(self):
+        with self._connect() as conn:
+            files, lines = conn.execute('SELECT COUNT(*), COALESCE(SUM(lines), 0) FROM files').fetchone()
+        return {"files": files, "lines": lines, "db_mb": os.path.getsize(self.db_path) / (1024*1024)}
+
+# =================================================================================
+# PIPELINE EVENT LOG
+# Thread terpisah yang membaca LogBuffer (tanpa menunda panel konsol), mengenali
+# format baris, mengekstrak event dengan regex yang sudah dikompilasi, lalu
+# meneruskannya ke subscriber: sesi pemain, peringatan, dan metrik.
+# =================================================================================
+
+# (tipe event, kata kunci untuk pra-saring murah, regex). Regex hanya dijalankan jika kata kuncinya ada di baris.
+LOG_EVENT_RULES = [
+    # Join/leave dijangkar ke awal pesan server (`]: `) dan akhir baris agar chat seperti
+    # `<Bob> Alice joined the game` tidak dianggap event.
+    ("join", "joined the game", re.compile(r'\]: (?P<player>[\w.]{1,16}) joined the game$')),
+    ("join", "Player connected", re.compile(r'\] Player connected: (?P<player>[^,]+), xuid: (?P<xuid>\d+)')),
+    ("leave", "left the game", re.compile(r'\]: (?P<player>[\w.]{1,16}) left the game$')),
+    ("leave", "Player disconnected", re.compile(r'\] Player disconnected: (?P<player>[^,]+), xuid: (?P<xuid>\d+)')),
+    ("overloaded", "Can't keep up", re.compile(r"Can't keep up!.*?Running (?P<ms>\d+)ms or (?P<ticks>\d+) ticks behind")),
+    ("ready", "Done (", re.compile(r'Done \((?P<seconds>[\d.,]+)s\)!')),
+    ("ready", "Server started", re.compile(r'Server started\.')),
+    ("world_progress", "Preparing spawn area", re.compile(r'Preparing spawn area: (?P<percent>\d+)%')),
+    ("world_prepare", "Preparing level", re.compile(r'Preparing level "(?P<world>[^"]+)"')),
+    ("plugin_load", "Loading ", re.compile(r'\[(?P<plugin>[^\]\s]+)\] Loading (?:server plugin )?(?P=plugin) v(?P<version>\S+)')),
+    ("plugin_enable", "Enabling ", re.compile(r'\[(?P<plugin>[^\]\s]+)\] Enabling (?P=plugin) v(?P<version>\S+)')),
+    ("crash", "crash report", re.compile(r'This crash report has been saved to: (?P<path>\S+)')),
+    ("crash", "Exception in server tick loop", re.compile(r'Exception in server tick loop')),
+    ("crash", "A fatal error has been detected", re.compile(r'A fatal error has been detected by the Java Runtime')),
+    ("gc_warning", "OutOfMemoryError", re.compile(r'java\.lang\.OutOfMemoryError: (?P<detail>.+)')),
+    ("gc_warning", "GC overhead", re.compile(r'GC overhead limit exceeded')),
+]
+
+def classify_log_line(line):
+    """Mengenali format baris ('forge', 'bedrock', 'paper', 'vanilla', atau None) dan levelnya."""
+    match = LOG_LINE_PATTERN.match(line)
+    if not match: return None, None
+    date = match.group('date')
+    if date: fmt = 'bedrock' if '-' in date else 'forge'
+    else: fmt = 'vanilla' if match.group('thread') else 'paper'
+    return fmt, (match.group('level') or match.group('level2') or '').replace('WARNING', 'WARN')
+
+def extract_log_events(line, received_at):
+    """Daftar event dari satu baris log (umumnya kosong)."""
+    events = []
+    line = ANSI_ESCAPE_PATTERN.sub('', line).rstrip()
+    for event_type, keyword, pattern in LOG_EVENT_RULES:
+        if keyword not in line: continue
+        match = pattern.search(line)
+        if match:
+            event = {"type": event_type, "time": received_at, "line": line, **match.groupdict()}
+            event["format"], event["level"] = classify_log_line(line)
+            events.append(event)
+    return events
+
+class LogPipeline:
+    """Konsumen LogBuffer per server yang mempublikasikan event ke subscriber.
+    Subscriber dipanggil dari thread pipeline; exception subscriber tidak menghentikan pipeline."""
+
+    def __init__(self, managed):
+        self.managed = managed
+        self._subscribers = []  # (set tipe | None, callback)
+        self.counts = {}  # tipe event -> jumlah
+        self.lines_processed = 0
+
+    def subscribe(self, callback, types=None):
+        self._subscribers.append((set(types) if types else None, callback))
+
+    def publish(self, event):
+        self.counts[event["type"]] = self.counts.get(event["type"], 0) + 1
+        for types, callback in self._subscribers:
+            if types is None or event["type"] in types:
+                try: callback(event)
+                except Exception as e: self.managed.log_buffer.append(f"[MineLab] Subscriber event gagal: {e}")
+
+    def start(self, since_seq=0):
+        threading.Thread(target=self._run, args=(since_seq,), name=f"log-pipeline-{self.managed.name}", daemon=True).start()
+        return self
+
+    def _run(self, seq):
+        buffer = self.managed.log_buffer
+        while True:
+            batch, seq = buffer.entries_since(seq)
+            for received_at, line in batch:
+                if line.startswith(('> ', '[MineLab]')): continue  # Baris milik dashboard sendiri
+                for event in extract_log_events(line, received_at): self.publish(event)
+            self.lines_processed += len(batch)
+            if buffer.closed and not batch: break
+            buffer.wait_for(seq, 1.0)
+
+class PlayerSessionTracker:
+    """Subscriber join/leave: pemain online, riwayat sesi, dan log sesi di `<server>/.minelab/player_sessions.jsonl`."""
+
+    def __init__(self, server_name, on_change=None):
+        self.online = {}  # pemain -> waktu join
+        self.sessions = deque(maxlen=200)
+        self.path = os.path.join(DRIVE_PATH, server_name, '.minelab', 'player_sessions.jsonl')
+        self.on_change = on_change
+
+    def __call__(self, event):
+        player = event["player"].strip()
+        if event["type"] == "join":
+            self.online[player] = event["time"]
+        elif player in self.online:
+            session = {"player": player, "join": self.online.pop(player), "leave": event["time"]}
+            session["seconds"] = session["leave"] - session["join"]
+            self.sessions.append(session)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a') as f: f.write(json.dumps(session) + '\n')
+            except OSError:
+                pass
+        if self.on_change: self.on_change(len(self.online), event["time"])
+
+class AlertCenter:
+    """Subscriber untuk event yang perlu perhatian. Peringatan 'overloaded' digabung per menit."""
+
+    def __init__(self):
+        self.alerts = deque(maxlen=100)
+
+    def __call__(self, event):
+        last = self.alerts[-1] if self.alerts else None
+        if event["type"] == "overloaded" and last and last["type"] == "overloaded" and event["time"] - last["time"] < 60:
+            last["count"] += 1
+            last["ticks"] = max(last["ticks"], int(event["ticks"]))
+            return
+        alert = {"type": event["type"], "time": event["time"], "line": event["line"], "count": 1}
+        if event["type"] == "overloaded": alert["ticks"] = int(event["ticks"])
+        self.alerts.append(alert)
+
+def attach_log_pipeline(managed):
+    """Membuat pipeline event untuk server beserta subscriber bawaannya (belum dijalankan,
+    agar pemanggil bisa menambah subscriber sebelum baris pertama diproses)."""
+    pipeline = LogPipeline(managed)
+    managed.alerts = AlertCenter()
+    managed.sessions = PlayerSessionTracker(managed.name, on_change=lambda count, t: managed.metrics and managed.metrics.record("players", count, t))
+    pipeline.subscribe(managed.sessions, types=("join", "leave"))
+    pipeline.subscribe(managed.alerts, types=("crash", "overloaded", "gc_warning"))
+    pipeline.subscribe(lambda e: managed.metrics and managed.metrics.record("ticks_behind", int(e["ticks"]), e["time"]), types=("overloaded",))
+    return pipeline
+
+# =================================================================================
+# PROFIL STARTUP
+# Mengukur setiap fase jalur start di dashboard, lalu (lewat pipeline event log)
+# waktu boot server, pemuatan/pengaktifan plugin, dan persiapan dunia. Ringkasan
+# setiap start disimpan di `<server>/.minelab/startup_history.json`.
+# =================================================================================
+
+class StartupProfiler:
+    """Satu jejak startup. Fase dashboard dicatat dengan `phase()`, fase server dari event log."""
+
+    def __init__(self, server_name):
+        self.server_name = server_name
+        self.started_at = time.time()
+        self.phases = []  # [(nama, detik)]
+        self.launched_at = None
+        self.milestones = []  # [(tipe event, waktu, nama plugin|None)]
+        self.finished = False
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try: yield
+        finally: self.phases.append((name, time.perf_counter() - started))
+
+    def attach(self, managed):
+        """Mulai mendengarkan event server setelah proses diluncurkan."""
+        self.launched_at = time.time()
+        managed.pipeline.subscribe(self._on_event, types=("plugin_load", "plugin_enable", "world_prepare", "world_progress", "ready"))
+
+    def _on_event(self, event):
+        if self.finished: return
+        self.milestones.append((event["type"], event["time"], event.get("plugin")))
+        if event["type"] == "ready":
+            self.finished = True
+            reported = event.get("seconds")
+            self.save(float(reported.replace(',', '.')) if reported else None)
+
+    def plugin_durations(self):
+        """{plugin: {"load": detik, "enable": detik}}; durasi = jarak ke milestone berikutnya."""
+        durations = {}
+        for (kind, t, plugin), (_, next_t, _) in zip(self.milestones, self.milestones[1:]):
+            if kind in ("plugin_load", "plugin_enable"):
+                durations.setdefault(plugin, {"load": 0.0, "enable": 0.0})[kind.split('_')[1]] += next_t - t
+        return durations
+
+    def server_segments(self, ready_at):
+        """Pembagian waktu dari peluncuran proses sampai 'Done': boot JVM, plugin, dunia."""
+        segments, previous_t, previous_label = [], self.launched_at, "Boot JVM & server"
+        labels = {"plugin_load": "Memuat plugin", "plugin_enable": "Mengaktifkan plugin", "world_prepare": "Menyiapkan dunia", "world_progress": "Menyiapkan dunia"}
+        for kind, t, _ in self.milestones:
+            label = labels.get(kind)
+            if not label or label == previous_label: continue
+            segments.append((previous_label, t - previous_t))
+            previous_t, previous_label = t, label
+        segments.append((previous_label, ready_at - previous_t))
+        merged = {}
+        for label, seconds in segments: merged[label] = merged.get(label, 0.0) + seconds
+        return list(merged.items())
+
+    def save(self, reported_seconds):
+        ready_at = self.milestones[-1][1]
+        record = {
+            "started": datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            "dashboard_phases": [[name, round(seconds, 3)] for name, seconds in self.phases],
+            "server_phases": [[name, round(seconds, 3)] for name, seconds in self.server_segments(ready_at)],
+            "reported_done_seconds": reported_seconds,
+            "launch_to_ready": round(ready_at - self.launched_at, 3),
+            "total": round(ready_at - self.started_at, 3),
+            "plugins": {name: {k: round(v, 3) for k, v in d.items()} for name, d in self.plugin_durations().items()},
+        }
+        history = load_startup_history(self.server_name)
+        history.append(record)
+        path = startup_history_path(self.server_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'w') as f: json.dump(history[-STARTUP_HISTORY_LIMIT:], f, indent=2)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+
+def startup_history_path(server_name):
+    return os.path.join(DRIVE_PATH, server_name, '.minelab', 'startup_history.json')
+
+def load_startup_history(server_name):
+    try:
+        with open(startup_history_path(server_name)) as f: return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+
+def slowest_plugins(history, last_n):
+    """Peringkat plugin berdasarkan rata-rata waktu load+enable di `last_n` start terakhir."""
+    totals = {}
+    for record in history[-last_n:]:
+        for name, d in record.get("plugins", {}).items():
+            entry = totals.setdefault(name, {"plugin": name, "start": 0, "total": 0.0, "maks": 0.0, "enable": 0.0})
+            seconds = d["load"] + d["enable"]
+            entry["start"] += 1; entry["total"] += seconds; entry["enable"] += d["enable"]
+            entry["maks"] = max(entry["maks"], seconds)
+    rows = [{"plugin": e["plugin"], "rata-rata (dtk)": round(e["total"] / e["start"], 3), "maks (dtk)": round(e["maks"], 3),
+             "rata-rata enable (dtk)": round(e["enable"] / e["start"], 3), "jumlah start": e["start"]} for e in totals.values()]
+    return sorted(rows, key=lambda r: -r["rata-rata (dtk)"])
+
+# =================================================================================
+# LISTING DIREKTORI
+# Cache listing folder berbasis os.scandir (divalidasi dengan mtime folder) dan
+# ukuran folder rekursif yang dihitung di thread latar, untuk manajer file.
+# =================================================================================
+
+class DirectoryListingCache:
+    """Listing per folder: [(nama, is_dir, ukuran, mtime), ...] urut folder dulu lalu nama.
+    Dibuang jika mtime/inode folder berubah atau umurnya melewati LISTING_TTL
+    (mtime folder tidak berubah saat isi file di dalamnya ditulis ulang)."""
+
+    def __init__(self):
+        self._listings = {}  # path -> (kunci_stat, waktu_baca, entri)
+        self._sizes = {}  # path -> (ukuran_rekursif, waktu_hitung)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=DIR_SIZE_WORKERS, thread_name_prefix="dir-size")
+
+    def listing(self, path):
+        st_ = os.stat(path)
+        key = (st_.st_mtime_ns, st_.st_ino)
+        with self._lock:
+            cached = self._listings.get(path)
+        if cached and cached[0] == key and time.monotonic() - cached[1] < LISTING_TTL:
+            return cached[2]
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    stat_ = entry.stat()
+                except OSError:
+                    continue  # Dihapus saat dipindai
+                entries.append((entry.name, is_dir, 0 if is_dir else stat_.st_size, stat_.st_mtime))
+        entries.sort(key=lambda e: (not e[1], e[0].lower()))
+        with self._lock:
+            self._listings[path] = (key, time.monotonic(), entries)
+        return entries
+
+    def invalidate(self, path):
+        with self._lock:
+            self._listings.pop(path, None)
+            self._sizes.pop(path, None)
+
+    def dir_size(self, path):
+        """Ukuran rekursif jika sudah dihitung (dan belum basi), selain itu None sambil
+        menjadwalkan penghitungan di thread latar."""
+        with self._lock:
+            cached = self._sizes.get(path)
+            if cached and time.monotonic() - cached[1] < DIR_SIZE_TTL: return cached[0]
+            if path not in self._pending:
+                self._pending.add(path)
+                self._executor.submit(self._compute_size, path)
+        return cached[0] if cached else None
+
+    def _compute_size(self, path):
+        total = 0
+        try:
+            total = sum(size for size, _ in snapshot_tree(path).values())
+        finally:
+            with self._lock:
+                self._sizes[path] = (total, time.monotonic())
+                self._pending.discard(path)
+
+@st.cache_resource
+def get_listing_cache():
+    """Cache listing tunggal yang dibagikan ke semua sesi."""
+    return DirectoryListingCache()
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB": return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def iter_file_chunks(path, chunk_size=ARCHIVE_IO_CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size): yield chunk
+
+# =================================================================================
+# OPERASI ARSIP LATAR
+# Ekstrak, kompres, pindah, dan hapus folder dijalankan di pool terbatas di luar
+# thread skrip Streamlit, dengan progres per entri dan tombol batal.
+# =================================================================================
+
+class ArchiveJobCancelled(Exception):
+    pass
+
+class ArchiveJobManager:
+    """Antrian job arsip. Setiap job adalah dict {id, kind, src, dst, status, done, total,
+    current, error, started, finished} yang dibaca UI; pembatalan diperiksa per entri."""
+
+    KINDS = {"extract": "Ekstrak", "compress": "Kompres", "move": "Pindah", "delete": "Hapus"}
+
+    def __init__(self):
+        self._jobs = {}
+        self._cancel = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=ARCHIVE_JOB_WORKERS, thread_name_prefix="archive-job")
+
+    def submit(self, kind, src, dst=None, on_done=None):
+        job_id = secrets.token_hex(4)
+        job = {"id": job_id, "kind": kind, "src": src, "dst": dst, "status": "queued", "done": 0, "total": 0,
+               "current": "", "error": None, "started": time.time(), "finished": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            self._cancel[job_id] = threading.Event()
+        self._executor.submit(self._run, job, on_done)
+        return job_id
+
+    def cancel(self, job_id):
+        event = self._cancel.get(job_id)
+        if event: event.set()
+
+    def jobs(self):
+        """Salinan job aktif dan job yang selesai dalam ARCHIVE_JOB_KEEP detik terakhir."""
+        now = time.time()
+        with self._lock:
+            for job_id in [k for k, j in self._jobs.items() if j["finished"] and now - j["finished"] > ARCHIVE_JOB_KEEP]:
+                self._jobs.pop(job_id); self._cancel.pop(job_id, None)
+            return [dict(job) for job in self._jobs.values()]
+
+    def _run(self, job, on_done):
+        cancel = self._cancel[job["id"]]
+        def step(current, total=None):
+            if cancel.is_set(): raise ArchiveJobCancelled()
+            job["current"] = current
+            if total is not None: job["total"] = total
+            else: job["done"] += 1
+        job["status"] = "running"
+        try:
+            getattr(self, f"_{job['kind']}")(job["src"], job["dst"], step)
+            job["status"] = "done"
+        except ArchiveJobCancelled:
+            job["status"] = "cancelled"
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            job["status"], job["error"] = "failed", str(e)
+        finally:
+            job["finished"] = time.time()
+            if on_done: on_done(job)
+
+    def _extract(self, src, dst, step):
+        with zipfile.ZipFile(src) as zf:
+            members = zf.infolist()
+            step("", len(members))
+            for info in members:
+                target = safe_join(dst, info.filename)
+                step(info.filename)
+                if info.is_dir():
+                    os.makedirs(target, exist_ok=True); continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with zf.open(info) as fsrc, open(target, 'wb') as out:
+                    shutil.copyfileobj(fsrc, out, ARCHIVE_IO_CHUNK_SIZE)
+
+    def _compress(self, src, dst, step):
+        if os.path.isdir(src):
+            files = [os.path.join(root, name) for root, _, names in os.walk(src) for name in names]
+            base = src
+        else:
+            files, base = [src], os.path.dirname(src)
+        step("", len(files))
+        try:
+            with zipfile.ZipFile(dst + '.tmp', 'w', zipfile.ZIP_DEFLATED, compresslevel=DEFAULT_COMPRESSION["level"]) as zf:
+                for path in files:
+                    arcname = os.path.relpath(path, base)
+                    step(arcname)
+                    with open(path, 'rb') as fsrc, zf.open(zipfile.ZipInfo.from_file(path, arcname), 'w', force_zip64=True) as out:
+                        shutil.copyfileobj(fsrc, out, ARCHIVE_IO_CHUNK_SIZE)
+            os.replace(dst + '.tmp', dst)
+        finally:
+            if os.path.exists(dst + '.tmp'): os.remove(dst + '.tmp')
+
+    def _move(self, src, dst, step):
+        if os.path.exists(dst): raise ValueError(f"Tujuan sudah ada: {dst}")
+        real_src, real_dst = os.path.realpath(src), os.path.realpath(dst)
+        if real_dst == real_src or real_dst.startswith(real_src + os.sep):
+            raise ValueError("Tujuan tidak boleh berada di dalam folder sumber.")
+        try:
+            step("", 1)
+            os.rename(src, dst)  # Satu filesystem: instan
+            step(os.path.basename(src))
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV: raise
+        # Beda filesystem (mis. Drive ke disk lokal): salin per file lalu hapus sumber
+        if os.path.isdir(src): os.makedirs(dst)
+        files = [os.path.join(root, name) for root, _, names in os.walk(src) for name in names] if os.path.isdir(src) else [src]
+        step("", len(files) + 1)
+        for path in files:
+            target = os.path.join(dst, os.path.relpath(path, src)) if os.path.isdir(src) else dst
+            step(os.path.relpath(path, src) if os.path.isdir(src) else os.path.basename(src))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target)
+        step(os.path.basename(src))
+        shutil.rmtree(src) if os.path.isdir(src) else os.remove(src)
+
+    def _delete(self, src, dst, step):
+        if os.path.islink(src) or not os.path.isdir(src):
+            step("", 1); step(os.path.basename(src)); os.remove(src); return
+        walked = list(os.walk(src, topdown=False))
+        step("", sum(len(names) for _, _, names in walked) + len(walked))
+        for root, dirs, names in walked:
+            for name in names:
+                step(os.path.relpath(os.path.join(root, name), src))
+                os.remove(os.path.join(root, name))
+            step(os.path.relpath(root, src))
+            os.rmdir(root)
+
+@st.cache_resource
+def get_archive_jobs():
+    """Manajer job arsip tunggal yang dibagikan ke semua sesi."""
+    return ArchiveJobManager()
+
+# =================================================================================
+# INDEKS KONFIGURASI
+# Menemukan file konfigurasi server sekali (tanpa menelusuri folder dunia/log),
+# mem-parse-nya hanya saat dibuka, dan menyimpan perubahan per kunci sehingga
+# komentar dan urutan baris tetap terjaga.
+# =================================================================================
+
+def _unescape_property(text):
+    """Membalik escape .properties (`\\:`, `\\=`, `\\uXXXX`, `\\n`, ...) pada satu nilai."""
+    if '\\' not in text: return text
+    out, i = [], 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\' and i + 1 < len(text):
+            nxt = text[i + 1]
+            if nxt == 'u' and re.fullmatch(r'[0-9a-fA-F]{4}', text[i + 2:i + 6]):
+                out.append(chr(int(text[i + 2:i + 6], 16))); i += 6; continue
+            out.append({'n': '\n', 't': '\t', 'r': '\r', 'f': '\f'}.get(nxt, nxt)); i += 2; continue
+        out.append(char); i += 1
+    return ''.join(out)
+
+def _escape_property(text):
+    """Kebalikan `_unescape_property` untuk nilai yang ditulis ulang (non-ASCII menjadi \\uXXXX)."""
+    out = []
+    for index, char in enumerate(text):
+        if char == ' ' and index == 0: out.append('\\ ')  # Spasi awal hilang saat dibaca jika tidak di-escape
+        elif char in '\\:=#!': out.append('\\' + char)
+        elif char == '\n': out.append('\\n')
+        elif ord(char) > 126 or ord(char) < 32: out.append(f'\\u{ord(char):04x}' if ord(char) <= 0xFFFF else char)
+        else: out.append(char)
+    return ''.join(out)
+
+def parse_config_value(text):
+    """Tipe nilai dari teksnya: bool untuk true/false, int/float untuk angka, selain itu str."""
+    lowered = text.strip().lower()
+    if lowered in ('true', 'false'): return lowered == 'true'
+    # Hanya angka yang tertulis kanonis; `007` (mis. password) tetap teks agar tidak menjadi 7
+    if re.fullmatch(r'-?\d+', lowered) and str(int(lowered)) == lowered: return int(lowered)
+    if re.fullmatch(r'-?\d+\.\d+', lowered) and repr(float(lowered)) == lowered: return float(lowered)
+    return text
+
+def format_config_value(value):
+    return ('true' if value else 'false') if isinstance(value, bool) else str(value)
+
+def write_text_atomic(path, text):
+    """Menulis teks lewat file sementara + fsync + rename agar file tidak pernah setengah tertulis."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class PropertiesDocument:
+    """Model `server.properties` yang mempertahankan baris mentah. `values` berisi nilai bertipe
+    (lihat parse_config_value); `save` hanya menulis ulang baris kunci yang berubah, kunci baru
+    ditambahkan di akhir, komentar dan urutan tidak disentuh."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = []
+        self._positions = {}  # kunci -> indeks baris
+        self.raw = {}  # kunci -> nilai teks (sudah di-unescape)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                self.lines = f.read().splitlines()
+        for index, line in enumerate(self.lines):
+            stripped = line.lstrip()
+            if not stripped or stripped[0] in '#!': continue
+            match = re.match(r'((?:[^\\:=\s]|\\.)+)\s*[:=]?\s*(.*)$', stripped)
+            if not match: continue
+            key = _unescape_property(match.group(1))
+            self._positions[key] = index
+            self.raw[key] = _unescape_property(match.group(2))
+
+    @property
+    def values(self):
+        return {key: parse_config_value(value) for key, value in self.raw.items()}
+
+    def get(self, key, default=None):
+        return parse_config_value(self.raw[key]) if key in self.raw else default
+
+    def diff(self, changes):
+        """{kunci: (lama, baru)} untuk kunci yang nilainya benar-benar berubah. Nilai bertipe yang
+        sama (mis. `True` untuk teks `TRUE`) tidak dianggap berubah, sehingga penulisannya tidak disentuh."""
+        def unchanged(key, value):
+            if key not in self.raw: return False
+            current = self.get(key)
+            return self.raw[key] == format_config_value(value) or (not isinstance(value, str) and type(current) is type(value) and current == value)
+        return {key: (self.get(key), value) for key, value in changes.items() if not unchanged(key, value)}
+
+    def render(self, changes, remove=()):
+        """Teks file dengan `changes` diterapkan dan baris kunci di `remove` dibuang."""
+        lines = list(self.lines)
+        for key, value in changes.items():
+            line = f"{_escape_property(key)}={_escape_property(format_config_value(value))}"
+            if key in self._positions: lines[self._positions[key]] = line
+            else: lines.append(line)
+        dropped = {self._positions[key] for key in remove if key in self._positions}
+        return '\n'.join(line for index, line in enumerate(lines) if index not in dropped) + '\n'
+
+    def save(self, changes):
+        """Menyimpan hanya kunci yang berubah; mengembalikan diff yang ditulis."""
+        changed = self.diff(changes)
+        if changed:
+            write_text_atomic(self.path, self.render({key: changes[key] for key in changed}))
+            self.__init__(self.path)
+        return changed
 
-def load_server_config():
-    """
-    Memuat konfigurasi global dari file server_list.json.
-    Jika file tidak ada atau rusak, file akan dibuat ulang.
-    Fungsi ini juga menetapkan active_server di session_state.
-    """
-    if os.path.exists(SERVER_CONFIG_PATH):
+class YamlDocument:
+    """Model file YAML dengan ruamel round-trip (komentar dan urutan terjaga). Kunci bertingkat
+    ditulis sebagai path bertitik, mis. `chunks.prevent-moving-into-unloaded-chunks`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as f:
+            self.text = f.read()
+        self._yaml = ruamel.yaml.YAML()
+        self._yaml.preserve_quotes = True
+        self.error = None
         try:
-            with open(SERVER_CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-            # Pastikan semua kunci proxy ada untuk menghindari error
-            for key, value in INITIAL_CONFIG.items():
-                if key.endswith("_proxy") and key not in config:
-                    config[key] = value
-            st.session_state.server_config = config
-            # PERBAIKAN KUNCI: Set active_server di state dari file config
-            st.session_state.active_server = config.get('server_in_use', None)
-        except (json.JSONDecodeError, TypeError):
-            st.warning("⚠️ File server_list.json rusak. Membuat file baru dari template.")
-            save_server_config(INITIAL_CONFIG)
-    else:
-        st.session_state.server_config = INITIAL_CONFIG
-        st.session_state.active_server = None
+            self.data = self._yaml.load(self.text)
+        except ruamel.yaml.YAMLError as e:
+            self.data, self.error = None, str(e)  # Teks mentah tetap bisa diperbaiki di editor
+        if self.data is None and not self.error: self.data = ruamel.yaml.comments.CommentedMap()
 
-def save_server_config(config_data=None):
-    """Menyimpan data konfigurasi ke server_list.json dan menyinkronkan state."""
-    if config_data is None:
-        config_data = st.session_state.server_config
-    os.makedirs(DRIVE_PATH, exist_ok=True)
-    with open(SERVER_CONFIG_PATH, 'w') as f:
-        json.dump(config_data, f, indent=4)
-    # Pastikan session_state selalu sinkron setelah menyimpan
-    st.session_state.server_config = config_data
-    st.session_state.active_server = config_data.get('server_in_use')
+    def _node(self, key, create=False):
+        if self.error: raise ValueError(f"{os.path.basename(self.path)} berisi YAML tidak valid: {self.error}")
+        node, parts = self.data, key.split('.')
+        for part in parts[:-1]:
+            if not isinstance(node, dict): return None, parts[-1]
+            if part not in node:
+                if not create: return None, parts[-1]
+                node[part] = ruamel.yaml.comments.CommentedMap()
+            node = node[part]
+        return (node if isinstance(node, dict) else None), parts[-1]
 
-def get_colab_config(server_name):
-    """Membaca file colabconfig.json untuk server tertentu."""
-    if not server_name: return {}
-    config_path = os.path.join(DRIVE_PATH, server_name, 'colabconfig.json')
-    if os.path.exists(config_path):
+    def get(self, key, default=None):
+        node, leaf = self._node(key)
+        return node[leaf] if node is not None and leaf in node else default
+
+    def diff(self, changes):
+        missing = object()
+        return {key: (self.get(key), value) for key, value in changes.items() if self.get(key, missing) != value}
+
+    def render(self, changes, remove=()):
+        """Teks file dengan `changes` diterapkan dan kunci di `remove` dihapus. Mengubah model di
+        memori; pemanggil yang tidak memanggil `save` harus membuang dokumen ini dari cache."""
+        for key, value in changes.items():
+            node, leaf = self._node(key, create=True)
+            if node is None: raise ValueError(f"Kunci YAML tidak bisa diisi: {key}")
+            node[leaf] = value
+        for key in remove:
+            node, leaf = self._node(key)
+            if node is not None and leaf in node: del node[leaf]
+        stream = io.StringIO()
+        self._yaml.dump(self.data, stream)
+        return stream.getvalue()
+
+    def save(self, changes):
+        changed = self.diff(changes)
+        if changed:
+            write_text_atomic(self.path, self.render({key: changes[key] for key in changed}))
+            self.__init__(self.path)
+        return changed
+
+    def save_text(self, text):
+        """Menyimpan teks mentah dari editor setelah divalidasi; tidak menulis jika sama."""
+        if text == self.text: return False
+        ruamel.yaml.YAML().load(text)  # Validasi, melempar YAMLError jika sintaks salah
+        write_text_atomic(self.path, text)
+        self.__init__(self.path)
+        return True
+
+class ConfigIndex:
+    """Daftar file konfigurasi satu server beserta dokumen yang sudah di-parse. Penemuan file
+    memakai os.scandir dengan batas kedalaman dan melewati CONFIG_SKIP_DIRS serta folder yang
+    berisi level.dat; dokumen di-parse saat pertama dibuka dan dibuang jika (mtime, ukuran) berubah."""
+
+    def __init__(self, server_path):
+        self.server_path = server_path
+        self._files = None
+        self._scanned_at = 0
+        self._documents = {}  # path relatif -> (kunci_stat, dokumen)
+        self._lock = threading.Lock()
+
+    def files(self, refresh=False):
+        with self._lock:
+            if refresh or self._files is None or time.monotonic() - self._scanned_at > CONFIG_INDEX_TTL:
+                self._files = sorted(self._scan(self.server_path, 0))
+                self._scanned_at = time.monotonic()
+            return list(self._files)
+
+    def _scan(self, directory, depth):
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+            entries = list(os.scandir(directory))
+        except OSError:
+            return []
+        if depth > 0 and any(entry.name == 'level.dat' for entry in entries): return []  # Folder dunia
+        found = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if depth < CONFIG_SCAN_DEPTH and entry.name not in CONFIG_SKIP_DIRS and not entry.name.startswith('.'):
+                    found.extend(self._scan(entry.path, depth + 1))
+            elif entry.name.endswith(CONFIG_EXTENSIONS):
+                found.append(os.path.relpath(entry.path, self.server_path))
+        return found
 
-def save_colab_config(server_name, data):
-    """Menyimpan data ke colabconfig.json untuk server tertentu."""
-    server_path = os.path.join(DRIVE_PATH, server_name)
-    os.makedirs(server_path, exist_ok=True)
-    config_path = os.path.join(server_path, 'colabconfig.json')
-    with open(config_path, 'w') as f:
-        json.dump(data, f, indent=4)
+    def document(self, relative_path):
+        """Dokumen ter-parse (PropertiesDocument/YamlDocument) untuk path relatif terhadap server."""
+        path = os.path.join(self.server_path, relative_path)
+        try:
+            st_ = os.stat(path)
+            key = (st_.st_mtime_ns, st_.st_size)
+        except FileNotFoundError:
+            key = None
+        with self._lock:
+            cached = self._documents.get(relative_path)
+            if cached and cached[0] == key: return cached[1]
+        document = PropertiesDocument(path) if path.endswith('.properties') else YamlDocument(path)
+        with self._lock:
+            self._documents[relative_path] = (key, document)
+        return document
 
-def get_bedrock_download_link():
-    """Mengambil link download Bedrock dari sumber utama atau backup, persis seperti di minelab."""
-    try:
-        page = requests.get("https://www.minecraft.net/en-us/download/server/bedrock/", headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
-        page.raise_for_status()
-        soup = BeautifulSoup(page.content, "html.parser")
-        link = soup.find('a', href=re.compile(r'https://minecraft\.azureedge\.net/bin-linux/bedrock-server-.*\.zip'))
-        if link: return link['href']
-    except requests.exceptions.RequestException as e:
-        st.warning(f"Gagal akses situs resmi Minecraft ({e}), mencoba backup.")
-    try:
-        response = requests.get("https://raw.githubusercontent.com/MinaasaZillowArte/Minecraft-Bedrock-Server-Updater/main/backup_download_link.txt", timeout=20)
-        response.raise_for_status()
-        return response.text.strip()
-    except Exception as e:
-        st.error(f"Gagal mengambil link dari backup: {e}")
-    return None
+    def forget(self, relative_path):
+        """Membuang dokumen dari cache setelah disimpan, agar dibaca ulang dengan kunci stat baru."""
+        with self._lock:
+            self._documents.pop(relative_path, None)
 
-def get_server_info(command, server_type=None, version=None):
-    """Fungsi komprehensif dari minelab.py untuk mendapatkan info server, tanpa penyederhanaan."""
+@st.cache_resource
+def get_config_index(server_path):
+    """Indeks konfigurasi per folder server, dibagikan ke semua sesi."""
+    return ConfigIndex(server_path)
+
+# =================================================================================
+# PROFIL TUNING PERFORMA
+# Preset deklaratif (TUNING_PROFILES) yang dipetakan ke kunci konkret per file lewat
+# TUNING_TARGETS sesuai tipe dan versi server. Perubahan dipratinjau sebagai diff,
+# ditulis bersamaan, dicatat beserta isi file aslinya untuk rollback, dan efeknya
+# diukur dari rata-rata MSPT sebelum dan sesudah.
+# =================================================================================
+
+def parse_version(version):
+    """'1.20.4' -> (1, 20, 4); None jika tidak dikenali (mis. 'latest')."""
+    match = re.match(r'(\d+)\.(\d+)(?:\.(\d+))?', str(version or ''))
+    return tuple(int(part or 0) for part in match.groups()) if match else None
+
+def tuning_targets(setting, server_type, version):
+    """Pasangan (file, kunci) untuk satu pengaturan abstrak pada tipe/versi server ini.
+    Versi yang tidak dikenali dianggap terbaru."""
+    parsed = parse_version(version) or (99,)
+    return [(path, key) for path, key, types, min_version, max_version in TUNING_TARGETS.get(setting, [])
+            if server_type in types and (min_version is None or parsed >= min_version)
+            and (max_version is None or parsed < max_version)]
+
+def plan_tuning_profile(config_index, profile, server_type, version):
+    """Diff {file: {kunci: (lama, baru)}} yang akan ditulis profil. File yang belum dibuat
+    server (mis. purpur.yml sebelum start pertama) dilewati."""
+    plan = {}
+    for setting, value in TUNING_PROFILES[profile]["settings"].items():
+        for path, key in tuning_targets(setting, server_type, version):
+            if not os.path.exists(os.path.join(config_index.server_path, path)): continue
+            plan.setdefault(path, {}).update({key: value})
+    diff = {}
+    for path, changes in plan.items():
+        document = config_index.document(path)
+        if getattr(document, 'error', None): continue
+        changed = document.diff(changes)
+        if changed: diff[path] = changed
+    return diff
+
+def tuning_history_path(server_name):
+    return os.path.join(DRIVE_PATH, server_name, '.minelab', 'tuning_history.json')
+
+def load_tuning_history(server_name):
     try:
-        if command == "GetServerTypes":
-            return ['vanilla', 'paper', 'purpur', 'fabric', 'forge', 'folia', 'velocity', 'bedrock', 'mohist', 'arclight', 'snapshot', 'banner']
-        
-        elif command == "GetVersions":
-            if not server_type: return []
-            if server_type == "bedrock":
-                link = get_bedrock_download_link()
-                if not link: return ["latest"]
-                match = re.search(r'bedrock-server-([\d\.]+)\.zip', link)
-                return [match.group(1)] if match else ["latest"]
-            elif server_type in ['vanilla', 'snapshot']:
-                r = requests.get('https://launchermeta.mojang.com/mc/game/version_manifest.json').json()
-                stype = 'release' if server_type == 'vanilla' else 'snapshot'
-                return [v['id'] for v in r['versions'] if v['type'] == stype]
-            elif server_type in SERVER_API_URLS:
-                return requests.get(SERVER_API_URLS[server_type]).json().get("versions", [])
-            elif server_type == 'fabric':
-                return [v['version'] for v in requests.get('https://meta.fabricmc.net/v2/versions/game').json() if v.get('stable', False)]
-            elif server_type == 'forge':
-                r = requests.get('https://files.minecraftforge.net/net/minecraftforge/forge/index.html')
-                soup = BeautifulSoup(r.content, "html.parser")
-                return [a.text.strip() for a in soup.select('.versions-list a')]
-            elif server_type == "arclight":
-                r = requests.get('https://files.hypoglycemia.icu/v1/files/arclight/minecraft').json()
-                return [hit['name'] for hit in r.get('files', [])]
-            return []
+        with open(tuning_history_path(server_name)) as f: return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
 
-        elif command == "GetDownloadUrl":
-            if not server_type or (server_type != 'bedrock' and not version): return None
-            if server_type == 'bedrock': return get_bedrock_download_link()
-            elif server_type in ['vanilla', 'snapshot']:
-                manifest = requests.get('https://launchermeta.mojang.com/mc/game/version_manifest.json').json()
-                version_url = next((v['url'] for v in manifest['versions'] if v['id'] == version), None)
-                return requests.get(version_url).json()['downloads']['server']['url'] if version_url else None
-            elif server_type in SERVER_API_URLS: # paper, purpur, velocity, folia, mohist, banner
-                if server_type == 'purpur':
-                     build = requests.get(f'https://api.purpurmc.org/v2/purpur/{version}').json()["builds"]["latest"]
-                     return f'https://api.purpurmc.org/v2/purpur/{version}/{build}/download'
-                elif server_type in ['mohist', 'banner']:
-                     return requests.get(f'https://mohistmc.com/api/v2/projects/{server_type}/{version}/builds').json()["builds"][-1]["url"]
-                else: # paper, velocity, folia
-                    builds_url = f'{SERVER_API_URLS[server_type]}/versions/{version}/builds'
-                    build = requests.get(builds_url).json()["builds"][-1]
-                    download_info_url = f'{SERVER_API_URLS[server_type]}/versions/{version}/builds/{build}'
-                    jar_name = requests.get(download_info_url).json()["downloads"]["application"]["name"]
-                    return f'{download_info_url}/downloads/{jar_name}'
-            elif server_type == 'fabric':
-                api_url = f'https://meta.fabricmc.net/v2/versions/loader/{version}'
-                loaders = requests.get(api_url).json()
-                if not loaders: return None
-                loader_ver = loaders[0]["loader"]["version"]
-                installer_ver_url = 'https://meta.fabricmc.net/v2/versions/installer'
-                installer_ver = requests.get(installer_ver_url).json()[0]["version"]
-                return f"https://meta.fabricmc.net/v2/versions/loader/{version}/{loader_ver}/{installer_ver}/server/jar"
-            elif server_type == 'forge':
-                r = requests.get(f'https://files.minecraftforge.net/net/minecraftforge/forge/index_{version}.html')
-                soup = BeautifulSoup(r.content, "html.parser")
-                installer_link_tag = soup.find('div', class_='link-boosted').find('a')
-                if installer_link_tag and 'href' in installer_link_tag.attrs:
-                    installer_link = installer_link_tag['href']
-                    return installer_link.split('url=')[-1]
-    except Exception as e:
-        st.error(f"Gagal mengambil info server untuk {server_type} {version}: {e}")
-    return None
+def save_tuning_history(server_name, history):
+    path = tuning_history_path(server_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_text_atomic(path, json.dumps(history[-TUNING_HISTORY_LIMIT:], indent=4))
 
-def download_file(url, directory, filename):
-    """Mengunduh file dengan progress bar visual, persis seperti di minelab."""
-    os.makedirs(directory, exist_ok=True)
-    filepath = os.path.join(directory, filename)
-    progress_bar = st.progress(0, text=f"Menyiapkan unduhan untuk {filename}...")
-    status_text = st.empty()
+def mspt_average(managed, since, until=None):
+    """(rata-rata MSPT, jumlah sampel) dari MetricsCollector server dalam rentang waktu; None jika kosong."""
+    if not managed or not managed.metrics: return None
+    times, values = managed.metrics.view(["mspt"], METRICS_BUCKET_SECONDS * METRICS_BUCKET_CAPACITY)["mspt"]
+    samples = [v for t, v in zip(times, values) if t >= since and (until is None or t <= until)]
+    return (sum(samples) / len(samples), len(samples)) if samples else None
+
+def _write_files_together(server_path, contents):
+    """Menulis beberapa file sekaligus: semua file sementara ditulis dan di-fsync dulu,
+    baru kemudian di-rename, sehingga kegagalan tulis tidak meninggalkan set file yang campur."""
+    written = []
     try:
-        with requests.get(url, stream=True, headers={'User-Agent': 'Mozilla/5.0'}, timeout=60) as r:
-            r.raise_for_status()
-            total_size = int(r.headers.get('content-length', 0))
-            bytes_downloaded = 0
-            with open(filepath, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    bytes_downloaded += len(chunk)
-                    if total_size > 0:
-                        progress = min(int((bytes_downloaded / total_size) * 100), 100)
-                        progress_bar.progress(progress, text=f"Mengunduh... {progress}%")
-                        status_text.text(f"{bytes_downloaded / (1024*1024):.2f} MB / {total_size / (1024*1024):.2f} MB")
-        status_text.success(f"✅ Unduhan '{filename}' selesai!")
-        progress_bar.empty()
-        return True
-    except requests.exceptions.RequestException as e:
-        status_text.error(f"Gagal mengunduh file: {e}")
-        if os.path.exists(filepath): os.remove(filepath)
-        return False
+        for path, text in contents.items():
+            tmp_path = os.path.join(server_path, path) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text); f.flush(); os.fsync(f.fileno())
+            written.append(tmp_path)
+    except OSError:
+        for tmp_path in written: os.remove(tmp_path)
+        raise
+    for path in contents:
+        full_path = os.path.join(server_path, path)
+        os.replace(full_path + '.tmp', full_path)
 
-def kill_process(proc, name="Proses"):
-    """Menghentikan proses subprocess dengan aman, menggunakan SIGTERM lalu SIGKILL."""
-    if proc and proc.poll() is None:
-        st.warning(f"Mengirim sinyal penghentian ke {name} (PID: {proc.pid})...")
-        try:
-            # Menggunakan os.kill untuk kontrol yang lebih baik
-            os.kill(proc.pid, signal.SIGTERM)
-            proc.wait(timeout=10)
-            st.success(f"{name} berhasil dihentikan.")
-        except (ProcessLookupError, AttributeError):
-             st.info(f"{name} sudah tidak berjalan.")
-        except subprocess.TimeoutExpired:
-            st.error(f"{name} tidak merespon, menghentikan secara paksa (KILL).")
-            os.kill(proc.pid, signal.SIGKILL)
-            proc.wait()
-        except Exception as e:
-            st.error(f"Error saat menghentikan proses: {e}")
+def apply_tuning_profile(server_name, server_path, profile, plan, managed=None):
+    """Menerapkan diff hasil `plan_tuning_profile` dan mencatatnya di riwayat tuning
+    (pasangan nilai lama/baru per kunci untuk rollback, rata-rata MSPT sebelum penerapan)."""
+    config_index = get_config_index(server_path)
+    try:
+        contents = {path: config_index.document(path).render({key: new for key, (_, new) in changed.items()})
+                    for path, changed in plan.items()}
+        _write_files_together(server_path, contents)
+    finally:
+        # `render` YAML mengubah dokumen di cache; buang agar pratinjau membaca ulang isi file sebenarnya
+        for path in plan: config_index.forget(path)
+    now = time.time()
+    before = mspt_average(managed, now - TUNING_MEASURE_WINDOW)
+    entry = {
+        "id": secrets.token_hex(4), "profile": profile, "applied_at": now,
+        "changes": {path: {key: list(change) for key, change in changed.items()} for path, changed in plan.items()},
+        "mspt_before": before, "mspt_after": None, "rolled_back": False,
+    }
+    history = load_tuning_history(server_name)
+    history.append(entry)
+    save_tuning_history(server_name, history)
+    return entry
 
-def install_java(version_str):
-    """Memastikan versi Java yang benar terinstal, dari logika minelab."""
+def rollback_tuning_profile(server_name, server_path, entry_id):
+    """Mengembalikan per kunci nilai sebelum penerapan `entry_id` (kunci yang dulu tidak ada dihapus).
+    Kunci yang nilainya sudah tidak sama dengan nilai profil (diubah lewat editor atau oleh server)
+    dibiarkan dan dikembalikan sebagai daftar [(file, kunci, nilai_sekarang)]. Gagal jika penerapan
+    lebih baru pada file yang sama belum di-rollback (rollback harus berurutan dari yang terbaru)."""
+    history = load_tuning_history(server_name)
+    index = next(i for i, e in enumerate(history) if e["id"] == entry_id)
+    newer = [e for e in history[index + 1:] if not e["rolled_back"] and set(e["changes"]) & set(history[index]["changes"])]
+    if newer: raise ValueError(f"Rollback profil '{newer[-1]['profile']}' yang lebih baru terlebih dahulu.")
+    config_index = get_config_index(server_path)
+    contents, skipped = {}, []
     try:
-        # Mengambil hanya angka dari versi, cth: 1.20.1 -> (1, 20, 1)
-        version_tuple = tuple(map(int, re.findall(r'\d+', version_str)))
-    except (ValueError, IndexError):
-        st.warning(f"Tidak dapat mendeteksi versi Java untuk '{version_str}'. Menggunakan Java 17 sebagai default.")
-        version_tuple = (1, 17)
+        for path, changed in history[index]["changes"].items():
+            if not os.path.exists(os.path.join(server_path, path)):
+                skipped.extend((path, key, None) for key in changed); continue
+            document = config_index.document(path)
+            restore, remove = {}, []
+            for key, (old, new) in changed.items():
+                if document.diff({key: new}): skipped.append((path, key, document.get(key)))
+                elif old is None: remove.append(key)
+                else: restore[key] = old
+            if restore or remove: contents[path] = document.render(restore, remove)
+        _write_files_together(server_path, contents)
+    finally:
+        for path in history[index]["changes"]: config_index.forget(path)
+    history[index]["rolled_back"] = True
+    save_tuning_history(server_name, history)
+    return skipped
 
-    java_needed = 8
-    if version_tuple >= (1, 20, 5):
-        java_needed = 21
-    elif version_tuple >= (1, 17, 0):
-        java_needed = 17
-    elif version_tuple >= (1, 12, 0):
-        java_needed = 8
+def process_started_at(pid):
+    """Waktu (epoch) proses dimulai, dari starttime /proc/<pid>/stat dan btime /proc/stat."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+    except (OSError, IndexError, ValueError, StopIteration):
+        return None
+    return boot_time + start_ticks / CLOCK_TICKS
 
-    # Cek versi Java yang aktif
-    result = subprocess.run('java -version', shell=True, capture_output=True, text=True)
-    current_java_version = result.stderr
-    
-    if f'version "{java_needed}.' in current_java_version:
-        st.toast(f"Java {java_needed} sudah aktif.")
-        return True
+def tuning_after_mspt(entry, managed):
+    """Rata-rata MSPT sesudah penerapan, hanya jika server sudah di-restart setelahnya; sampel
+    TUNING_SETTLE_SECONDS pertama setelah start diabaikan agar masa pemanasan tidak ikut dihitung."""
+    if not managed or not managed.is_running(): return None
+    started_at = process_started_at(managed.proc.pid)
+    if started_at is None or started_at < entry["applied_at"]: return None
+    return mspt_average(managed, started_at + TUNING_SETTLE_SECONDS)
 
-    with st.spinner(f"Menginstal OpenJDK {java_needed}... Ini mungkin butuh beberapa saat."):
-        install_cmd = f'sudo apt-get update -qq && sudo apt-get install -y openjdk-{java_needed}-jre-headless -qq'
-        if run_command(install_cmd) is not None:
-            # Set Java version
-            run_command(f'sudo update-alternatives --set java /usr/lib/jvm/java-{java_needed}-openjdk-amd64/bin/java')
-            st.success(f"OpenJDK {java_needed} berhasil diinstal dan diaktifkan.")
-            return True
-        else:
-            st.error(f"Gagal menginstal OpenJDK {java_needed}.")
-            return False
+def record_tuning_result(server_name, entry_id, managed):
+    """Menyimpan rata-rata MSPT sesudah penerapan ke riwayat tuning."""
+    history = load_tuning_history(server_name)
+    entry = next(e for e in history if e["id"] == entry_id)
+    entry["mspt_after"] = tuning_after_mspt(entry, managed)
+    save_tuning_history(server_name, history)
+    return entry["mspt_after"]
 
 # =================================================================================
 # FUNGSI-FUNGSI UNTUK MERENDER HALAMAN (FRONTEND UI)
@@ -354,7 +4277,7 @@ def render_home_page():
                 st.info("ℹ️ Folder dan file konfigurasi sudah ada.")
 
         with st.spinner("Menginstal library yang dibutuhkan..."):
-            libs = "jproperties beautifulsoup4 ruamel.yaml pyngrok toml tqdm"
+            libs = "beautifulsoup4 ruamel.yaml pyngrok toml tqdm"
             run_command(f"pip install -q {libs}")
             st.success("✅ Library yang dibutuhkan sudah siap.")
 
@@ -371,14 +4294,25 @@ def render_server_management_page():
     """Halaman untuk membuat dan menghapus server (Manajemen)."""
     st.header("🛠️ Manajemen Server")
     st.caption("Buat server baru dari berbagai tipe atau hapus server yang tidak terpakai.")
+    stats = get_http_client().stats
+    st.caption(f"Cache metadata: {stats['hit']} hit · {stats['miss']} miss · {stats['revalidated']} divalidasi ulang · {stats['stale']} data lama")
+    with st.expander("Status prefetch metadata"):
+        for stype, info in sorted(get_metadata_prefetcher().status.items()):
+            if info["state"] == "pending": st.write(f"⏳ `{stype}` sedang dimuat...")
+            elif info["state"] == "ok": st.write(f"✅ `{stype}`: {info['versions']} versi ({info['seconds']:.1f} dtk)")
+            else: st.write(f"❌ `{stype}`: {info['error']}")
+    if os.path.isdir(DRIVE_PATH):
+        cached_count, cached_bytes = get_artifact_cache().usage()
+        st.caption(f"Cache jar bersama: {cached_count} artefak, {cached_bytes / (1024*1024):.1f} MB")
 
     tab_create, tab_delete, tab_change_software = st.tabs(["➕ Buat Server Baru", "🗑️ Hapus Server", "🔄 Ganti Perangkat Lunak"])
 
     with tab_create:
         st.subheader("Buat Server Minecraft Baru")
+        # Tipe dipilih di luar form agar daftar versi langsung ikut berganti (dari cache prefetch)
+        server_type = st.selectbox("Tipe Server", get_server_info("GetServerTypes"), index=0)
         with st.form("create_server_form"):
             server_name = st.text_input("Nama Server (tanpa spasi/simbol)", placeholder="Contoh: SurvivalKu")
-            server_type = st.selectbox("Tipe Server", get_server_info("GetServerTypes"), index=0)
             
             versions = get_server_info("GetVersions", server_type=server_type)
             version = st.selectbox(f"Versi untuk {server_type}", versions) if versions else st.text_input(f"Versi untuk {server_type}", "latest")
@@ -408,7 +4342,8 @@ def render_server_management_page():
                             }
                             save_colab_config(server_name, colab_config)
                             
-                            dl_url = get_server_info("GetDownloadUrl", server_type=server_type, version=version)
+                            dl_info = get_server_info("GetDownloadInfo", server_type=server_type, version=version)
+                            dl_url = dl_info["url"] if dl_info else None
                             
                             if dl_url:
                                 try:
@@ -418,7 +4353,7 @@ def render_server_management_page():
                                 except:
                                     filename = f"{server_type}-{version}.jar"
                                 
-                                if download_file(dl_url, server_path, filename):
+                                if download_file(dl_url, server_path, filename, dl_info["hash"], artifact_cache_key(server_type, version, dl_url)):
                                     file_path = os.path.join(server_path, filename)
                                     if server_type == 'bedrock':
                                         with zipfile.ZipFile(file_path, 'r') as z: z.extractall(server_path)
@@ -474,9 +4409,9 @@ def render_server_management_page():
             st.info("Pilih server aktif terlebih dahulu.")
         else:
             st.write(f"Server yang akan diubah: **{active_server}**")
+            st.info("Pilih perangkat lunak baru:")
+            new_server_type = st.selectbox("Tipe Server Baru", get_server_info("GetServerTypes"), index=1)
             with st.form("change_software_form"):
-                st.info("Pilih perangkat lunak baru:")
-                new_server_type = st.selectbox("Tipe Server Baru", get_server_info("GetServerTypes"), index=1)
                 new_versions = get_server_info("GetVersions", server_type=new_server_type)
                 new_version = st.selectbox(f"Versi untuk {new_server_type}", new_versions)
                 
@@ -491,15 +4426,242 @@ def render_server_management_page():
                         colab_config['server_version'] = new_version
                         save_colab_config(active_server, colab_config)
 
-                        dl_url = get_server_info("GetDownloadUrl", server_type=new_server_type, version=new_version)
-                        if dl_url:
+                        dl_info = get_server_info("GetDownloadInfo", server_type=new_server_type, version=new_version)
+                        if dl_info:
+                            dl_url = dl_info["url"]
                             filename = dl_url.split('/')[-1].split('?')[0]
-                            if download_file(dl_url, os.path.join(DRIVE_PATH, active_server), filename):
+                            if download_file(dl_url, os.path.join(DRIVE_PATH, active_server), filename, dl_info["hash"], artifact_cache_key(new_server_type, new_version, dl_url)):
                                 st.success("Perangkat lunak berhasil diganti! Silakan jalankan server dari konsol.")
                                 st.rerun()
                         else:
                             st.error("Gagal mengunduh perangkat lunak baru.")
 
+def _pull_log_delta(managed):
+    """Menempelkan sesi ke buffer log milik supervisor dan menarik semua baris baru dalam satu batch."""
+    if managed and st.session_state.log_buffer is not managed.log_buffer:
+        st.session_state.log_buffer = managed.log_buffer
+        st.session_state.log_seq = 0
+        st.session_state.log_messages = deque(maxlen=LOG_VIEW_LINES)
+    if not st.session_state.log_buffer: return 0
+    new_lines, st.session_state.log_seq = st.session_state.log_buffer.since(st.session_state.log_seq)
+    st.session_state.log_messages.extend(new_lines)
+    return len(new_lines)
+
+@st.fragment(run_every=LOG_STREAM_IDLE_INTERVAL)
+def render_live_log_pane(server_name):
+    """Panel log konsol yang di-refresh sebagai fragmen, terpisah dari rerun seluruh halaman.
+    Saat server sepi fragmen hanya berjalan tiap LOG_STREAM_IDLE_INTERVAL detik; saat ada
+    output, fragmen menunggu di buffer dan mendorong delta baru tiap LOG_STREAM_FRAME detik."""
+    managed = get_supervisor().get(server_name)
+    with st.container(height=500, border=True):
+        log_placeholder = st.empty()
+    _pull_log_delta(managed)
+    log_placeholder.code('\n'.join(st.session_state.log_messages), language="log")
+
+    is_running = managed is not None and managed.is_running()
+    if st.session_state.log_pane_running != is_running:
+        # Status proses berubah (mis. server berhenti sendiri): muat ulang halaman untuk tombol kontrol
+        st.rerun()
+    if not is_running: return
+
+    deadline = time.monotonic() + LOG_STREAM_BURST_WINDOW
+    while time.monotonic() < deadline and managed.log_buffer.wait_for(st.session_state.log_seq, LOG_STREAM_IDLE_GAP):
+        if managed.log_buffer.closed: break
+        time.sleep(LOG_STREAM_FRAME)  # Kumpulkan baris yang datang dalam satu frame
+        _pull_log_delta(managed)
+        log_placeholder.code('\n'.join(st.session_state.log_messages), language="log")
+
+@st.fragment(run_every=PING_READY_INTERVAL)
+def render_status_panel(server_name, server_type):
+    """Status koneksi: hasil ping terakhir per target, riwayat latensi, dan ringkasan per penyedia tunnel."""
+    managed = get_supervisor().get(server_name)
+    prober = managed.prober if managed and managed.is_running() else None
+    if prober:
+        if prober.ready_at: st.success(f"✅ Server menerima koneksi sejak {datetime.fromtimestamp(prober.ready_at):%H:%M:%S}.")
+        else: st.info("⏳ Server belum menjawab ping di localhost.")
+        for label, result in prober.latest.items():
+            if result["ok"]:
+                players = f"{result['online']}/{result['max']} pemain" if result.get("online") is not None else "pemain tidak diketahui"
+                st.markdown(f"**{label}**: 🟢 {result['latency_ms']:.0f} ms — {result['version']} — {players} — _{result['motd'][:80]}_")
+            else:
+                st.markdown(f"**{label}**: 🔴 {result['error']}")
+        rows = {}
+        for label, (times, values) in prober.view(3600).items():
+            for t, value in zip(times, values):
+                rows.setdefault(t, {"waktu": datetime.fromtimestamp(t)})[label] = round(value, 1)
+        if rows:
+            st.line_chart([rows[t] for t in sorted(rows)], x="waktu", height=180)
+        if st.button("📡 Ping Sekarang", key="ping_now"):
+            prober.probe_now()
+
+    summary = load_tunnel_latency_summary(server_name)
+    if summary:
+        st.markdown("**Riwayat latensi per penyedia tunnel**")
+        st.dataframe([{"penyedia": provider, "sampel": e["samples"], "rata-rata (ms)": round(e["avg_ms"], 1), "min (ms)": round(e["min_ms"], 1),
+                       "maks (ms)": round(e["max_ms"], 1), "terakhir": e.get("last", "")[:19].replace("T", " ")} for provider, e in summary.items()],
+                     use_container_width=True, hide_index=True)
+
+    with st.form("ping_form", border=False):
+        address = st.text_input("Ping alamat lain (host:port)", placeholder="play.contoh.com:25565")
+        if st.form_submit_button("Ping") and address:
+            host, _, port = address.rpartition(':')
+            if not port.isdigit(): host, port = address, str(19132 if server_type == 'bedrock' else 25565)
+            result = status_ping(server_type, host, int(port))
+            if result["ok"]: st.success(f"{result['latency_ms']:.0f} ms — {result['version']} — {result['online']}/{result['max']} pemain — {result['motd']}")
+            else: st.error(f"Tidak ada respons: {result['error']}")
+
+def _metric_rows(collector, names, window):
+    """Menggabungkan beberapa deret (yang diambil pada waktu yang sama) menjadi baris untuk chart."""
+    rows = {}
+    for name, (times, values) in collector.view(names, window).items():
+        for t, value in zip(times, values):
+            rows.setdefault(t, {"waktu": datetime.fromtimestamp(t)})[name] = round(value, 2)
+    return [rows[t] for t in sorted(rows)]
+
+@st.fragment(run_every=METRICS_SAMPLE_INTERVAL)
+def render_metrics_panel(server_name):
+    """Chart metrik server di halaman konsol; hanya membaca ring buffer milik collector."""
+    managed = get_supervisor().get(server_name)
+    collector = managed.metrics if managed else None
+    if not collector: st.caption("Metrik tersedia saat server berjalan."); return
+
+    window = {"1 jam": 3600, "24 jam": 86400}[st.radio("Rentang", ["1 jam", "24 jam"], horizontal=True, key="metrics_window")]
+    col1, col2, col3, col4 = st.columns(4)
+    for col, (label, name, fmt) in zip((col1, col2, col3, col4), (("TPS", "tps", "{:.1f}"), ("MSPT", "mspt", "{:.1f}"),
+                                                              ("CPU %", "cpu_percent", "{:.0f}"), ("Pemain", "players", "{:.0f}"))):
+        value = collector.latest(name)
+        col.metric(label, fmt.format(value) if value is not None else "-")
+
+    charts = [("CPU (%)", ["cpu_percent"]), ("Memori (MB)", ["rss_mb", "heap_used_mb", "heap_committed_mb"]),
+              ("TPS / MSPT", ["tps", "mspt"]), ("Tick tertinggal", ["ticks_behind"]), ("Pemain", ["players"]), ("GC per interval", ["gc_count", "gc_time_ms"])]
+    for title, names in charts:
+        rows = _metric_rows(collector, names, window)
+        if not rows: continue
+        st.markdown(f"**{title}**")
+        st.line_chart(rows, x="waktu", y=[n for n in names if any(n in r for r in rows)], height=180)
+    if managed.server_type != 'bedrock' and not collector.jcmd:
+        st.caption("ℹ️ `jcmd` tidak ditemukan (JRE headless), sehingga metrik heap/GC tidak tersedia. Pasang paket `openjdk-<versi>-jdk-headless` untuk mengaktifkannya.")
+
+@st.fragment(run_every=2)
+def render_pregen_panel(server_name, server_type, server_path):
+    """Panel pre-generasi dunia di halaman konsol, di-refresh sebagai fragmen."""
+    managed = get_supervisor().get(server_name)
+    is_running = managed is not None and managed.is_running()
+    job = (managed.pregen if managed and managed.pregen else None) or PregenJob.load(server_name)
+
+    if job:
+        state = job.state
+        done, total = state["chunks_done"], job.total_chunks
+        st.progress(min(1.0, done / total) if total else 0.0,
+                    text=f"{state['dimension']} radius {state['radius']} blok ({state['mode']}): {done:,}/{total:,} chunk — status: {state['status']}")
+        if job.is_active:
+            eta = job.eta_seconds()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Chunk/detik", f"{job.rate:.1f}")
+            col2.metric("ETA", time.strftime('%H:%M:%S', time.gmtime(eta)) if eta is not None else "-")
+            health = job.health or {}
+            col3.metric("MSPT", f"{health['mspt']:.1f}" if health.get("mspt") is not None else "-",
+                        help=f"Batas {state['target_mspt']} ms; generasi ditahan jika terlampaui atau muncul \"Can't keep up\".")
+            if st.button("⏸️ Jeda Pre-Generasi", key="pregen_stop"):
+                job.stop(); st.rerun(scope="fragment")
+            return
+        if state["status"] != "done" and is_running:
+            resume_col, reset_col = st.columns(2)
+            if resume_col.button("▶️ Lanjutkan", key="pregen_resume", use_container_width=True):
+                managed.pregen = job; job.start(managed); st.rerun(scope="fragment")
+            if reset_col.button("🗑️ Buang Progres", key="pregen_reset", use_container_width=True):
+                os.remove(job.state_path); st.rerun(scope="fragment")
+            return
+
+    if not is_running:
+        st.caption("Jalankan server untuk memulai pre-generasi."); return
+    chunky = find_chunky(server_path)
+    with st.form("pregen_form", border=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            dimension = st.selectbox("Dimensi", ["minecraft:overworld", "minecraft:the_nether", "minecraft:the_end"])
+            radius = st.number_input("Radius (blok)", min_value=16, value=2000, step=500)
+            mode = st.radio("Metode", ["chunky", "forceload"] if chunky else ["forceload"], horizontal=True,
+                            help="Chunky terdeteksi di folder server." if chunky else "Chunky tidak terpasang; memakai forceload bawaan.")
+        with col2:
+            center_x = st.number_input("Pusat X (blok)", value=0, step=16)
+            center_z = st.number_input("Pusat Z (blok)", value=0, step=16)
+            target_mspt = st.number_input("Batas MSPT", min_value=10.0, max_value=200.0, value=PREGEN_TARGET_MSPT, step=5.0)
+        if st.form_submit_button("🌍 Mulai Pre-Generasi", type="primary"):
+            job = PregenJob.create(server_name, dimension, (int(center_x), int(center_z)), int(radius), mode, float(target_mspt))
+            managed.pregen = job; job.start(managed)
+            st.rerun(scope="fragment")
+
+def render_events_panel(managed):
+    """Pemain online, sesi terakhir, dan peringatan dari pipeline event log."""
+    if not managed or not managed.pipeline:
+        st.caption("Event tersedia saat server berjalan."); return
+    now = time.time()
+    online = dict(managed.sessions.online)
+    st.markdown(f"**Online ({len(online)})**: " + (", ".join(f"{p} ({(now - t) / 60:.0f} mnt)" for p, t in sorted(online.items())) or "-"))
+    if managed.alerts.alerts:
+        st.markdown("**Peringatan terbaru**")
+        for alert in reversed(list(managed.alerts.alerts)[-10:]):
+            label = {"crash": "💥 Crash", "overloaded": "🐢 Server tertinggal", "gc_warning": "🧠 Memori/GC"}[alert["type"]]
+            detail = f" ×{alert['count']}, maks {alert['ticks']} tick" if alert["type"] == "overloaded" else ""
+            st.caption(f"{datetime.fromtimestamp(alert['time']):%H:%M:%S} {label}{detail} — `{alert['line'][-160:]}`")
+    if managed.sessions.sessions:
+        st.markdown("**Sesi terakhir**")
+        st.dataframe([{"pemain": s["player"], "masuk": datetime.fromtimestamp(s["join"]).strftime("%H:%M:%S"),
+                       "keluar": datetime.fromtimestamp(s["leave"]).strftime("%H:%M:%S"), "durasi (mnt)": round(s["seconds"] / 60, 1)}
+                      for s in reversed(managed.sessions.sessions)], use_container_width=True, hide_index=True)
+    st.caption(f"{managed.pipeline.lines_processed:,} baris diproses; event: " +
+               (", ".join(f"{k} {v}" for k, v in sorted(managed.pipeline.counts.items())) or "belum ada"))
+
+def render_startup_profile_panel(server_name):
+    """Rincian waktu start terakhir dan plugin paling lambat dari beberapa start terakhir."""
+    history = load_startup_history(server_name)
+    if not history:
+        st.caption("Belum ada data. Profil dicatat otomatis setiap server dimulai dari dashboard sampai log menampilkan \"Done\"."); return
+    last = history[-1]
+    reported = f", server melaporkan {last['reported_done_seconds']:.1f} dtk" if last.get("reported_done_seconds") else ""
+    st.markdown(f"**Start terakhir ({last['started'].replace('T', ' ')})**: total {last['total']:.1f} dtk, "
+                f"peluncuran → Done {last['launch_to_ready']:.1f} dtk{reported}")
+    phases = [{"fase": name, "detik": seconds, "sumber": "dashboard"} for name, seconds in last["dashboard_phases"]]
+    phases += [{"fase": name, "detik": seconds, "sumber": "server"} for name, seconds in last["server_phases"]]
+    st.dataframe(phases, use_container_width=True, hide_index=True)
+
+    last_n = st.slider("Jumlah start yang dibandingkan", 1, len(history), min(10, len(history)), key="startup_last_n") if len(history) > 1 else 1
+    plugins = slowest_plugins(history, last_n)
+    if plugins:
+        st.markdown("**Plugin paling lambat**")
+        st.dataframe(plugins[:25], use_container_width=True, hide_index=True)
+    st.markdown("**Perbandingan start**")
+    st.dataframe([{"mulai": r["started"].replace("T", " "), "total (dtk)": r["total"], "peluncuran → Done (dtk)": r["launch_to_ready"],
+                   **{name: seconds for name, seconds in r["dashboard_phases"]}} for r in reversed(history[-last_n:])],
+                 use_container_width=True, hide_index=True)
+
+def render_whitelist_panel(managed):
+    """Kelola whitelist lewat kanal perintah; respons RCON ditampilkan langsung. Daftar whitelist
+    hanya diminta saat tombolnya ditekan (isi expander tetap dijalankan di setiap rerun)."""
+    list_key = f"whitelist_list_{managed.name}"
+    rcon = get_rcon(managed)
+    if not rcon:
+        st.caption("RCON belum tersedia (server belum siap atau RCON nonaktif); perintah dikirim lewat stdin dan hasilnya hanya terlihat di log.")
+    elif st.button("🔄 Muat daftar whitelist", key=f"whitelist_fetch_{managed.name}"):
+        st.session_state[list_key] = run_server_command(managed, "whitelist list", echo=False)
+    if st.session_state.get(list_key): st.caption(ANSI_ESCAPE_PATTERN.sub('', st.session_state[list_key]))
+    with st.form("whitelist_form", clear_on_submit=True, border=False):
+        player = st.text_input("Nama pemain")
+        add_col, remove_col, on_col, off_col = st.columns(4)
+        actions = {"add": add_col.form_submit_button("➕ Tambah", use_container_width=True),
+                   "remove": remove_col.form_submit_button("➖ Hapus", use_container_width=True),
+                   "on": on_col.form_submit_button("Aktifkan", use_container_width=True),
+                   "off": off_col.form_submit_button("Nonaktifkan", use_container_width=True)}
+        action = next((name for name, pressed in actions.items() if pressed), None)
+        if action in ("add", "remove") and not player.strip():
+            st.warning("Isi nama pemain terlebih dahulu.")
+        elif action:
+            command = f"whitelist {action} {player.strip()}" if action in ("add", "remove") else f"whitelist {action}"
+            result = run_server_command(managed, command)
+            st.session_state.pop(list_key, None)  # Daftar lama tidak lagi akurat
+            st.success(ANSI_ESCAPE_PATTERN.sub('', result) if result else f"Perintah `{command}` dikirim lewat stdin.")
+
 def render_console_page():
     """Menampilkan konsol, kontrol server, dan input perintah."""
     st.header("🖥️ Konsol & Kontrol Server")
@@ -521,74 +4683,107 @@ def render_console_page():
 
     st.info(f"Server Aktif: **{active_server}** (Tipe: {server_type}, RAM: {ram_gb}GB, Tunnel: {tunnel_service or 'Tidak ada'})")
 
-    is_running = st.session_state.get('server_process') is not None and st.session_state.server_process.poll() is None
+    supervisor = get_supervisor()
+    managed = supervisor.get(active_server)
+    is_running = managed is not None and managed.is_running()
+
+    staged_run = st.toggle("💽 Staged run (jalankan dari disk lokal, sinkronkan ke Drive)", value=colab_config.get("staged_run", False),
+                           disabled=is_running, help="Folder server disalin ke disk lokal Colab sebelum start, lalu file yang berubah disinkronkan kembali ke Drive secara berkala dan saat server berhenti.")
+    if staged_run != colab_config.get("staged_run", False):
+        colab_config["staged_run"] = staged_run
+        save_colab_config(active_server, colab_config)
     
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("▶️ Mulai Server", type="primary", disabled=is_running, use_container_width=True):
             with st.spinner("Mempersiapkan dan memulai server..."):
+                profiler = StartupProfiler(active_server)
                 # 1. Instal Java yang sesuai
-                if server_type != 'bedrock':
-                    if not install_java(colab_config.get("server_version", "1.17")):
-                        return # Hentikan jika Java gagal diinstal
-                
-                # 2. Setujui EULA
-                if server_type != 'bedrock':
-                    with open(os.path.join(server_path, 'eula.txt'), 'w') as f: f.write('eula=true')
-                
+                with profiler.phase("Cek/instal Java"):
+                    if server_type != 'bedrock':
+                        if not install_java(colab_config.get("server_version", "1.17")):
+                            return # Hentikan jika Java gagal diinstal
+
+                # 2. Setujui EULA dan aktifkan RCON untuk kanal perintah
+                with profiler.phase("EULA & RCON"):
+                    if server_type != 'bedrock':
+                        with open(os.path.join(server_path, 'eula.txt'), 'w') as f: f.write('eula=true')
+                    if server_type not in ('bedrock', 'velocity'):
+                        ensure_rcon_enabled(server_path)
+
                 # 3. Konfigurasi dan mulai Tunnel (Contoh Ngrok)
-                if tunnel_service == 'ngrok':
-                    ngrok_config = st.session_state.server_config.get('ngrok_proxy', {})
-                    if ngrok_config.get('authtoken'):
-                        try:
-                            ngrok.set_auth_token(ngrok_config['authtoken'])
-                            conf.get_default().region = ngrok_config.get('region', 'ap')
-                            port = 19132 if server_type == 'bedrock' else 25565
-                            proto = 'udp' if server_type == 'bedrock' else 'tcp'
-                            tunnel = ngrok.connect(port, proto)
-                            st.session_state.tunnel_address = tunnel.public_url
-                        except Exception as e:
-                            st.error(f"Gagal memulai tunnel Ngrok: {e}")
-                    else:
-                        st.warning("Authtoken Ngrok tidak diatur. Server akan berjalan tanpa tunnel.")
-                
+                with profiler.phase("Tunnel"):
+                    tunnel_address, tunnel_pid = None, None
+                    if tunnel_service == 'ngrok':
+                        ngrok_config = st.session_state.server_config.get('ngrok_proxy', {})
+                        if ngrok_config.get('authtoken'):
+                            try:
+                                ngrok.set_auth_token(ngrok_config['authtoken'])
+                                conf.get_default().region = ngrok_config.get('region', 'ap')
+                                port = 19132 if server_type == 'bedrock' else 25565
+                                proto = 'udp' if server_type == 'bedrock' else 'tcp'
+                                tunnel = ngrok.connect(port, proto)
+                                tunnel_address = tunnel.public_url
+                                tunnel_pid = ngrok.get_ngrok_process().proc.pid
+                            except Exception as e:
+                                st.error(f"Gagal memulai tunnel Ngrok: {e}")
+                        else:
+                            st.warning("Authtoken Ngrok tidak diatur. Server akan berjalan tanpa tunnel.")
+
                 # 4. Tentukan perintah start
-                if server_type == 'bedrock':
-                    command = f"LD_LIBRARY_PATH=. ./bedrock_server"
-                    cmd_list = command.split()
-                else:
-                    jar_files = [f for f in os.listdir(server_path) if f.endswith('.jar') and 'installer' not in f.lower()]
-                    if not jar_files: st.error("Tidak ditemukan file .jar!"); return
-                    jar_name = jar_files[0]
-                    java_args = f"-Xms{ram_gb}G -Xmx{ram_gb}G -XX:+UseG1GC -XX:+ParallelRefProcEnabled -XX:MaxGCPauseMillis=200 -XX:+UnlockExperimentalVMOptions -XX:+DisableExplicitGC -XX:+AlwaysPreTouch -XX:G1NewSizePercent=30 -XX:G1MaxNewSizePercent=40 -XX:G1HeapRegionSize=8M -XX:G1ReservePercent=20 -XX:G1HeapWastePercent=5 -XX:G1MixedGCCountTarget=4 -XX:InitiatingHeapOccupancyPercent=15 -XX:G1MixedGCLiveThresholdPercent=90 -XX:G1RSetUpdatingPauseTimePercent=5 -XX:SurvivorRatio=32 -XX:+PerfDisableSharedMem -XX:MaxTenuringThreshold=1 -Dusing.aikars.flags=true"
-                    command = f"java {java_args} -jar \"{jar_name}\" nogui"
-                    cmd_list = command.split()
-
-                # 5. Jalankan proses server
-                st.session_state.log_messages = [f"[{datetime.now():%H:%M:%S}] Memulai server..."]
-                process = subprocess.Popen(
-                    cmd_list, cwd=server_path, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                    stdin=subprocess.PIPE, text=True, bufsize=1, universal_newlines=True,
-                    preexec_fn=os.setsid # Penting untuk mengelola grup proses
-                )
-                st.session_state.server_process = process
+                with profiler.phase("Mencari jar & menyusun perintah"):
+                    if server_type == 'bedrock':
+                        command = f"LD_LIBRARY_PATH=. ./bedrock_server"
+                        cmd_list = command.split()
+                    else:
+                        jar_files = [f for f in os.listdir(server_path) if f.endswith('.jar') and 'installer' not in f.lower()]
+                        if not jar_files: st.error("Tidak ditemukan file .jar!"); return
+                        jar_name = jar_files[0]
+                        java_args = f"-Xms{ram_gb}G -Xmx{ram_gb}G -XX:+UseG1GC -XX:+ParallelRefProcEnabled -XX:MaxGCPauseMillis=200 -XX:+UnlockExperimentalVMOptions -XX:+DisableExplicitGC -XX:+AlwaysPreTouch -XX:G1NewSizePercent=30 -XX:G1MaxNewSizePercent=40 -XX:G1HeapRegionSize=8M -XX:G1ReservePercent=20 -XX:G1HeapWastePercent=5 -XX:G1MixedGCCountTarget=4 -XX:InitiatingHeapOccupancyPercent=15 -XX:G1MixedGCLiveThresholdPercent=90 -XX:G1RSetUpdatingPauseTimePercent=5 -XX:SurvivorRatio=32 -XX:+PerfDisableSharedMem -XX:MaxTenuringThreshold=1 -Dusing.aikars.flags=true"
+                        command = f"java {java_args} -jar \"{jar_name}\" nogui"
+                        cmd_list = command.split()
+
+                # 5. Salin folder server ke disk lokal jika staged run aktif
+                with profiler.phase("Staging dari Drive"):
+                    stager, run_path = None, server_path
+                    if staged_run:
+                        stager = StagedRun(server_path, os.path.join(STAGING_ROOT, active_server))
+                        try:
+                            report = stager.pull()
+                        except OSError as e:
+                            st.error(f"Staging gagal, server tidak dijalankan: {e}"); return
+                        if report["pushed_pending"]:
+                            st.warning(f"{report['pushed_pending']} file dari sesi sebelumnya yang belum tersinkron telah disalin ke Drive terlebih dahulu.")
+                        st.toast(f"Staging: {report['files']} file ({report['bytes'] / (1024*1024):.1f} MB) disalin dalam {report['seconds']:.1f} dtk.")
+                        run_path = stager.stage_dir
+
+                # 6. Jalankan proses server melalui supervisor (dimiliki proses, bukan sesi)
+                with profiler.phase("Meluncurkan proses"):
+                    log_buffer = LogBuffer()
+                    log_buffer.append(f"[{datetime.now():%H:%M:%S}] Memulai server...")
+                    try:
+                        supervisor.start(active_server, cmd_list, run_path, server_type, log_buffer, stager, profiler)
+                    except RuntimeError as e:
+                        st.error(str(e)); return
+                supervisor.set_tunnel(active_server, tunnel_address, tunnel_pid, tunnel_service if tunnel_address else None)
                 st.rerun()
 
     with col2:
         if st.button("🛑 Hentikan Server", type="secondary", disabled=not is_running, use_container_width=True):
             with st.spinner("Menghentikan server dan tunnel..."):
-                if st.session_state.get('server_process'):
-                    proc = st.session_state.server_process
-                    if server_type != 'bedrock':
-                        proc.stdin.write("stop\n"); proc.stdin.flush()
-                        try: proc.wait(timeout=30)
-                        except subprocess.TimeoutExpired: kill_process(proc, "Server")
-                    else:
-                        kill_process(proc, "Server")
-                    st.session_state.server_process = None
+                managed.stop_requested = True
+                proc = managed.proc
+                if server_type != 'bedrock' and managed.send_command("stop"):
+                    try: proc.wait(timeout=30)
+                    except subprocess.TimeoutExpired: kill_process(proc, "Server")
+                else:
+                    kill_process(proc, "Server")
                 
-                if st.session_state.get('tunnel_address'):
-                    ngrok.kill(); st.session_state.tunnel_address = None
+                supervisor.stop_tunnel(active_server)
+
+                if managed.stager:
+                    with st.spinner("Sinkronisasi akhir ke Drive..."):
+                        managed.stager.final_done.wait(timeout=600)
                 
                 st.rerun()
     
@@ -598,42 +4793,58 @@ def render_console_page():
                 run_command(f'chmod -R 755 "{server_path}"')
                 st.success("Izin file telah diperbaiki.")
 
-    if st.session_state.tunnel_address:
-        st.success(f"Alamat Server: `{st.session_state.tunnel_address.replace('tcp://', '').replace('udp://', '')}`")
+    if managed and managed.tunnel_address:
+        st.success(f"Alamat Server: `{managed.tunnel_address.replace('tcp://', '').replace('udp://', '')}`")
+
+    if managed and managed.stager:
+        sync_col, sync_btn_col = st.columns([3, 1])
+        with sync_btn_col:
+            if st.button("🔄 Sinkronkan ke Drive", disabled=not is_running, use_container_width=True):
+                with st.spinner("Menyinkronkan ke Drive..."):
+                    try: managed.stager.push(managed)
+                    except OSError as e: st.error(f"Sinkronisasi gagal: {e}")
+        with sync_col:
+            if managed.stager.history:
+                last = managed.stager.history[-1]
+                st.caption(f"Sinkronisasi terakhir ({last['direction']}, {last['at']}): {last['files']} file, "
+                           f"{last['bytes'] / (1024*1024):.1f} MB, {last['deleted']} dihapus, {last['seconds']:.1f} dtk")
+            if not is_running and not managed.stager.final_done.is_set():
+                st.info("⏳ Sinkronisasi akhir ke Drive sedang berjalan...")
 
     st.markdown("---")
     st.subheader("Log Konsol & Perintah")
-    log_container = st.container(height=500, border=True)
-    with log_container:
-        log_placeholder = st.empty()
-    
-    command_input = st.text_input("Kirim Perintah", key="command_input", disabled=not is_running)
+    if managed and not is_running and not managed.stop_requested:
+        st.warning("⚠️ Proses server telah berhenti.")
+        supervisor.stop_tunnel(active_server)
 
-    if command_input and st.session_state.get('server_process'):
-        proc = st.session_state.server_process
-        proc.stdin.write(command_input + "\n"); proc.stdin.flush()
-        st.session_state.log_messages.append(f"> {command_input}")
-        st.session_state.command_input = "" # Hapus input setelah dikirim
+    # Hanya panel log yang di-refresh; sisa halaman tidak dijalankan ulang
+    st.session_state.log_pane_running = is_running
+    render_live_log_pane(active_server)
 
-    if is_running:
-        try:
-            line = st.session_state.server_process.stdout.readline()
-            if line:
-                st.session_state.log_messages.append(line.strip())
-                if len(st.session_state.log_messages) > 500:
-                    st.session_state.log_messages.pop(0)
-            
-            log_placeholder.code('\n'.join(st.session_state.log_messages), language="log")
+    with st.form("command_form", clear_on_submit=True, border=False):
+        command_input = st.text_input("Kirim Perintah", disabled=not is_running)
+        if st.form_submit_button("Kirim", disabled=not is_running) and command_input and is_running:
+            run_server_command(managed, command_input)
 
-            if st.session_state.server_process.poll() is not None:
-                st.warning("⚠️ Proses server telah berhenti."); st.session_state.server_process = None
-                if st.session_state.tunnel_address: ngrok.kill(); st.session_state.tunnel_address = None
-                st.rerun()
-            else:
-                time.sleep(0.5); st.rerun()
-        except Exception: pass
-    else:
-        log_placeholder.code('\n'.join(st.session_state.log_messages), language="log")
+    if is_running and server_type not in ('bedrock', 'velocity'):
+        with st.expander("📋 Whitelist"):
+            render_whitelist_panel(managed)
+
+    with st.expander("⏱️ Profil Startup"):
+        render_startup_profile_panel(active_server)
+
+    with st.expander("👥 Pemain & Peringatan"):
+        render_events_panel(managed if is_running else None)
+
+    with st.expander("📡 Status Koneksi"):
+        render_status_panel(active_server, server_type)
+
+    with st.expander("📈 Metrik Server"):
+        render_metrics_panel(active_server)
+
+    if server_type not in ('bedrock', 'velocity'):
+        with st.expander("🌍 Pre-Generasi Dunia"):
+            render_pregen_panel(active_server, server_type, server_path)
 
 def render_config_editor_page():
     """Halaman untuk mengedit semua file konfigurasi."""
@@ -644,39 +4855,50 @@ def render_config_editor_page():
     
     tabs = st.tabs(["server.properties", "File Konfigurasi (YAML)", "Ikon & MOTD", "File JSON Pemain"])
 
+    config_index = get_config_index(server_path)
+
     with tabs[0]:
         st.subheader("Editor `server.properties`")
         properties_path = os.path.join(server_path, 'server.properties')
         if not os.path.exists(properties_path):
             st.info("`server.properties` tidak ditemukan. Jalankan server sekali untuk membuatnya.")
         else:
-            properties = jproperties.Properties()
-            with open(properties_path, 'rb') as f: properties.load(f, "utf-8")
+            properties = config_index.document('server.properties')
+            query = st.text_input("Cari properti", placeholder="Contoh: distance")
             with st.form("properties_form"):
-                updated_props = {key: st.text_input(key, value.data) for key, value in properties.items()}
+                updated_props = {}
+                for key, value in properties.values.items():
+                    if query and query.lower() not in key.lower(): continue
+                    if isinstance(value, bool): updated_props[key] = st.checkbox(key, value)
+                    elif isinstance(value, int) and abs(value) < 2**53: updated_props[key] = st.number_input(key, value=value, step=1)
+                    else: updated_props[key] = st.text_input(key, properties.raw[key])
                 if st.form_submit_button("Simpan Perubahan", type="primary"):
-                    for key, value in updated_props.items(): properties[key] = value
-                    with open(properties_path, "wb") as f:
-                        properties.store(f, comment=f"Updated via Dashboard", encoding="utf-8")
-                    st.success("✅ Properti server berhasil disimpan!")
+                    # Hanya baris kunci yang berubah yang ditulis ulang; komentar dan urutan tetap
+                    changed = properties.save(updated_props)
+                    config_index.forget('server.properties')
+                    if changed: st.success(f"✅ {len(changed)} properti disimpan: " + ", ".join(f"`{key}`" for key in changed))
+                    else: st.info("Tidak ada perubahan.")
     
     with tabs[1]:
         st.subheader("Editor File YAML")
-        yaml_files = [f for f in Path(server_path).rglob('*.yml')]
+        refresh = st.button("🔄 Pindai ulang file", help="Daftar file di-cache; pindai ulang setelah menambah plugin.")
+        yaml_files = [f for f in config_index.files(refresh=refresh) if not f.endswith('.properties')]
         if not yaml_files:
             st.info("Tidak ada file .yml yang ditemukan.")
         else:
-            selected_yml_path = st.selectbox("Pilih file YAML", yaml_files, format_func=lambda p: p.relative_to(server_path))
-            if selected_yml_path:
-                with open(selected_yml_path, 'r') as f: content = f.read()
+            selected_yml = st.selectbox("Pilih file YAML", yaml_files)
+            if selected_yml:
+                document = config_index.document(selected_yml)
+                if document.error: st.warning(f"File ini berisi YAML yang tidak valid: {document.error}")
                 with st.form("yaml_edit_form"):
-                    edited_content = st.text_area("Konten File", content, height=500)
+                    edited_content = st.text_area("Konten File", document.text, height=500)
                     if st.form_submit_button("Simpan File YAML"):
                         try:
-                            ruamel.yaml.YAML().load(edited_content) # Validasi
-                            with open(selected_yml_path, 'w') as f: f.write(edited_content)
-                            st.success(f"✅ File `{selected_yml_path.name}` berhasil disimpan!")
-                        except Exception as e: st.error(f"Gagal menyimpan, error sintaks YAML: {e}")
+                            if document.save_text(edited_content):
+                                config_index.forget(selected_yml)
+                                st.success(f"✅ File `{os.path.basename(selected_yml)}` berhasil disimpan!")
+                            else: st.info("Tidak ada perubahan.")
+                        except ruamel.yaml.YAMLError as e: st.error(f"Gagal menyimpan, error sintaks YAML: {e}")
 
     with tabs[2]:
         st.subheader("Ubah Ikon & MOTD")
@@ -689,12 +4911,11 @@ def render_config_editor_page():
         
         properties_path = os.path.join(server_path, 'server.properties')
         if os.path.exists(properties_path):
-            properties = jproperties.Properties()
-            with open(properties_path, 'rb') as f: properties.load(f, "utf-8")
-            new_motd = st.text_area("Ubah MOTD", properties.get('motd', 'A Minecraft Server').data)
+            properties = config_index.document('server.properties')
+            new_motd = st.text_area("Ubah MOTD", properties.raw.get('motd', 'A Minecraft Server'))
             if st.button("Simpan MOTD"):
-                properties['motd'] = new_motd
-                with open(properties_path, "wb") as f: properties.store(f, encoding="utf-8")
+                properties.save({'motd': new_motd})
+                config_index.forget('server.properties')
                 st.success("MOTD berhasil disimpan!")
 
     with tabs[3]:
@@ -716,6 +4937,221 @@ def render_config_editor_page():
                 except json.JSONDecodeError:
                     st.error("Format JSON tidak valid.")
 
+def render_compression_options(key):
+    """Expander opsi kompresi (level, jumlah thread, nice, IO idle); mengembalikan dict opsi."""
+    with st.expander("⚙️ Opsi kompresi"):
+        cols = st.columns(4)
+        level = cols[0].slider("Level", 1, 9, DEFAULT_COMPRESSION["level"], key=f"{key}_level", help="1 = tercepat, 9 = terkecil")
+        workers = cols[1].number_input("Thread", 1, 64, DEFAULT_COMPRESSION["workers"], key=f"{key}_workers")
+        nice = cols[2].slider("Nice", 0, 19, DEFAULT_COMPRESSION["nice"], key=f"{key}_nice", help="Semakin tinggi, semakin mengalah pada server")
+        idle_io = cols[3].checkbox("IO idle", DEFAULT_COMPRESSION["idle_io"], key=f"{key}_idle_io", help="Baca/tulis disk hanya saat disk tidak dipakai proses lain")
+    return {"level": level, "workers": int(workers), "nice": nice, "idle_io": idle_io}
+
+def render_backup_tab(active_server, server_root_path):
+    """Tab backup inkremental: membuat, memulihkan, dan menghapus snapshot dunia."""
+    st.subheader("Backup Dunia Inkremental")
+    st.caption("Hanya blok yang berubah sejak snapshot sebelumnya yang disimpan. Jika server berjalan, autosave dijeda selama snapshot.")
+    worlds = find_worlds(live_server_path(active_server))
+    if not worlds: st.info("Tidak ada folder dunia (berisi `level.dat`) yang ditemukan."); return
+    world = st.selectbox("Pilih dunia", list(worlds), key="backup_world")
+    store = BackupStore(str(server_root_path / BACKUP_FOLDER_NAME / 'store'))
+    options = render_compression_options("backup")
+
+    if st.button("📸 Buat Snapshot Sekarang", type="primary"):
+        progress_bar = st.progress(0, text="Membuat snapshot...")
+        try:
+            snapshot = backup_world(active_server, world, lambda done, total: progress_bar.progress(done / total, text=f"Memproses file {done}/{total}..."), options)
+            progress_bar.empty()
+            stats = snapshot["stats"]
+            st.success(f"Snapshot `{snapshot['id']}` dibuat dalam {stats['seconds']:.1f} dtk: {stats['files']} file "
+                       f"({stats['reused_files']} tidak berubah), {stats['new_chunks']} blok baru, {stats['stored_bytes'] / (1024*1024):.1f} MB ditulis.")
+            st.caption(f"Throughput {stats['mb_per_sec']:.1f} MB/s, rasio kompresi blok baru {stats['ratio']:.2f}.")
+        except (RuntimeError, OSError) as e:
+            progress_bar.empty(); st.error(f"Backup gagal: {e}")
+
+    snapshots = store.list_snapshots(world)
+    if not snapshots: st.info("Belum ada snapshot untuk dunia ini."); return
+    st.dataframe([{
+        "ID": s["id"], "Dibuat": s["created"][:19].replace("T", " "), "File": s["stats"]["files"],
+        "Blok baru": s["stats"]["new_chunks"], "Ditulis (MB)": round(s["stats"]["stored_bytes"] / (1024*1024), 2),
+        "Ukuran dunia (MB)": round(s["stats"]["logical_bytes"] / (1024*1024), 2)
+    } for s in snapshots], use_container_width=True, hide_index=True)
+
+    snapshot_id = st.selectbox("Pilih snapshot", [s["id"] for s in snapshots], key="backup_snapshot")
+    restore_col, delete_col = st.columns(2)
+    with restore_col:
+        in_place = st.checkbox("Ganti dunia saat ini (server harus berhenti)", key="backup_in_place")
+        if st.button("♻️ Pulihkan Snapshot", use_container_width=True):
+            world_path = Path(worlds[world])
+            if in_place and get_supervisor().is_running(active_server):
+                st.error("Hentikan server terlebih dahulu untuk memulihkan di tempat.")
+            else:
+                # Di tempat: snapshot dipulihkan ke folder terpisah dulu, baru ditukar dengan dunia saat ini
+                target = world_path.with_name(f"{world}_restore_{snapshot_id}")
+                if target.exists(): st.error(f"Folder `{target.name}` sudah ada.")
+                else:
+                    progress_bar = st.progress(0, text="Memulihkan snapshot...")
+                    try:
+                        store.restore(snapshot_id, str(target), lambda done, total: progress_bar.progress(done / total, text=f"Menulis file {done}/{total}..."))
+                        if in_place:
+                            aside = world_path.with_name(f"{world}_sebelum_restore_{datetime.now():%Y%m%d-%H%M%S}")
+                            world_path.rename(aside)
+                            try:
+                                target.rename(world_path)
+                            except OSError:
+                                aside.rename(world_path)  # Kembalikan dunia lama; hasil pemulihan tetap di `target`
+                                raise
+                            target = world_path
+                    except (OSError, ValueError, zlib.error) as e:
+                        st.error(f"Pemulihan gagal, dunia saat ini tidak diubah: {e}")
+                    else:
+                        st.success(f"Snapshot `{snapshot_id}` dipulihkan ke `{target.name}`.")
+                    finally:
+                        progress_bar.empty()
+    with delete_col:
+        if st.button("🗑️ Hapus Snapshot", use_container_width=True):
+            freed = store.delete_snapshot(snapshot_id)
+            st.success(f"Snapshot dihapus, {freed / (1024*1024):.1f} MB blok yang tidak terpakai dibebaskan."); st.rerun()
+
+def render_world_stats_tab(active_server, server_root_path):
+    """Tab statistik dunia: ukuran region, jumlah chunk, dan sebaran InhabitedTime."""
+    st.subheader("Statistik Dunia")
+    st.caption("Membaca header region Anvil (.mca); hanya region yang berubah sejak pemindaian terakhir yang dibaca ulang.")
+    worlds = find_worlds(live_server_path(active_server))
+    if not worlds: st.info("Tidak ada folder dunia (berisi `level.dat`) yang ditemukan."); return
+    world = st.selectbox("Pilih dunia", list(worlds), key="stats_world")
+    index = RegionIndex(str(server_root_path), world, worlds[world])
+
+    if st.button("🔍 Pindai Region", type="primary"):
+        progress_bar = st.progress(0, text="Membaca region...")
+        result = index.refresh(lambda done, total: progress_bar.progress(done / total, text=f"Region {done}/{total}..."))
+        progress_bar.empty()
+        st.success(f"{result['regions']} region ({result['reindexed']} dibaca ulang) dalam {result['seconds']:.1f} dtk.")
+
+    rows = index.region_rows()
+    if not rows:
+        st.info("Belum ada data. Klik **Pindai Region** (dunia Bedrock/LevelDB tidak didukung)."); return
+
+    terrain = [r for r in rows if r["jenis"] == "region"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("File region", len(rows))
+    col2.metric("Chunk terrain", sum(r["chunk"] for r in terrain))
+    col3.metric("Total ukuran", f"{sum(r['ukuran_mb'] for r in rows):.1f} MB")
+
+    st.markdown("**Per dimensi**")
+    per_dimension = {}
+    for r in rows:
+        entry = per_dimension.setdefault((r["dimensi"], r["jenis"]), {"dimensi": r["dimensi"], "jenis": r["jenis"], "file": 0, "chunk": 0, "ukuran_mb": 0.0})
+        entry["file"] += 1; entry["chunk"] += r["chunk"]; entry["ukuran_mb"] += r["ukuran_mb"]
+    st.dataframe(sorted(per_dimension.values(), key=lambda e: -e["ukuran_mb"]), use_container_width=True, hide_index=True)
+
+    st.markdown("**Sebaran InhabitedTime chunk terrain**")
+    st.bar_chart(index.inhabited_histogram())
+
+    st.markdown("**Region terbesar**")
+    st.dataframe(sorted(rows, key=lambda r: -r["ukuran_mb"])[:50], use_container_width=True, hide_index=True)
+    errors = [(rel, info["error"]) for rel, info in index.regions.items() if info.get("error")]
+    if errors:
+        with st.expander(f"⚠️ {len(errors)} region dengan chunk yang gagal dibaca"):
+            for rel, error in errors: st.caption(f"`{rel}`: {error}")
+
+def render_prune_tab(active_server):
+    """Tab pemangkasan chunk: dry-run dulu, lalu tulis ulang region saat server berhenti."""
+    st.subheader("Pangkas Chunk")
+    st.caption("Membuang chunk yang jarang dikunjungi atau di luar radius, lalu menulis ulang file region (termasuk `entities/` dan `poi/`) secara rapat.")
+    worlds = find_worlds(live_server_path(active_server))
+    if not worlds: st.info("Tidak ada folder dunia (berisi `level.dat`) yang ditemukan."); return
+    world = st.selectbox("Pilih dunia", list(worlds), key="prune_world")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        use_inhabited = st.checkbox("Buang chunk dengan InhabitedTime rendah", value=True, key="prune_use_inhabited")
+        min_minutes = st.number_input("Ambang InhabitedTime (menit)", min_value=0.0, value=0.5, step=0.5, disabled=not use_inhabited, key="prune_min_minutes")
+    with col2:
+        use_radius = st.checkbox("Buang chunk di luar radius", key="prune_use_radius")
+        radius = st.number_input("Radius (chunk)", min_value=1, value=320, step=16, disabled=not use_radius, key="prune_radius")
+        center_x = st.number_input("Pusat X (chunk)", value=0, step=1, disabled=not use_radius, key="prune_center_x")
+        center_z = st.number_input("Pusat Z (chunk)", value=0, step=1, disabled=not use_radius, key="prune_center_z")
+
+    params = {"min_inhabited": int(min_minutes * 1200) if use_inhabited else None,
+              "radius": int(radius) if use_radius else None, "center": (int(center_x), int(center_z))}
+    if params["min_inhabited"] is None and params["radius"] is None:
+        st.info("Pilih minimal satu kriteria."); return
+    report_key = (active_server, world, json.dumps(params))
+
+    if st.button("🧮 Hitung (Dry-Run)", use_container_width=True):
+        progress_bar = st.progress(0, text="Menganalisis region...")
+        report = prune_world(active_server, worlds[world], dry_run=True, on_progress=lambda done, total: progress_bar.progress(done / total, text=f"Region {done}/{total}..."), **params)
+        progress_bar.empty()
+        st.session_state.prune_report = (report_key, report)
+
+    saved = st.session_state.get('prune_report')
+    if not saved or saved[0] != report_key:
+        st.caption("Jalankan dry-run untuk melihat ruang yang dapat dibebaskan sebelum memangkas."); return
+    report = saved[1]
+    reclaimed = report["bytes_before"] - report["bytes_after"]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Chunk dibuang", f"{report['removed']:,} / {report['chunks']:,}")
+    c2.metric("Ruang dibebaskan", f"{reclaimed / (1024*1024):.1f} MB")
+    c3.metric("Ukuran setelahnya", f"{report['bytes_after'] / (1024*1024):.1f} MB")
+    if report["details"]:
+        st.dataframe([{"region": os.path.relpath(r["region"], worlds[world]), "chunk dibuang": r["removed"], "dari": r["chunks"],
+                       "dibebaskan_mb": round((r["bytes_before"] - r["bytes_after"]) / (1024*1024), 2)} for r in report["details"][:100]],
+                     use_container_width=True, hide_index=True)
+    if not report["removed"]: return
+
+    running = get_supervisor().is_running(active_server)
+    if running: st.warning("Server sedang berjalan. Hentikan server untuk memangkas.")
+    st.warning("Chunk yang dibuang akan dibuat ulang oleh generator dunia. Buat snapshot di tab Backup terlebih dahulu.")
+    if st.button("✂️ Pangkas Sekarang", type="primary", disabled=running, use_container_width=True):
+        progress_bar = st.progress(0, text="Menulis ulang region...")
+        try:
+            result = prune_world(active_server, worlds[world], dry_run=False, on_progress=lambda done, total: progress_bar.progress(done / total, text=f"Region {done}/{total}..."), **params)
+            progress_bar.empty()
+            del st.session_state.prune_report
+            st.success(f"{result['removed']:,} chunk dibuang, {(result['bytes_before'] - result['bytes_after']) / (1024*1024):.1f} MB dibebaskan.")
+        except RuntimeError as e:
+            progress_bar.empty(); st.error(str(e))
+
+def path_in_running_world(server_name, path):
+    """True jika server sedang berjalan dan `path` adalah, berada di dalam, atau berisi folder dunianya."""
+    managed = get_supervisor().get(server_name)
+    if not managed or not managed.is_running(): return False
+    target = os.path.realpath(path)
+    for base in {os.path.join(DRIVE_PATH, server_name), managed.server_path}:
+        for world in find_worlds(base).values():
+            world = os.path.realpath(world)
+            if os.path.commonpath([target, world]) in (target, world): return True
+    return False
+
+def submit_archive_job(kind, src, dst=None):
+    """Menjadwalkan operasi arsip di latar; listing folder terkait dibuang saat job selesai."""
+    listing_cache = get_listing_cache()
+    def on_done(job):
+        for path in (job["src"], job["dst"]):
+            if path:
+                listing_cache.invalidate(path); listing_cache.invalidate(os.path.dirname(path))
+    get_archive_jobs().submit(kind, str(src), str(dst) if dst else None, on_done=on_done)
+    st.toast(f"{ArchiveJobManager.KINDS[kind]} '{os.path.basename(str(src))}' dijadwalkan.")
+
+@st.fragment(run_every=1)
+def render_archive_jobs_panel():
+    """Progres job arsip latar beserta tombol batal."""
+    manager = get_archive_jobs()
+    jobs = sorted(manager.jobs(), key=lambda j: j["started"], reverse=True)
+    if not jobs: return
+    st.markdown("**Operasi Latar**")
+    labels = {"queued": "⏳ antre", "running": "⚙️ berjalan", "done": "✅ selesai", "failed": "❌ gagal", "cancelled": "⛔ dibatalkan"}
+    for job in jobs:
+        col_info, col_cancel = st.columns([5, 1])
+        with col_info:
+            title = f"{ArchiveJobManager.KINDS[job['kind']]} `{os.path.basename(job['src'])}` — {labels[job['status']]}"
+            fraction = job["done"] / job["total"] if job["total"] else 0.0
+            st.progress(min(fraction, 1.0), text=f"{title} ({job['done']}/{job['total']}) {job['current'][-60:]}")
+            if job["error"]: st.caption(f"Galat: {job['error']}")
+        if job["status"] in ("queued", "running") and col_cancel.button("Batal", key=f"cancel_job_{job['id']}"):
+            manager.cancel(job["id"])
+
 def render_file_manager_page():
     """Menampilkan file manager dengan fitur upload, download, dan ekstrak."""
     st.header("🗂️ Manajer File & Dunia")
@@ -730,7 +5166,7 @@ def render_file_manager_page():
 
     current_path = Path(st.session_state.current_path)
 
-    tab_files, tab_world_import, tab_world_export, tab_world_delete = st.tabs(["Manajer File", "📥 Impor Dunia", "📤 Ekspor Dunia", "🗑️ Hapus Dunia"])
+    tab_files, tab_world_import, tab_world_export, tab_world_delete, tab_backup, tab_stats, tab_prune = st.tabs(["Manajer File", "📥 Impor Dunia", "📤 Ekspor Dunia", "🗑️ Hapus Dunia", "🗄️ Backup Inkremental", "📊 Statistik Dunia", "✂️ Pangkas Chunk"])
 
     with tab_files:
         st.info(f"Lokasi: `{current_path.relative_to(Path(DRIVE_PATH))}`")
@@ -741,29 +5177,104 @@ def render_file_manager_page():
         with st.expander("📤 Unggah File ke Folder Ini"):
             uploaded_files = st.file_uploader("Pilih file", accept_multiple_files=True, key="file_uploader")
             if uploaded_files:
+                progress = st.progress(0.0)
+                total, written = sum(f.size for f in uploaded_files) or 1, 0
                 for f in uploaded_files:
-                    with open(current_path / f.name, "wb") as out: out.write(f.getbuffer())
+                    # Ditulis per chunk ke file .part lalu di-rename, tanpa salinan utuh lewat getbuffer()
+                    target = safe_join(str(current_path), os.path.basename(f.name))
+                    with open(target + '.part', "wb") as out:
+                        while chunk := f.read(ARCHIVE_IO_CHUNK_SIZE):
+                            out.write(chunk); written += len(chunk)
+                            progress.progress(min(written / total, 1.0), text=f"{f.name}: {format_size(written)} / {format_size(total)}")
+                    os.replace(target + '.part', target)
+                get_listing_cache().invalidate(str(current_path))
                 st.success(f"{len(uploaded_files)} file diunggah!"); st.rerun()
+            st.markdown("**File besar (modpack, dunia)**")
+            st.caption(f"Unggahan Streamlit tetap ditampung di memori proses. Untuk file besar, gunakan halaman unggah server lokal (port {FILE_SERVER_PORT}) yang mengirim file per {format_size(UPLOAD_CHUNK_SIZE)} langsung ke disk.")
+            if st.button("🔗 Buat Tautan Unggah"):
+                st.session_state.fm_upload_link = (str(current_path), get_file_server().register_upload(str(current_path)))
+            upload_link = st.session_state.get('fm_upload_link')
+            if upload_link and upload_link[0] == str(current_path):
+                st.link_button("⬆️ Buka halaman unggah", FILE_SERVER_PUBLIC_URL + upload_link[1])
+                for dst, (received, expected) in list(get_file_server().upload_progress.items()):
+                    if os.path.dirname(dst) == str(current_path):
+                        st.progress(received / max(expected, 1), text=f"{os.path.basename(dst)}: {format_size(received)} / {format_size(expected)}")
         
-        items = sorted(list(current_path.iterdir()), key=lambda p: (not p.is_dir(), p.name.lower()))
-        for item in items:
+        listing_cache = get_listing_cache()
+        entries = listing_cache.listing(str(current_path))
+        filter_col, sort_col, page_col = st.columns([3, 2, 1])
+        name_filter = filter_col.text_input("Filter nama", key="fm_filter", placeholder="Contoh: r.0.")
+        sort_by = sort_col.selectbox("Urutkan", ["Nama", "Ukuran", "Terakhir diubah"], key="fm_sort")
+        if name_filter: entries = [e for e in entries if name_filter.lower() in e[0].lower()]
+        if sort_by == "Ukuran": entries = sorted(entries, key=lambda e: (not e[1], -e[2]))
+        elif sort_by == "Terakhir diubah": entries = sorted(entries, key=lambda e: (not e[1], -e[3]))
+        pages = max(1, -(-len(entries) // FILE_PAGE_SIZE))
+        page = page_col.number_input("Halaman", 1, pages, 1, key=f"fm_page_{current_path}_{name_filter}") if pages > 1 else 1
+        st.caption(f"{len(entries)} item" + (f", halaman {page}/{pages}" if pages > 1 else ""))
+
+        for name, is_dir, size, mtime in entries[(page - 1) * FILE_PAGE_SIZE:page * FILE_PAGE_SIZE]:
+            item = current_path / name
             col1, col2, col3, col4 = st.columns([4, 2, 2, 3])
-            icon = "📁" if item.is_dir() else "📄"
             with col1:
-                if item.is_dir():
-                    if st.button(f"{icon} {item.name}", use_container_width=True, key=f"dir_{item.name}"):
+                if is_dir:
+                    if st.button(f"📁 {name}", use_container_width=True, key=f"dir_{name}"):
                         st.session_state.current_path = str(item); st.rerun()
-                else: st.markdown(f"{icon} {item.name}")
-            with col2: st.caption(f"{item.stat().st_size / 1024:.2f} KB")
+                else: st.markdown(f"📄 {name}")
+            with col2:
+                if is_dir:
+                    dir_size = listing_cache.dir_size(str(item))
+                    st.caption(format_size(dir_size) if dir_size is not None else "menghitung…")
+                else: st.caption(format_size(size))
             with col3:
-                if item.is_file():
-                    with open(item, "rb") as f: st.download_button("📥 Unduh", f, item.name, key=f"dl_{item.name}", use_container_width=True)
+                if not is_dir and st.button("📥 Unduh", key=f"dl_{name}", use_container_width=True):
+                    st.session_state.fm_download, st.session_state.fm_download_link = str(item), None
             with col4:
-                if item.name.endswith('.zip'):
-                    if st.button("Ekstrak Zip", key=f"unzip_{item.name}", use_container_width=True):
-                        with st.spinner(f"Mengekstrak {item.name}..."):
-                            with zipfile.ZipFile(item, 'r') as z: z.extractall(current_path)
-                            st.success("Ekstraksi selesai."); st.rerun()
+                with st.popover("⋯ Aksi", use_container_width=True):
+                    if name.endswith('.zip') and st.button("Ekstrak Zip", key=f"unzip_{name}", use_container_width=True):
+                        submit_archive_job("extract", item, current_path)
+                    if not name.endswith('.zip') and st.button("Kompres ke .zip", key=f"zip_{name}", use_container_width=True):
+                        submit_archive_job("compress", item, current_path / f"{name}.zip")
+                    move_to = st.text_input("Pindah ke (relatif dari root server)", key=f"mv_dst_{name}", placeholder="Contoh: backups/lama")
+                    if st.button("Pindahkan", key=f"mv_{name}", use_container_width=True, disabled=not move_to):
+                        try:
+                            if path_in_running_world(active_server, item): raise ValueError("Dunia ini sedang dipakai server yang berjalan. Hentikan server terlebih dahulu.")
+                            submit_archive_job("move", item, Path(safe_join(str(server_root_path), move_to)) / name)
+                        except ValueError as e: st.error(str(e))
+                    confirm_delete = st.checkbox(f"Ya, hapus '{name}' beserta isinya", key=f"rm_confirm_{name}")
+                    if st.button("🗑️ Hapus", key=f"rm_{name}", use_container_width=True, type="primary", disabled=not confirm_delete):
+                        if path_in_running_world(active_server, item): st.error("Dunia ini sedang dipakai server yang berjalan. Hentikan server terlebih dahulu.")
+                        else: submit_archive_job("delete", item)
+
+        render_archive_jobs_panel()
+
+        # File hanya dibaca saat benar-benar diunduh, bukan setiap rerun
+        download_path = st.session_state.get('fm_download')
+        if download_path and os.path.dirname(download_path) == str(current_path) and os.path.isfile(download_path):
+            download_name, download_size = os.path.basename(download_path), os.path.getsize(download_path)
+            with st.container(border=True):
+                st.markdown(f"**{download_name}** ({format_size(download_size)})")
+                if download_size <= INLINE_DOWNLOAD_MAX_BYTES:
+                    st.download_button("💾 Simpan", data=lambda p=download_path: Path(p).read_bytes(), file_name=download_name, key="fm_download_button")
+                else:
+                    # Token hanya berlaku sekali: tautan yang sudah dipakai/kedaluwarsa diganti yang baru
+                    link = st.session_state.get('fm_download_link')
+                    if not link or not get_file_server().is_download_pending(link):
+                        link = st.session_state.fm_download_link = get_file_server().register(download_name, lambda p=download_path: iter_file_chunks(p))
+                    link_col, refresh_col = st.columns([3, 1])
+                    link_col.link_button("⬇️ Unduh lewat server unduhan lokal", FILE_SERVER_PUBLIC_URL + link, use_container_width=True)
+                    if refresh_col.button("🔄 Tautan baru", key="fm_download_refresh", use_container_width=True,
+                                          help="Tautan hanya berlaku untuk satu unduhan."):
+                        st.session_state.fm_download_link = None
+                        st.rerun()
+
+    with tab_backup:
+        render_backup_tab(active_server, server_root_path)
+
+    with tab_stats:
+        render_world_stats_tab(active_server, server_root_path)
+
+    with tab_prune:
+        render_prune_tab(active_server)
 
     with tab_world_import:
         st.subheader("Impor Dunia (.mcworld atau .zip)")
@@ -778,23 +5289,13 @@ def render_file_manager_page():
                     if target_path.exists(): st.error("Dunia dengan nama itu sudah ada."); return
                     
                     with st.spinner("Mengimpor dunia..."):
-                        temp_dir = Path('/content/world_import_temp')
-                        if temp_dir.exists(): shutil.rmtree(temp_dir)
-                        temp_dir.mkdir()
-                        
-                        archive_path = temp_dir / uploaded_world.name
-                        with open(archive_path, 'wb') as f: f.write(uploaded_world.getbuffer())
-                        
-                        extract_path = temp_dir / 'extracted'
-                        with zipfile.ZipFile(archive_path, 'r') as z: z.extractall(extract_path)
-                        
-                        # Cari level.dat untuk menemukan folder dunia yang benar
-                        world_data_source = extract_path
-                        level_dat_path = list(extract_path.rglob('level.dat'))
-                        if level_dat_path: world_data_source = level_dat_path[0].parent
-                        
-                        shutil.copytree(world_data_source, target_path)
-                        shutil.rmtree(temp_dir)
+                        # Baca central directory langsung dari file unggahan; hanya subtree dunia yang diekstrak
+                        try:
+                            with zipfile.ZipFile(uploaded_world, 'r') as z:
+                                extract_zip_subtree(z, find_world_prefix(z), str(target_path))
+                        except (zipfile.BadZipFile, ValueError) as e:
+                            shutil.rmtree(target_path, ignore_errors=True)
+                            st.error(f"Arsip dunia tidak valid: {e}"); return
                         st.success(f"Dunia '{new_world_name}' berhasil diimpor!")
                         st.warning(f"Jangan lupa atur `level-name={new_world_name}` di `server.properties`.")
                 else:
@@ -807,23 +5308,47 @@ def render_file_manager_page():
         
         available_worlds = [d.name for d in worlds_dir.iterdir() if d.is_dir()]
         world_to_export = st.selectbox("Pilih dunia untuk diekspor", available_worlds)
+        export_options = render_compression_options("export")
+        # Baca dari folder tempat server berjalan (stage jika staged run) lewat salinan lokal sesaat
+        managed = get_supervisor().get(active_server)
+        live_worlds_dir = Path(live_server_path(active_server)) / 'worlds'
+        if managed and managed.is_running(): st.caption("Server sedang berjalan: penyimpanan dunia dijeda sebentar selama dunia disalin ke disk lokal, lalu ekspor dibangun dari salinan itu.")
         if st.button("Ekspor Dunia"):
             if world_to_export:
                 with st.spinner(f"Mengekspor '{world_to_export}'..."):
-                    world_source_path = worlds_dir / world_to_export
+                    world_source_path = live_worlds_dir / world_to_export
                     backup_dir = server_root_path / BACKUP_FOLDER_NAME
                     backup_dir.mkdir(exist_ok=True)
                     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
                     mcworld_filename = f"{world_to_export}_{timestamp}.mcworld"
                     mcworld_filepath = backup_dir / mcworld_filename
                     
-                    # Kunci: zip dari dalam folder dunia
-                    shutil.make_archive(str(mcworld_filepath), 'zip', str(world_source_path))
-                    # Ganti nama .zip menjadi .mcworld
-                    os.rename(str(mcworld_filepath) + '.zip', str(mcworld_filepath))
+                    # Kunci: zip dari dalam folder dunia, dikompres paralel dan ditulis per chunk langsung ke file
+                    stats = {}
+                    try:
+                        size = write_stream_to_file(open_world_export_stream(managed, str(world_source_path), export_options, stats), str(mcworld_filepath))
+                    except (RuntimeError, OSError) as e:
+                        if os.path.exists(f"{mcworld_filepath}.tmp"): os.remove(f"{mcworld_filepath}.tmp")
+                        st.error(str(e)); return
+                    if stats["changed"]:
+                        os.remove(mcworld_filepath)
+                        st.error(f"{len(stats['changed'])} file berubah selama ekspor (mis. `{stats['changed'][0]}`); hasil dibuang. Coba lagi."); return
+
+                    st.success(f"Dunia diekspor ke `{mcworld_filepath.relative_to(DRIVE_PATH)}` ({size / (1024*1024):.1f} MB)")
+                    st.caption(format_compression_stats(stats))
+                    if size <= INLINE_DOWNLOAD_MAX_BYTES:
+                        with open(mcworld_filepath, 'rb') as f:
+                            st.download_button("Unduh File .mcworld", data=f, file_name=mcworld_filename)
+                    else:
+                        st.info("File terlalu besar untuk tombol unduh Streamlit; gunakan tautan streaming di bawah atau Google Drive.")
 
-                    st.success(f"Dunia diekspor ke `{mcworld_filepath.relative_to(DRIVE_PATH)}`")
-                    st.download_button("Unduh File .mcworld", data=mcworld_filepath.read_bytes(), file_name=mcworld_filename)
+        if world_to_export:
+            st.markdown("**Unduh streaming (tanpa file sementara)**")
+            st.caption(f"Zip dibangun sambil dikirim dari server unduhan lokal di port {FILE_SERVER_PORT}; port ini harus dapat dijangkau browser.")
+            if st.button("🔗 Buat Tautan Unduhan"):
+                world_source_path = live_worlds_dir / world_to_export
+                link = get_file_server().register(f"{world_to_export}.mcworld", lambda: open_world_export_stream(managed, str(world_source_path), export_options))
+                st.link_button("⬇️ Unduh .mcworld", FILE_SERVER_PUBLIC_URL + link)
 
     with tab_world_delete:
         st.subheader("Hapus Dunia")
@@ -837,6 +5362,45 @@ def render_file_manager_page():
             shutil.rmtree(worlds_dir / world_to_delete)
             st.success(f"Dunia '{world_to_delete}' telah dihapus."); st.rerun()
 
+def render_log_archive_page():
+    """Pencarian di seluruh log server (latest.log dan arsip .log.gz) lewat indeks FTS."""
+    st.header("📜 Arsip Log")
+    active_server = st.session_state.get('active_server')
+    if not active_server: st.warning("Pilih server aktif terlebih dahulu."); return
+
+    archive = LogArchive(active_server)
+    logs_dir = os.path.join(live_server_path(active_server), 'logs')
+    col_stats, col_refresh = st.columns([3, 1])
+    with col_refresh:
+        if st.button("🔄 Perbarui Indeks", use_container_width=True):
+            progress_bar = st.progress(0, text="Mengindeks log...")
+            result = archive.refresh(logs_dir, lambda done, total: progress_bar.progress(done / total, text=f"File {done}/{total}..."))
+            progress_bar.empty()
+            st.toast(f"{result['files']} file, {result['lines']:,} baris diindeks dalam {result['seconds']:.1f} dtk.")
+    stats = archive.stats()
+    with col_stats:
+        st.caption(f"Indeks: {stats['files']} file, {stats['lines']:,} baris, {stats['db_mb']:.1f} MB. Hanya file baru atau yang bertambah yang dibaca saat diperbarui.")
+    if not stats["files"]:
+        st.info("Indeks masih kosong. Klik **Perbarui Indeks** untuk membaca folder `logs/`."); return
+
+    with st.form("log_search_form", border=False):
+        col1, col2, col3 = st.columns([3, 2, 1])
+        text = col1.text_input("Cari teks", placeholder="Contoh: Steve moved too quickly")
+        levels = col2.multiselect("Level", ["INFO", "WARN", "ERROR", "FATAL", "DEBUG"])
+        period = col3.selectbox("Rentang", ["24 jam", "7 hari", "30 hari", "Semua"], index=1)
+        thread = st.text_input("Thread (opsional)", placeholder="Server thread")
+        submitted = st.form_submit_button("🔍 Cari", type="primary")
+    if not submitted: return
+
+    since = {"24 jam": 1, "7 hari": 7, "30 hari": 30}.get(period)
+    started = time.perf_counter()
+    rows = archive.query(text, levels, time.time() - since * 86400 if since else None, thread)
+    st.caption(f"{len(rows)} baris dalam {(time.perf_counter() - started) * 1000:.0f} ms"
+               + (f" (dibatasi {LOG_ARCHIVE_RESULT_LIMIT} terbaru)" if len(rows) == LOG_ARCHIVE_RESULT_LIMIT else ""))
+    st.dataframe([{"waktu": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"), "level": level, "thread": thread_name,
+                   "pesan": message, "file": name} for ts, level, thread_name, message, name in rows],
+                 use_container_width=True, hide_index=True)
+
 def render_plugins_mods_page():
     """Halaman untuk mengelola plugin, mod, dan Geyser."""
     st.header("🧩 Plugin, Mod, & Add-on")
@@ -934,28 +5498,78 @@ def render_settings_and_optimizations_page():
                 st.success("Pengaturan tunnel berhasil disimpan!")
 
     with tabs[1]:
-        st.subheader("Optimasi Performa Server (Otomatis)")
-        st.warning("Fitur ini akan mengubah file konfigurasi (`spigot.yml`, `paper-world-defaults.yml`, dll.) untuk meningkatkan TPS. **Backup server Anda sebelum melanjutkan!**")
+        st.subheader("Profil Tuning Performa")
         active_server = st.session_state.get('active_server')
         if not active_server: st.warning("Pilih server aktif terlebih dahulu."); return
+        render_tuning_profiles(active_server)
 
-        if st.button("Terapkan Optimasi Performa", type="secondary"):
-            with st.spinner("Menerapkan pengaturan optimasi..."):
-                # Implementasi logika dari sel "Server Improvement" minelab.py
-                server_path = os.path.join(DRIVE_PATH, active_server)
-                yaml = ruamel.yaml.YAML()
-                
-                # Contoh untuk paper-world-defaults.yml
-                paper_path = os.path.join(server_path, 'config', 'paper-world-defaults.yml')
-                if os.path.exists(paper_path):
-                    with open(paper_path) as f: paper_config = yaml.load(f)
-                    paper_config['chunks']['prevent-moving-into-unloaded-chunks'] = True
-                    paper_config['entities']['spawning']['non-player-arrow-despawn-rate'] = 20
-                    with open(paper_path, 'w') as f: yaml.dump(paper_config, f)
-                    st.success("Optimasi untuk `paper-world-defaults.yml` diterapkan.")
-                
-                # Tambahkan logika untuk file yml lainnya (spigot, purpur, bukkit)
-                st.success("Proses optimasi selesai.")
+def format_mspt(measurement):
+    return f"{measurement[0]:.1f} ms ({measurement[1]} sampel)" if measurement else "-"
+
+def render_tuning_profiles(active_server):
+    """Pratinjau, penerapan, rollback, dan pengukuran MSPT profil tuning."""
+    colab_config = get_colab_config(active_server)
+    server_type, version = colab_config.get('server_type'), colab_config.get('server_version')
+    server_path = live_server_path(active_server)
+    config_index = get_config_index(server_path)
+    managed = get_supervisor().get(active_server)
+    running = bool(managed and managed.is_running())
+    st.caption(f"Tipe: `{server_type or '-'}` versi `{version or '-'}`. Perubahan berlaku setelah server di-restart; file yang belum dibuat server dilewati.")
+
+    profile = st.selectbox("Profil", list(TUNING_PROFILES), format_func=lambda p: TUNING_PROFILES[p]["label"])
+    st.write(TUNING_PROFILES[profile]["description"])
+    plan = plan_tuning_profile(config_index, profile, server_type, version)
+    if not plan:
+        st.info("Tidak ada perubahan: profil ini sudah diterapkan atau file konfigurasinya belum ada (jalankan server sekali).")
+    else:
+        st.dataframe([{"file": path, "kunci": key, "sekarang": str(old), "baru": str(new)}
+                      for path, changed in plan.items() for key, (old, new) in changed.items()],
+                     use_container_width=True, hide_index=True)
+        if running:
+            st.caption(f"Rata-rata MSPT {TUNING_MEASURE_WINDOW // 60} menit terakhir: {format_mspt(mspt_average(managed, time.time() - TUNING_MEASURE_WINDOW))}")
+        else:
+            st.caption("Server tidak berjalan: MSPT sebelum penerapan tidak tercatat.")
+        if st.button("Terapkan Profil", type="primary"):
+            try:
+                apply_tuning_profile(active_server, server_path, profile, plan, managed)
+            except (OSError, ValueError) as e:
+                st.error(f"Gagal menerapkan profil, tidak ada file yang diubah: {e}")
+            else:
+                st.success(f"Profil '{TUNING_PROFILES[profile]['label']}' diterapkan ke {len(plan)} file. Restart server untuk memberlakukannya.")
+                st.rerun()
+
+    history = load_tuning_history(active_server)
+    if not history: return
+    st.markdown("**Riwayat Penerapan**")
+    for entry in reversed(history):
+        with st.container(border=True):
+            applied = datetime.fromtimestamp(entry["applied_at"]).strftime("%Y-%m-%d %H:%M")
+            changes = sum(len(changed) for changed in entry["changes"].values())
+            status = " — ↩️ di-rollback" if entry["rolled_back"] else ""
+            st.markdown(f"**{TUNING_PROFILES.get(entry['profile'], {}).get('label', entry['profile'])}** · {applied} · {changes} kunci di {len(entry['changes'])} file{status}")
+            before, after = entry["mspt_before"], entry["mspt_after"]
+            if not after and not entry["rolled_back"]:
+                after = tuning_after_mspt(entry, managed)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("MSPT sebelum", format_mspt(before))
+            col2.metric("MSPT sesudah", format_mspt(after), delta=f"{(after[0] - before[0]) / before[0] * 100:+.1f}%" if before and after else None, delta_color="inverse")
+            with col3:
+                if not entry["rolled_back"] and running and not entry["mspt_after"] and st.button("Simpan MSPT sesudah", key=f"tune_measure_{entry['id']}"):
+                    if record_tuning_result(active_server, entry["id"], managed): st.rerun()
+                    else: st.warning(f"Belum ada sampel: restart server setelah penerapan dan tunggu lebih dari {TUNING_SETTLE_SECONDS} detik.")
+                if not entry["rolled_back"] and st.button("↩️ Rollback", key=f"tune_rollback_{entry['id']}"):
+                    try:
+                        skipped = rollback_tuning_profile(active_server, server_path, entry["id"])
+                    except (OSError, ValueError) as e: st.error(str(e))
+                    else:
+                        st.session_state.tuning_rollback_skipped = skipped
+                        st.rerun()
+    skipped = st.session_state.pop('tuning_rollback_skipped', None)
+    if skipped is not None:
+        st.success("Nilai profil dikembalikan. Restart server untuk memberlakukannya.")
+        if skipped:
+            st.warning("Kunci berikut sudah diubah sejak profil diterapkan sehingga tidak dikembalikan: "
+                       + ", ".join(f"`{path}` → `{key}` (sekarang: {current})" for path, key, current in skipped))
 
 # =================================================================================
 # FUNGSI UTAMA DAN NAVIGASI
@@ -967,6 +5581,7 @@ def main():
 
     if st.session_state.drive_mounted:
         load_server_config()
+        get_metadata_prefetcher()
 
     with st.sidebar:
         st.image("https://i.ibb.co/N2gzkBB5/1753179481600-bdab5bfb-616b-4c1e-bdf9-5377de7aa5ec.png", width=70)
@@ -1011,6 +5626,7 @@ def main():
                 "⚙️ Editor Konfigurasi": render_config_editor_page,
                 "🧩 Plugin, Mod, & Add-on": render_plugins_mods_page,
                 "🗂️ Manajer File & Dunia": render_file_manager_page,
+                "📜 Arsip Log": render_log_archive_page,
                 "🔧 Pengaturan & Optimasi": render_settings_and_optimizations_page,
             }
             